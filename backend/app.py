@@ -1,19 +1,36 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS, cross_origin
-import requests, json, time, re, os, joblib, random
+import requests, json, time, os, random
 from dotenv import load_dotenv
 import firebase_admin
 from firebase_admin import credentials, firestore, auth
-import numpy as np
 from itertools import cycle
+from model_registry import ModelRegistry
+from estimate_cache import EstimateCache
+from task_classifier import classify_task_type
+from duration_parser import parse_duration_hours
+from response_cache import ResponseCache, make_cache_key
+from gemini_client import GeminiClient
+from gemini_limiter import GeminiLimiter, ThrottledError
+from json_stream import JsonArrayParser, extract_json_array
+from single_flight import SingleFlight
+from generate_jobs import JobRunner, JobStore, QueueFullError, TERMINAL_STATES
+from task_assignment import AssignmentEngine, STRATEGIES as ASSIGNMENT_STRATEGIES
+from similar_plans import SimilarPlanIndex
+from fanout import FanOut, ServerTiming
+from task_locator import TaskLocator
+from ttl_cache import TTLCache
 
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 # Use a lighter, faster Gemini model variant
-GEMINI_URL = f"https://generativelanguage.googleapis.com/v1/models/gemini-2.5-flash-lite:generateContent?key={GEMINI_API_KEY}"
+# GEMINI_API_BASE can point at a local stub server for load tests
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com").rstrip("/")
+GEMINI_URL = f"{GEMINI_API_BASE}/v1/models/gemini-2.5-flash-lite:generateContent?key={GEMINI_API_KEY}"
+GEMINI_STREAM_URL = f"{GEMINI_API_BASE}/v1/models/gemini-2.5-flash-lite:streamGenerateContent?alt=sse&key={GEMINI_API_KEY}"
 
 app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": "*", "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"], "allow_headers": ["Content-Type", "Authorization"]}})
+CORS(app, resources={r"/*": {"origins": "*", "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"], "allow_headers": ["Content-Type", "Authorization", "X-Cache-Bypass", "Cache-Control", "Prefer"], "expose_headers": ["X-Cache", "Location", "Retry-After", "Server-Timing"]}})
 
 # Initialize Firebase
 try:
@@ -25,50 +42,174 @@ except Exception as e:
     print(f"⚠️ Firebase initialization failed: {e}")
     db = None
 
-# Load ML models for task duration estimation
+# Firestore accepts at most 500 writes per batch
+FIRESTORE_BATCH_LIMIT = 500
+
+# Independent Firestore calls (group queries, each project's tasks, bulk task batches) run on
+# a shared pool, at most FIRESTORE_FANOUT_PER_REQUEST at a time for any one request
+firestore_fanout = FanOut(
+    max_workers=int(os.getenv("FIRESTORE_FANOUT_WORKERS", 16)),
+    per_request=int(os.getenv("FIRESTORE_FANOUT_PER_REQUEST", 8)),
+)
+
+# Task id -> project id for PATCH /api/tasks/<task_id> (collection-group query behind an LRU);
+# TASK_LOCATION_SCAN_FALLBACK=false stops it scanning all projects for tasks saved without an id field
+task_locator = TaskLocator(
+    max_size=int(os.getenv("TASK_LOCATION_CACHE_SIZE", 10000)),
+    scan_fallback=os.getenv("TASK_LOCATION_SCAN_FALLBACK", "true").lower() in ("1", "true", "yes"),
+)
+
+# uid -> display name for group member lists (None for uids without a user document)
+user_name_cache = TTLCache(
+    ttl_seconds=float(os.getenv("USER_NAME_CACHE_TTL_SECONDS", 300)),
+    max_size=int(os.getenv("USER_NAME_CACHE_SIZE", 10000)),
+)
+
+# Estimates keyed on the feature tuple; cleared whenever the model is (re)loaded
+estimate_cache = EstimateCache(max_size=int(os.getenv("DURATION_CACHE_SIZE", 4096)))
+
+# The duration model is loaded (memory-mapped) on the first estimate, not at import,
+# and can be hot-swapped for a retrained version without restarting workers
+duration_models = ModelRegistry('duration_artifacts.pkl', on_swap=lambda model: estimate_cache.clear())
+if os.getenv("DURATION_MODEL_WARMUP", "").lower() in ("1", "true", "yes"):
+    duration_models.warm_up()
+if os.getenv("DURATION_MODEL_WATCH_SECONDS"):
+    duration_models.start_watching(float(os.getenv("DURATION_MODEL_WATCH_SECONDS")))
+MODEL_ADMIN_TOKEN = os.getenv("MODEL_ADMIN_TOKEN")
+
+# Gemini responses for /generate, shared by all workers; GENERATE_CACHE_PATH="" disables it
+generate_cache = None
+if os.getenv("GENERATE_CACHE_PATH", "generate_cache.sqlite3"):
+    try:
+        generate_cache = ResponseCache(
+            os.getenv("GENERATE_CACHE_PATH", "generate_cache.sqlite3"),
+            ttl_seconds=float(os.getenv("GENERATE_CACHE_TTL_SECONDS", 7 * 24 * 3600)),
+            max_entries=int(os.getenv("GENERATE_CACHE_MAX_ENTRIES", 1000)),
+            max_bytes=int(os.getenv("GENERATE_CACHE_MAX_BYTES", 50 * 2**20)),
+        )
+    except Exception as e:
+        print(f"⚠️ Generate cache unavailable: {e}")
+
+# Optional offline near-duplicate lookup: a description close enough to an earlier one
+# reuses that plan (reassigned to the current roster). Enabled by GENERATE_SIMILARITY_PATH.
+# The 0.8 default favours misses over reusing another stack's plan (see similar_plans.py)
+similar_plans = None
+if os.getenv("GENERATE_SIMILARITY_PATH"):
+    try:
+        similar_plans = SimilarPlanIndex(
+            os.getenv("GENERATE_SIMILARITY_PATH"),
+            threshold=float(os.getenv("GENERATE_SIMILARITY_THRESHOLD", 0.8)),
+            max_entries=int(os.getenv("GENERATE_SIMILARITY_MAX_ENTRIES", 2000)),
+        )
+    except Exception as e:
+        print(f"⚠️ Similar-plan index unavailable: {e}")
+
+# How generated tasks are spread over the team: "greedy" (plan order) or "lpt" (longest
+# first, shorter makespan); /generate/stream always goes in plan order
+TASK_ASSIGNMENT_STRATEGY = os.getenv("TASK_ASSIGNMENT_STRATEGY", "greedy").lower()
+if TASK_ASSIGNMENT_STRATEGY not in ASSIGNMENT_STRATEGIES:
+    print(f"⚠️ Unknown TASK_ASSIGNMENT_STRATEGY {TASK_ASSIGNMENT_STRATEGY!r}, using greedy")
+    TASK_ASSIGNMENT_STRATEGY = "greedy"
+
+# Concurrent identical /generate requests wait on one Gemini call. Set
+# GENERATE_SINGLE_FLIGHT_DIR to also coalesce across workers (uses the generate cache)
+generate_flights = SingleFlight(lock_dir=os.getenv("GENERATE_SINGLE_FLIGHT_DIR") or None)
+
+# Job mode for /generate (?async=1): a bounded pool runs generations off the request
+# thread and the SQLite job table lets any worker answer polls
+GENERATE_JOB_POLL_SECONDS = float(os.getenv("GENERATE_JOB_POLL_SECONDS", 0.5))
+GENERATE_JOB_EVENTS_MAX_SECONDS = float(os.getenv("GENERATE_JOB_EVENTS_MAX_SECONDS", 25))
+GENERATE_JOB_EVENTS_RETRY_MS = int(os.getenv("GENERATE_JOB_EVENTS_RETRY_MS", 1000))
 try:
-    duration_artifacts = joblib.load('duration_artifacts.pkl')
-    duration_model = duration_artifacts['model']
-    le_task_type = duration_artifacts['le_task_type']
-    le_assignee = duration_artifacts['le_assignee']
+    generate_jobs = JobRunner(
+        JobStore(os.getenv("GENERATE_JOBS_PATH", "generate_jobs.sqlite3"),
+                 # Jobs are heartbeated while queued or running, so this only bounds how long a dead
+                 # worker's jobs look alive, not how long a generation may take
+                 stale_seconds=float(os.getenv("GENERATE_JOB_STALE_SECONDS", 120))),
+        workers=int(os.getenv("GENERATE_JOB_WORKERS", 4)),
+        max_pending=int(os.getenv("GENERATE_JOB_MAX_PENDING", 32)),
+    )
 except Exception as e:
-    duration_model = None
-    le_task_type = None
-    le_assignee = None
+    print(f"⚠️ Generate job store unavailable: {e}")
+    generate_jobs = None
+
+# Rate limit, adaptive concurrency and circuit breaker for Gemini, shared by all workers
+# through a locked state file
+gemini_limiter = GeminiLimiter(
+    os.getenv("GEMINI_LIMITER_STATE", "gemini_limiter.json"),
+    rate=float(os.getenv("GEMINI_RATE_PER_SECOND", 2)),
+    max_rate=float(os.getenv("GEMINI_MAX_RATE_PER_SECOND", 10)),
+    burst=int(os.getenv("GEMINI_BURST", 5)),
+    max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", 8)),
+    failure_threshold=int(os.getenv("GEMINI_BREAKER_THRESHOLD", 5)),
+    cooldown=float(os.getenv("GEMINI_BREAKER_COOLDOWN_SECONDS", 30)),
+    max_wait=float(os.getenv("GEMINI_LIMITER_MAX_WAIT_SECONDS", 10)),
+)
+
+# One keep-alive connection pool per worker, so generations and retries skip the TCP/TLS handshake
+gemini_client = GeminiClient(
+    pool_size=int(os.getenv("GEMINI_POOL_SIZE", 10)),
+    connect_timeout=float(os.getenv("GEMINI_CONNECT_TIMEOUT", 5)),
+    read_timeout=float(os.getenv("GEMINI_READ_TIMEOUT", 180)),  # 3 minutes for long plans
+    pool_timeout=float(os.getenv("GEMINI_POOL_TIMEOUT", 10)),  # wait for a free connection when all are busy
+)
+
+
+def throttled_message(error):
+    """User-facing message when the shared Gemini limiter refuses a call"""
+    if error.reason == "circuit open":
+        return f"The AI service is temporarily unavailable. Please try again in {max(1, round(error.retry_after))} seconds."
+    return "The AI service is temporarily unavailable due to usage limits. Please try again in a few minutes."
 
 
 def call_gemini(prompt, max_retries=5):
-    import time
-    
     for attempt in range(max_retries):
+        # Every attempt, including retries, goes through the limiter shared by all workers
+        try:
+            lease = gemini_limiter.acquire()
+        except ThrottledError as e:
+            print(f"⏳ Gemini call refused by limiter: {e}")
+            return None, throttled_message(e)
+        
         try:
             print(f"🔄 Calling Gemini API (attempt {attempt + 1}/{max_retries})...")
-            response = requests.post(GEMINI_URL, json={
+            response, conn_stats = gemini_client.post(GEMINI_URL, json={
                 "contents": [{"parts": [{"text": prompt}]}],
                 "generationConfig": {"temperature": 0.5, "maxOutputTokens": 65535}
-            }, timeout=180)  # 3 minutes timeout
-            
-            print(f"📡 Gemini API response status: {response.status_code}")
-            
-            # Handle 429 Quota Exceeded
+            })
+        except requests.exceptions.Timeout:
+            gemini_limiter.release(lease)
+            if attempt < max_retries - 1:
+                time.sleep(2)
+                continue
+            return None, "Request timed out - Gemini API is slow. Try again or reduce project scope."
+        except Exception as e:
+            gemini_limiter.release(lease)
+            if attempt < max_retries - 1:
+                time.sleep(2)
+                continue
+            return None, str(e)
+        
+        gemini_limiter.release(lease, response.status_code, response.headers.get("Retry-After"))
+        print(f"📡 Gemini API response status: {response.status_code} "
+              f"({conn_stats['newConnections']} new connection(s), "
+              f"handshake {conn_stats['handshakeSeconds'] * 1000:.0f}ms)")
+        
+        # 429 Quota Exceeded / 503 Service Unavailable: the limiter now holds every worker
+        # off for Retry-After (or a shared exponential backoff), so just try again
+        if response.status_code in (429, 503):
+            print(f"⚠️ Gemini API returned {response.status_code}: {response.text[:200]}")
+            if attempt < max_retries - 1:
+                continue
             if response.status_code == 429:
-                print(f"⚠️ Quota exceeded error from Gemini API")
-                print(f"Response body: {response.text[:500]}")
                 return None, "The AI service is temporarily unavailable due to usage limits. Please try again in a few minutes."
-            
-            # Handle 503 Service Unavailable (overloaded)
-            if response.status_code == 503:
-                if attempt < max_retries - 1:
-                    wait_time = (2 ** attempt) * 3  # Exponential backoff: 3s, 6s, 12s, 24s, 48s
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    return None, "The AI service is currently busy. Please try again in a few moments."
-            
-            if response.status_code != 200:
-                print(f"❌ Unexpected API error {response.status_code}: {response.text[:200]}")
-                return None, "Unable to generate tasks at this time. Please try again later."
-            
+            return None, "The AI service is currently busy. Please try again in a few moments."
+        
+        if response.status_code != 200:
+            print(f"❌ Unexpected API error {response.status_code}: {response.text[:200]}")
+            return None, "Unable to generate tasks at this time. Please try again later."
+        
+        try:
             result = response.json()
             
             # Check for various finish reasons
@@ -80,73 +221,173 @@ def call_gemini(prompt, max_retries=5):
                 return None, f"Response incomplete: {finish_reason}"
             
             return result["candidates"][0]["content"]["parts"][0]["text"], None
-            
+        except Exception as e:
+            if attempt < max_retries - 1:
+                continue
+            return None, str(e)
+    
+    return None, "Failed after all retry attempts"
+
+
+class GeminiStreamError(Exception):
+    """User-facing error from a streaming Gemini call"""
+
+
+def stream_gemini(prompt, max_retries=3):
+    """Yield the generated text in fragments as Gemini streams it (server-sent events).
+
+    Only failures before the first fragment are retried; raises GeminiStreamError.
+    """
+    for attempt in range(max_retries):
+        try:
+            lease = gemini_limiter.acquire()
+        except ThrottledError as e:
+            raise GeminiStreamError(throttled_message(e))
+        
+        try:
+            print(f"🔄 Streaming from Gemini API (attempt {attempt + 1}/{max_retries})...")
+            response, conn_stats = gemini_client.post(GEMINI_STREAM_URL, json={
+                "contents": [{"parts": [{"text": prompt}]}],
+                "generationConfig": {"temperature": 0.5, "maxOutputTokens": 65535}
+            }, stream=True)
         except requests.exceptions.Timeout:
+            gemini_limiter.release(lease)
             if attempt < max_retries - 1:
                 time.sleep(2)
                 continue
-            return None, "Request timed out - Gemini API is slow. Try again or reduce project scope."
+            raise GeminiStreamError("Request timed out - Gemini API is slow. Try again or reduce project scope.")
         except Exception as e:
+            gemini_limiter.release(lease)
             if attempt < max_retries - 1:
                 time.sleep(2)
                 continue
-            return None, str(e)
-    
-    return None, "Failed after all retry attempts"
+            raise GeminiStreamError(str(e))
+        
+        # The lease covers the request until response headers; the stream itself is cheap for the quota
+        gemini_limiter.release(lease, response.status_code, response.headers.get("Retry-After"))
+        print(f"📡 Gemini stream response status: {response.status_code} "
+              f"({conn_stats['newConnections']} new connection(s))")
+        if response.status_code in (429, 503):
+            response.close()
+            if attempt < max_retries - 1:
+                continue
+            if response.status_code == 429:
+                raise GeminiStreamError("The AI service is temporarily unavailable due to usage limits. Please try again in a few minutes.")
+            raise GeminiStreamError("The AI service is currently busy. Please try again in a few moments.")
+        if response.status_code != 200:
+            print(f"❌ Unexpected API error {response.status_code}: {response.text[:200]}")
+            response.close()
+            raise GeminiStreamError("Unable to generate tasks at this time. Please try again later.")
+        
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                # Each SSE event is one GenerateContentResponse carrying the next text fragment
+                if not line or not line.startswith("data:"):
+                    continue
+                event = json.loads(line[5:])
+                candidates = event.get("candidates") or []
+                if not candidates:
+                    continue  # e.g. a frame carrying only usage metadata or prompt feedback
+                parts = candidates[0].get("content", {}).get("parts", [])
+                for part in parts:
+                    if part.get("text"):
+                        yield part["text"]
+        except requests.exceptions.RequestException as e:
+            raise GeminiStreamError(f"Gemini stream interrupted: {e}")
+        except (ValueError, IndexError, KeyError, AttributeError) as e:
+            # Malformed frame (bad JSON or unexpected shape); end the stream with an error line
+            print(f"❌ Malformed Gemini stream frame: {e}")
+            raise GeminiStreamError("Received an invalid response from the AI service. Please try again.")
+        finally:
+            response.close()
+        return
+    raise GeminiStreamError("Failed after all retry attempts")
+
+PRIORITY_MAP = {'low': 1, 'medium': 2, 'high': 3}
+MAX_BATCH_ESTIMATES = 1000
+
+def extract_duration_features(model, title, priority="medium", assignee="Unassigned"):
+    """Build the model feature row (same features as training)"""
+    description_length = len(title)
+    priority_encoded = PRIORITY_MAP.get(priority.lower(), 2)
+    # Unknown categories fall back to code 0
+    task_type_encoded = model.task_type_codes.get(classify_task_type(title), 0)
+    assignee_encoded = model.assignee_codes.get(assignee, 0)
+    return (description_length, priority_encoded, task_type_encoded, assignee_encoded)
+
+def round_estimate(estimated_hours):
+    """Round to 0.5 hours and keep within reasonable bounds (0.5 to 40 hours)"""
+    estimated_hours = round(estimated_hours * 2) / 2
+    return float(max(0.5, min(40, estimated_hours)))
 
 def estimate_task_duration(title, priority="medium", assignee="Unassigned"):
     """Use ML model to estimate task duration in hours"""
-    if not duration_model:
+    model = duration_models.get()
+    if not model:
         return 2.0  # Default 2 hours if model not loaded
     
     try:
-        # Extract features (same as training)
-        description_length = len(title)
-        
-        priority_map = {'low': 1, 'medium': 2, 'high': 3}
-        priority_encoded = priority_map.get(priority.lower(), 2)
-        
-        # Categorize task type
-        title_lower = title.lower()
-        if any(word in title_lower for word in ['research', 'investigate', 'analyze']):
-            task_type = 'research'
-        elif any(word in title_lower for word in ['design', 'wireframe', 'mockup', 'ui', 'ux']):
-            task_type = 'design'
-        elif any(word in title_lower for word in ['develop', 'code', 'implement', 'build', 'prototype']):
-            task_type = 'development'
-        elif any(word in title_lower for word in ['test', 'qa', 'bug', 'fix']):
-            task_type = 'testing'
-        elif any(word in title_lower for word in ['meet', 'review', 'discuss']):
-            task_type = 'meeting'
-        else:
-            task_type = 'other'
-        
-        # Encode task type
-        try:
-            task_type_encoded = le_task_type.transform([task_type])[0]
-        except:
-            task_type_encoded = 0
-        
-        # Encode assignee
-        try:
-            assignee_encoded = le_assignee.transform([assignee])[0]
-        except:
-            assignee_encoded = 0
-        
-        # Make prediction
-        features = np.array([[description_length, priority_encoded, task_type_encoded, assignee_encoded]])
-        estimated_hours = duration_model.predict(features)[0]
-        
-        # Round to 0.5 hours
-        estimated_hours = round(estimated_hours * 2) / 2
-        
-        # Ensure reasonable bounds (0.5 to 40 hours)
-        estimated_hours = max(0.5, min(40, estimated_hours))
-        
-        return float(estimated_hours)
+        features = extract_duration_features(model, title, priority, assignee)
+        # Version in the key keeps in-flight estimates from an old model out of the new model's entries
+        cache_key = (model.version, features)
+        cached = estimate_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        estimated_hours = round_estimate(model.predict_one(features))
+        estimate_cache.put(cache_key, estimated_hours)
+        return estimated_hours
     except Exception as e:
         return 2.0
 
+def estimate_task_durations(tasks):
+    """Estimate many tasks with one feature matrix and a single model call.
+
+    `tasks` is a list of dicts with "title", "priority" and "assignee".
+    Returns hours in the same order; rows that can't be featurized get 2.0.
+    """
+    estimates = [2.0] * len(tasks)
+    model = duration_models.get()
+    if not model or not tasks:
+        return estimates
+    
+    # Serve cached rows directly; each distinct uncached feature row goes to the model once
+    missing = {}  # feature tuple -> indexes of the tasks that share it
+    for idx, task in enumerate(tasks):
+        try:
+            features = extract_duration_features(
+                model,
+                task.get("title", ""),
+                task.get("priority") or "medium",
+                task.get("assignee") or "Unassigned"
+            )
+        except Exception:
+            continue
+        if features in missing:
+            missing[features].append(idx)
+            continue
+        cached = estimate_cache.get((model.version, features))
+        if cached is not None:
+            estimates[idx] = cached
+        else:
+            missing[features] = [idx]
+    
+    if not missing:
+        return estimates
+    
+    rows = list(missing)
+    try:
+        predictions = model.predict(rows)
+    except Exception:
+        return estimates
+    
+    for features, estimated_hours in zip(rows, predictions):
+        estimated_hours = round_estimate(estimated_hours)
+        estimate_cache.put((model.version, features), estimated_hours)
+        for idx in missing[features]:
+            estimates[idx] = estimated_hours
+    return estimates
+
 @app.route("/", methods=["GET"])
 def home():
     return jsonify({"message": "Smart Scheduler API Running"}), 200
@@ -172,6 +413,84 @@ def api_estimate_duration():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Estimate cache statistics (for sizing DURATION_CACHE_SIZE)
+@app.route("/api/estimate-duration/cache-stats", methods=["GET"])
+def api_estimate_cache_stats():
+    return jsonify(estimate_cache.stats()), 200
+
+# Active duration model version, load latency and memory (loads the model if it isn't yet)
+@app.route("/api/model/status", methods=["GET"])
+def api_model_status():
+    if request.args.get("warmup", "false").lower() == "true":
+        duration_models.warm_up()
+    return jsonify(duration_models.stats()), 200
+
+def _model_admin_error():
+    """Reload/rollback are only enabled when MODEL_ADMIN_TOKEN is set and sent back"""
+    if not MODEL_ADMIN_TOKEN:
+        return jsonify({"error": "Model admin endpoints are disabled"}), 403
+    if request.headers.get("X-Admin-Token") != MODEL_ADMIN_TOKEN:
+        return jsonify({"error": "Invalid admin token"}), 401
+    return None
+
+# Load a (retrained) artifact in the background and swap it in once it passes the canary check
+@app.route("/api/model/reload", methods=["POST"])
+def api_model_reload():
+    error = _model_admin_error()
+    if error:
+        return error
+    
+    data = request.get_json(silent=True) or {}
+    artifact = data.get("artifact")
+    if artifact:
+        # Only artifacts inside the backend directory can be loaded
+        base_dir = os.path.dirname(os.path.realpath(__file__))
+        artifact = os.path.realpath(os.path.join(base_dir, artifact))
+        if not artifact.startswith(base_dir + os.sep) or not os.path.isfile(artifact):
+            return jsonify({"error": "Artifact not found"}), 404
+    
+    duration_models.reload_async(artifact)
+    return jsonify({"success": True, "reloadState": "loading"}), 202
+
+# Swap back to the previously active model version
+@app.route("/api/model/rollback", methods=["POST"])
+def api_model_rollback():
+    error = _model_admin_error()
+    if error:
+        return error
+    
+    version = duration_models.rollback()
+    if not version:
+        return jsonify({"error": "No previous model version to roll back to"}), 409
+    return jsonify({"success": True, "active": version.describe()}), 200
+
+# Estimate durations for many tasks in one request
+@app.route("/api/estimate-duration/batch", methods=["POST"])
+def api_estimate_duration_batch():
+    try:
+        data = request.json or {}
+        tasks = data.get("tasks", [])
+        
+        if not isinstance(tasks, list) or not tasks:
+            return jsonify({"error": "tasks must be a non-empty list"}), 400
+        if len(tasks) > MAX_BATCH_ESTIMATES:
+            return jsonify({"error": f"Too many tasks (max {MAX_BATCH_ESTIMATES})"}), 400
+        
+        # Only estimate entries that have a title; keep response order aligned with the request
+        valid_indexes = [i for i, t in enumerate(tasks) if isinstance(t, dict) and t.get("title")]
+        hours = estimate_task_durations([tasks[i] for i in valid_indexes])
+        
+        estimates = [{"error": "Title required"} for _ in tasks]
+        for i, estimated_hours in zip(valid_indexes, hours):
+            estimates[i] = {
+                "estimatedHours": estimated_hours,
+                "estimatedTime": f"{estimated_hours}h"
+            }
+        
+        return jsonify({"estimates": estimates}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 # Authentication Routes
 @app.route("/api/auth/check-username", methods=["POST"])
 def check_username():
@@ -217,6 +536,7 @@ def register_user():
             "createdAt": firestore.SERVER_TIMESTAMP,
             "projects": []
         })
+        user_name_cache.invalidate(uid)  # May be cached as unknown from an earlier groups view
         
         return jsonify({"success": True, "message": "User registered successfully"}), 201
     except Exception as e:
@@ -266,6 +586,7 @@ def update_user_profile(user_id):
             # Update Firestore document
             user_ref = db.collection("users").document(user_id)
             user_ref.update({"username": new_username})
+            user_name_cache.invalidate(user_id)
             updates["username"] = new_username
 
         # Update password if provided
@@ -287,184 +608,497 @@ def update_user_profile(user_id):
 
 
 
-def assign_user(task, team_members, member_roles, assignments):
-    """Assign a user to a task based on role and workload."""
-    task_type = task.get("type", "other").lower()
-    
-    # Define role keywords for each task type
-    role_map = {
-        "frontend": ["frontend developer", "software engineer", "developer"],
-        "backend": ["backend developer", "software engineer", "developer"],
-        "development": ["backend developer", "software engineer", "developer", "frontend developer"],
-        "design": ["designer", "ui/ux designer"],
-        "testing": ["qa engineer", "tester", "software engineer"],
-        "devops": ["devops engineer", "systems administrator"],
-        "documentation": ["technical writer", "developer", "business analyst"],
-        "research": ["researcher", "analyst", "business analyst"],
-        "analysis": ["researcher", "analyst", "business analyst"],
-        "planning": ["project manager", "business analyst"],
-        "data_preparation": ["business analyst", "data analyst", "software engineer"],
-        "review": ["project manager", "qa engineer", "software engineer"],
-        "deployment": ["devops engineer", "software engineer"],
-        "monitoring": ["devops engineer", "software engineer"],
-        "feedback": ["project manager", "business analyst"],
-        "meeting": [],  # Can be assigned to anyone
-        "other": [],    # Can be assigned to anyone
-    }
-    
-    possible_roles = role_map.get(task_type, [])
-    
-    # Find all users with the possible roles
-    eligible_users = []
-    if possible_roles:
-        for user, role in member_roles.items():
-            if any(keyword in role.lower() for keyword in possible_roles):
-                eligible_users.append(user)
-            
-    # If no one has a specific role, any developer can take it
-    if not eligible_users:
-        for user, role in member_roles.items():
-            if "developer" in role.lower() or "engineer" in role.lower():
-                eligible_users.append(user)
-
-    # If still no one, make it open for anyone in the team
-    if not eligible_users:
-        eligible_users = list(team_members)
-
-    # If team is empty, return "Unassigned"
-    if not eligible_users:
-        return "Unassigned"
-        
-    # Find the user with the minimum number of assigned tasks
-    eligible_assignments = {u: assignments.get(u, 0) for u in eligible_users}
-    
-    # Return user with the least tasks
-    return min(eligible_assignments, key=eligible_assignments.get)
-
-@app.route("/generate", methods=["POST"])
-@cross_origin()
-def generate():
-    data = request.get_json()
-    description = data.get("description", "").strip()
-    team_members = data.get("teamMembers", [])  # Get team members from frontend
-    current_user = data.get("currentUser", {})  # Get current logged-in user info
-    
-    
-    if len(description) < 10:
-        return jsonify({"error": "Description too short (min 10 chars)"}), 400
-    
-    words = description.split()
-    if len(words) < 5:
-        return jsonify({"error": "Description too vague (min 5 words)"}), 400
-
-    unique_words = set(words)
-    if len(unique_words) < 3:
-        return jsonify({"error": "Description seems repetitive or is too simple. Please be more descriptive."}), 400
-    
-    # Build team context for AI - extract just the project description without team info
-    base_description = description.split('\n\nTeam Members')[0] if '\n\nTeam Members' in description else description
-    base_description = base_description.split('\n\nCRITICAL RULES')[0] if '\n\nCRITICAL RULES' in base_description else base_description
-    
-    team_context = ""
+def build_team_context(team_members, current_user):
+    """Return (member_names, member_roles) for the roster sent by the frontend"""
     member_names = []
     member_roles = {}  # Track member roles for intelligent assignment
     
     if team_members and len(team_members) > 0:
         # Group project - use team members (admin already included by frontend)
-        team_context = "\n\n=== TEAM ROSTER (USE ONLY THESE NAMES) ===\n"
-        
-        # Process all team members (frontend already includes admin)
         for member in team_members:
             member_name = member.get('name', '')
             member_role = member.get('role', 'Developer')
             if member_name and member_name != 'Unassigned' and member_name not in member_names:
                 member_names.append(member_name)
                 member_roles[member_name] = member_role
-                team_context += f"- {member_name} (Role: {member_role})\n"
-        
-        team_context += f"\n=== MANDATORY ASSIGNMENT RULES ===\n"
-        team_context += f"1. ONLY use these names: {', '.join(member_names)}\n"
-        team_context += f"2. DO NOT use: Alice, Bob, Carol, User, Admin, or any generic names\n"
-        team_context += f"3. EVERY task MUST have assigned_user from the list above\n"
-        team_context += f"4. Match task types to member roles\n"
-        team_context += f"5. Distribute evenly across: {', '.join(member_names)}\n"
     elif current_user and current_user.get('username'):
         # Individual project - assign all to current user
-        current_username = current_user.get('username')
-        member_names = [current_username]
-        team_context = f"\n\nAssign ALL tasks to: {current_username} (individual project)"
-    
+        member_names = [current_user.get('username')]
+    return member_names, member_roles
+
+def build_generate_prompt(base_description, member_names):
+    """Prompt asking Gemini for the project plan"""
     # Generate tasks with STRICT naming requirements and sequential workflow
-    prompt = f"""Generate a detailed project plan with tasks as a JSON array of objects. The project is about: {base_description}.
+    return f"""Generate a detailed project plan with tasks as a JSON array of objects. The project is about: {base_description}.
 The project plan must contain between 25 and 35 tasks.
 Each task object should have the following fields: "title", "priority", "estimatedDuration", "type", and "assigned_user".
 Assign tasks to the following team members: {', '.join(member_names) if member_names else 'Unassigned'}.
 Ensure the tasks are in a logical sequence.
 This is an AI-generated draft; review and refine task details and assignments for accuracy.
 Return ONLY the JSON array with no markdown formatting."""
+
+def parse_generated_tasks(result):
+    """Extract the task list from Gemini's text; returns (tasks_data, complete).
+
+    Complete task objects are salvaged from truncated output (complete=False);
+    raises ValueError if there are none.
+    """
+    tasks_data, complete = extract_json_array(result)
+    tasks_data = [t for t in tasks_data if isinstance(t, dict)]
+    if not tasks_data:
+        raise ValueError("Failed to parse AI response. Please try again.")
+    if not complete:
+        print(f"⚠️ Gemini response was incomplete; salvaged {len(tasks_data)} tasks")
+    return tasks_data[:35], complete  # Hard limit to 35 tasks
+
+def task_hours(t):
+    """Estimated hours for one parsed Gemini task"""
+    # Same parser the duration model's training data goes through
+    hours = parse_duration_hours(t.get("estimatedDuration", "3 hours"), default=3)
+    return 3 if hours != hours else hours  # explicit null
+
+def build_task(idx, t, hours, assigned_user):
+    """Turn one parsed Gemini task into a task record"""
+    # Get task type from AI (now using "type" field)
+    task_type = t.get("type", t.get("task_type", "backend"))
+    # Capitalize first letter for consistency
+    task_type = task_type.capitalize() if task_type else "Backend"
+    
+    return {
+        "sequence": idx + 1,  # Add sequence number for ordering
+        "title": t.get("title", "Untitled Task"),
+        "description": "",
+        "status": "to-do",
+        "priority": t.get("priority", "medium").lower(),
+        "assignedTo": assigned_user,
+        "assigned_user": assigned_user,
+        "task_type": task_type,
+        "acceptance_criteria": [],
+        "dependencies": [],
+        "estimatedDuration": hours,
+        "actualDuration": 0,
+        "comments": []
+    }
+
+def build_tasks(tasks_data, member_names, member_roles):
+    """Turn parsed Gemini tasks into task records with durations and assignees balanced by hours"""
+    hours = [task_hours(t) for t in tasks_data]
+    assigner = AssignmentEngine(member_names, member_roles)
+    assignees = assigner.assign_all([(t.get("type", "other"), h) for t, h in zip(tasks_data, hours)],
+                                    TASK_ASSIGNMENT_STRATEGY)
+    return [build_task(idx, t, hours[idx], assignees[idx]) for idx, t in enumerate(tasks_data)]
+
+def generate_cache_bypassed():
+    """True when the client asked for a fresh plan (X-Cache-Bypass: 1 or Cache-Control: no-cache)"""
+    if request.headers.get("X-Cache-Bypass", "").lower() in ("1", "true", "yes"):
+        return True
+    return "no-cache" in request.headers.get("Cache-Control", "").lower()
+
+def prepare_generation(data):
+    """Validate a /generate payload; returns (spec, error message)"""
+    description = data.get("description", "").strip()
+    team_members = data.get("teamMembers", [])  # Get team members from frontend
+    current_user = data.get("currentUser", {})  # Get current logged-in user info
     
+    if len(description) < 10:
+        return None, "Description too short (min 10 chars)"
     
-    result, error = call_gemini(prompt)
+    words = description.split()
+    if len(words) < 5:
+        return None, "Description too vague (min 5 words)"
+
+    unique_words = set(words)
+    if len(unique_words) < 3:
+        return None, "Description seems repetitive or is too simple. Please be more descriptive."
+    
+    # Extract just the project description without team info
+    base_description = description.split('\n\nTeam Members')[0] if '\n\nTeam Members' in description else description
+    base_description = base_description.split('\n\nCRITICAL RULES')[0] if '\n\nCRITICAL RULES' in base_description else base_description
+    
+    member_names, member_roles = build_team_context(team_members, current_user)
+    return {"base_description": base_description, "member_names": member_names, "member_roles": member_roles}, None
+
+def lookup_generation_cache(spec, bypass_cache=False):
+    """Returns (cache key, cached Gemini text or None, cache status for the X-Cache header)"""
+    # Individual projects have no roles; key them on the assignee name alone
+    member_roles = spec["member_roles"] or {name: "" for name in spec["member_names"]}
+    cache_key = make_cache_key(spec["base_description"], member_roles)
+    if not generate_cache and not similar_plans:
+        return cache_key, None, "DISABLED"
+    if bypass_cache:
+        return cache_key, None, "BYPASS"
+    if generate_cache:
+        cached = generate_cache.get(cache_key)
+        if cached is not None:
+            return cache_key, cached, "HIT"
+    if similar_plans:
+        try:
+            cached, similarity = similar_plans.lookup(spec["base_description"])
+            if cached is not None:
+                print(f"🔁 Reusing the plan of a similar description (similarity {similarity:.2f})")
+                return cache_key, cached, "SIMILAR"
+        except Exception as e:
+            print(f"⚠️ Similar-plan lookup failed: {e}")
+    return cache_key, None, "MISS"
+
+def remember_generation(spec, cache_key, result):
+    """Store a complete Gemini plan in the response cache and the similar-plan index"""
+    if generate_cache:
+        try:
+            generate_cache.put(cache_key, result)
+        except Exception as e:
+            print(f"⚠️ Could not cache Gemini response: {e}")
+    if similar_plans:
+        try:
+            similar_plans.add(spec["base_description"], result)
+        except Exception as e:
+            print(f"⚠️ Could not index Gemini response: {e}")
+
+def parse_cached_generation(result):
+    """Returns (tasks_data, error message)"""
+    try:
+        tasks_data, _ = parse_generated_tasks(result)
+        return tasks_data, None
+    except ValueError as e:
+        return None, str(e)
+
+def fetch_generated_tasks(spec, cache_key):
+    """Call Gemini and parse the plan; returns (tasks_data, error message)"""
+    result, error = call_gemini(build_generate_prompt(spec["base_description"], spec["member_names"]))
     if error:
-        return jsonify({"error": error}), 500
+        return None, error
     
     try:
-        # Clean the result to get a valid JSON
-        json_str = re.search(r'\[.*\]', result, re.DOTALL).group(0)
-        tasks_data = json.loads(json_str)
-        tasks_data = tasks_data[:35]  # Hard limit to 35 tasks
-    except (json.JSONDecodeError, AttributeError):
-        return jsonify({"error": "Failed to parse AI response. Please try again."}), 500
+        tasks_data, complete = parse_generated_tasks(result)
+    except ValueError as e:
+        return None, str(e)
+    # Only complete plans are worth replaying; a salvaged partial one is served once
+    if complete:
+        remember_generation(spec, cache_key, result)
+    return tasks_data, None
+
+def recheck_generation_cache(cache_key):
+    """Result another worker just cached for the same request, or None"""
+    if not generate_cache:
+        return None
+    cached = generate_cache.get(cache_key)
+    if cached is None:
+        return None
+    tasks_data, error = parse_cached_generation(cached)
+    return None if error else (tasks_data, None)
+
+def run_generation(spec, bypass_cache=False):
+    """Cache lookup, Gemini call and task post-processing; returns (body, http status, cache status).
+
+    Doesn't touch the Flask request, so it can run on a background job thread.
+    """
+    cache_key, result, cache_status = lookup_generation_cache(spec, bypass_cache)
+    
+    if result is not None:
+        tasks_data, error = parse_cached_generation(result)
+    else:
+        # Identical concurrent requests share one Gemini call
+        (tasks_data, error), shared = generate_flights.do(
+            cache_key,
+            lambda: fetch_generated_tasks(spec, cache_key),
+            recheck=lambda: recheck_generation_cache(cache_key),
+        )
+        if shared:
+            cache_status = "COALESCED"
+    if error:
+        return {"error": error}, 500, cache_status
+    
+    return {"tasks": build_tasks(tasks_data, spec["member_names"], spec["member_roles"])}, 200, cache_status
+
+def generate_async_requested():
+    """Job mode: ?async=1 or Prefer: respond-async"""
+    if request.args.get("async", "").lower() in ("1", "true", "yes"):
+        return True
+    return "respond-async" in request.headers.get("Prefer", "").lower()
+
+@app.route("/generate", methods=["POST"])
+@cross_origin()
+def generate():
+    data = request.get_json()
+    spec, error = prepare_generation(data)
+    if error:
+        return jsonify({"error": error}), 400
+    
+    if generate_async_requested():
+        if not generate_jobs:
+            return jsonify({"error": "Background generation is not available"}), 503
+        try:
+            job_id = generate_jobs.submit(run_generation, spec, generate_cache_bypassed())
+        except QueueFullError:
+            response = jsonify({"error": "Too many generations in progress. Please try again shortly."})
+            response.headers["Retry-After"] = "5"
+            return response, 503
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+        response = jsonify({"jobId": job_id, "status": "queued",
+                            "statusUrl": f"/api/generate/jobs/{job_id}",
+                            "eventsUrl": f"/api/generate/jobs/{job_id}/events"})
+        response.headers["Location"] = f"/api/generate/jobs/{job_id}"
+        return response, 202
+    
+    body, status, cache_status = run_generation(spec, generate_cache_bypassed())
+    response = jsonify(body)
+    response.headers["X-Cache"] = cache_status
+    return response, status
+
+# Streaming generation: NDJSON lines, one {"type": "task"} per task as soon as Gemini
+# finishes writing it, then {"type": "done"} (or {"type": "error"})
+@app.route("/generate/stream", methods=["POST"])
+@cross_origin()
+def generate_stream():
+    data = request.get_json()
+    spec, error = prepare_generation(data)
+    if error:
+        return jsonify({"error": error}), 400
+    
+    base_description = spec["base_description"]
+    member_names = spec["member_names"]
+    member_roles = spec["member_roles"]
+    cache_key, cached, cache_status = lookup_generation_cache(spec, generate_cache_bypassed())
+    
+    def stream():
+        chunks = [cached] if cached is not None else stream_gemini(build_generate_prompt(base_description, member_names))
+        parser = JsonArrayParser()
+        assigner = AssignmentEngine(member_names, member_roles)
+        received = []
+        count = 0
+        try:
+            for chunk in chunks:
+                received.append(chunk)
+                for t in parser.feed(chunk):
+                    if not isinstance(t, dict) or count >= 35:  # Hard limit to 35 tasks
+                        continue
+                    hours = task_hours(t)
+                    task = build_task(count, t, hours, assigner.assign(t.get("type", "other"), hours))
+                    count += 1
+                    yield json.dumps({"type": "task", "task": task}) + "\n"
+                if parser.finished:
+                    break
+        except GeminiStreamError as e:
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+            return
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+        
+        if count == 0:
+            yield json.dumps({"type": "error", "error": "Failed to parse AI response. Please try again."}) + "\n"
+            return
+        # Only complete plans are worth replaying
+        if cached is None and parser.finished:
+            remember_generation(spec, cache_key, "".join(received))
+        yield json.dumps({"type": "done", "count": count, "complete": parser.finished}) + "\n"
+    
+    # X-Accel-Buffering stops nginx from holding lines back until the response ends
+    return Response(stream(), mimetype="application/x-ndjson",
+                    headers={"X-Cache": cache_status, "Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# Poll a background generation job
+@app.route("/api/generate/jobs/<job_id>", methods=["GET"])
+def get_generate_job(job_id):
+    if not generate_jobs:
+        return jsonify({"error": "Background generation is not available"}), 503
+    try:
+        job = generate_jobs.store.get(job_id)
+        if not job:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(job), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
+# Server-sent events for a background generation job: a "status" event on every
+# state change, then one "result" event when it finishes. Polling GET /api/generate/jobs/<id>
+# is the primary interface: each stream holds a web worker, so it closes after
+# GENERATE_JOB_EVENTS_MAX_SECONDS and the browser's EventSource reconnects, sending the
+# last status it saw as Last-Event-ID so it isn't repeated
+@app.route("/api/generate/jobs/<job_id>/events", methods=["GET"])
+def generate_job_events(job_id):
+    if not generate_jobs:
+        return jsonify({"error": "Background generation is not available"}), 503
+    if not generate_jobs.store.get(job_id):
+        return jsonify({"error": "Job not found"}), 404
+    last_event_id = request.headers.get("Last-Event-ID")
+    
+    def stream():
+        last_status = last_event_id
+        deadline = time.time() + GENERATE_JOB_EVENTS_MAX_SECONDS
+        yield f"retry: {GENERATE_JOB_EVENTS_RETRY_MS}\n\n"
+        while True:
+            job = generate_jobs.store.get(job_id)
+            if job is None:
+                # Pruned while the client was listening
+                gone = {"jobId": job_id, "status": "failed", "httpStatus": 404, "result": {"error": "Job not found"}}
+                yield f"event: result\ndata: {json.dumps(gone)}\n\n"
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield f"id: {last_status}\nevent: status\ndata: {json.dumps({'jobId': job_id, 'status': last_status})}\n\n"
+            if job["status"] in TERMINAL_STATES:
+                yield f"event: result\ndata: {json.dumps(job)}\n\n"
+                return
+            if time.time() >= deadline:
+                return  # the client reconnects after the retry delay
+            time.sleep(GENERATE_JOB_POLL_SECONDS)
     
-    # Process tasks with enhanced details
+    return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+# Queue depth and wait/run times of background generation jobs
+@app.route("/api/generate/jobs/metrics", methods=["GET"])
+def generate_job_metrics():
+    if not generate_jobs:
+        return jsonify({"enabled": False}), 200
+    try:
+        return jsonify({"enabled": True, **generate_jobs.stats(), **generate_jobs.store.metrics()}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Gemini connection pool statistics (handshakes paid vs connections reused) and limiter state
+@app.route("/api/gemini/stats", methods=["GET"])
+def api_gemini_stats():
+    try:
+        return jsonify({**gemini_client.stats(), "limiter": gemini_limiter.stats()}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# How many /generate requests shared another request's Gemini call
+@app.route("/api/generate/coalescing-stats", methods=["GET"])
+def api_generate_coalescing_stats():
+    return jsonify(generate_flights.stats()), 200
+
+# Gemini response cache statistics
+@app.route("/api/generate/cache-stats", methods=["GET"])
+def api_generate_cache_stats():
+    if not generate_cache:
+        return jsonify({"enabled": False}), 200
+    try:
+        return jsonify({"enabled": True, **generate_cache.stats()}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Similar-plan index size, memory and lookup latency (lookup counters are per worker)
+@app.route("/api/generate/similarity-stats", methods=["GET"])
+def api_generate_similarity_stats():
+    if not similar_plans:
+        return jsonify({"enabled": False}), 200
+    try:
+        return jsonify({"enabled": True, **similar_plans.stats()}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def load_tasks(project_ref):
+    """A project's tasks (up to 100) in sequence order"""
     tasks = []
-    assignments = {member_name: 0 for member_name in member_names}
-    for idx, t in enumerate(tasks_data):
-        # Parse duration
-        duration = t.get("estimatedDuration", "3 hours")
-        hours = 3
-        if isinstance(duration, str):
-            if "hour" in duration:
-                hours = int(re.search(r'\d+', duration).group()) if re.search(r'\d+', duration) else 3
-            elif "day" in duration:
-                hours = int(re.search(r'\d+', duration).group()) * 8 if re.search(r'\d+', duration) else 24
-            elif "week" in duration:
-                hours = int(re.search(r'\d+', duration).group()) * 40 if re.search(r'\d+', duration) else 40
-        elif isinstance(duration, (int, float)):
-            hours = duration
-        
-        # Get task type from AI (now using "type" field)
-        task_type = t.get("type", t.get("task_type", "backend"))
-        # Capitalize first letter for consistency
-        task_type = task_type.capitalize() if task_type else "Backend"
-        
-        # Assign user using the new role-based logic
-        assigned_user = assign_user(t, member_names, member_roles, assignments)
-        if assigned_user in assignments:
-            assignments[assigned_user] += 1
-        
-        tasks.append({
-            "sequence": idx + 1,  # Add sequence number for ordering
-            "title": t.get("title", "Untitled Task"),
-            "description": "",
-            "status": "to-do",
-            "priority": t.get("priority", "medium").lower(),
-            "assignedTo": assigned_user,
-            "assigned_user": assigned_user,
-            "task_type": task_type,
-            "acceptance_criteria": [],
-            "dependencies": [],
-            "estimatedDuration": hours,
-            "actualDuration": 0,
-            "comments": []
-        })
+    for task_doc in project_ref.collection("tasks").limit(100).stream():
+        task = task_doc.to_dict()
+        task["id"] = task_doc.id
+        tasks.append(task)
+    tasks.sort(key=lambda t: t.get("sequence", 999))
+    return tasks
+
+def count_tasks(project_ref):
+    """Number of tasks in a project from a server-side count aggregation (no task documents are read)"""
+    try:
+        result = project_ref.collection("tasks").count(alias="taskCount").get()
+        return int(result[0][0].value)
+    except Exception as e:
+        print(f"⚠️ Could not count tasks for project {project_ref.id}: {e}")
+        return 0
+
+def project_summary(doc, include_tasks):
+    """Project for the list view: with its tasks, or with just a taskCount for the metadata view"""
+    project = doc.to_dict()
+    project["id"] = doc.id
+    if include_tasks:
+        project["tasks"] = load_tasks(doc.reference)
+    else:
+        project["taskCount"] = count_tasks(doc.reference)
+        project["tasks"] = []  # Empty array for consistency
+    return project
+
+def remember_task_locations(project_id, task_writes):
+    for task_ref, _ in task_writes:
+        task_locator.remember(task_ref.id, project_id)
+
+def save_project(project_ref, project_data, tasks):
+    """Write a project and its tasks with batched commits instead of one write per task.
+
+    A project with up to FIRESTORE_BATCH_LIMIT - 1 tasks is one batch, so it is created atomically.
+    Bigger ones commit their task batches in parallel and write the project document last, so the
+    project only shows up once every task exists; if any write fails, the tasks already written
+    are deleted again and the error is raised.
+    """
+    task_writes = []
+    for task in tasks:
+        task_ref = project_ref.collection("tasks").document()
+        task["id"] = task_ref.id
+        task["projectId"] = project_ref.id  # id + projectId let PATCH /api/tasks/<id> find the task
+        task_writes.append((task_ref, task))
+    
+    if len(task_writes) < FIRESTORE_BATCH_LIMIT:
+        batch = db.batch()
+        batch.set(project_ref, project_data)
+        for task_ref, task in task_writes:
+            batch.set(task_ref, task)
+        batch.commit()
+        remember_task_locations(project_ref.id, task_writes)
+        return
     
-    # Debug: Print final task order before returning
-    for i, task in enumerate(tasks, 1):
-        pass
+    chunks = [task_writes[i:i + FIRESTORE_BATCH_LIMIT] for i in range(0, len(task_writes), FIRESTORE_BATCH_LIMIT)]
     
-    return jsonify({"tasks": tasks}), 200
+    def commit_chunk(chunk):
+        try:
+            batch = db.batch()
+            for task_ref, task in chunk:
+                batch.set(task_ref, task)
+            batch.commit()
+            return None
+        except Exception as e:
+            return e  # Let the other batches finish so cleanup knows exactly what was written
+    
+    errors = firestore_fanout.map(commit_chunk, chunks)
+    error = next((e for e in errors if e is not None), None)
+    if error is None:
+        try:
+            project_ref.set(project_data)
+            remember_task_locations(project_ref.id, task_writes)
+            return
+        except Exception as e:
+            error = e
+    
+    written = [chunk for chunk, chunk_error in zip(chunks, errors) if chunk_error is None]
+    print(f"⚠️ Saving project {project_ref.id} failed, removing {sum(len(c) for c in written)} written tasks: {error}")
+    
+    def delete_chunk(chunk):
+        batch = db.batch()
+        for task_ref, _ in chunk:
+            batch.delete(task_ref)
+        batch.commit()
+    
+    try:
+        firestore_fanout.map(delete_chunk, written)
+    except Exception as cleanup_error:
+        print(f"⚠️ Could not remove tasks of unsaved project {project_ref.id}: {cleanup_error}")
+    raise error
+
+# User name cache statistics
+@app.route("/api/users/name-cache-stats", methods=["GET"])
+def api_user_name_cache_stats():
+    return jsonify(user_name_cache.stats()), 200
+
+# Task location cache and index usage
+@app.route("/api/tasks/location-stats", methods=["GET"])
+def api_task_location_stats():
+    return jsonify(task_locator.stats()), 200
+
+# Firestore fan-out pool usage
+@app.route("/api/firestore/fanout-stats", methods=["GET"])
+def api_firestore_fanout_stats():
+    return jsonify(firestore_fanout.stats()), 200
 
 @app.route("/api/projects", methods=["GET", "POST"])
 def projects():
@@ -482,112 +1116,54 @@ def projects():
             include_tasks = request.args.get("includeTasks", "false").lower() == "true"
             limit = int(request.args.get("limit", 20))
             
-            projects = []
-            project_ids_seen = set()
+            include_groups = request.args.get("includeGroupProjects", "true").lower() == "true"
+            timing = ServerTiming()
             
-            # Step 1: Get projects created by this user (with limit)
-            try:
-                projects_ref = db.collection("projects").where(filter=firestore.FieldFilter("userId", "==", user_id)).order_by("createdAt", direction=firestore.Query.DESCENDING).limit(limit)
-                
-                for doc in projects_ref.stream():
-                    project = doc.to_dict()
-                    project["id"] = doc.id
-                    project_ids_seen.add(doc.id)
-                    
-                    # Only load tasks if explicitly requested
-                    if include_tasks:
-                        tasks = []
-                        tasks_ref = doc.reference.collection("tasks").limit(100)
-                        for task_doc in tasks_ref.stream():
-                            task = task_doc.to_dict()
-                            task["id"] = task_doc.id
-                            tasks.append(task)
-                        tasks.sort(key=lambda t: t.get("sequence", 999))
-                        project["tasks"] = tasks
-                    else:
-                        # Just include task count for metadata view - efficient count using select()
-                        try:
-                            # Only select document IDs, not full documents (1 read per doc vs full read)
-                            tasks_count_query = doc.reference.collection("tasks").select([]).stream()
-                            task_count = sum(1 for _ in tasks_count_query)
-                            project["taskCount"] = task_count
-                        except Exception as count_err:
-                            project["taskCount"] = 0
-                        project["tasks"] = []  # Empty array for consistency
-                    
-                    projects.append(project)
-            except Exception as index_error:
-                # Fallback if composite index doesn't exist
-                projects_ref = db.collection("projects").where(filter=firestore.FieldFilter("userId", "==", user_id)).limit(limit)
-                
-                for doc in projects_ref.stream():
-                    project = doc.to_dict()
-                    project["id"] = doc.id
-                    project_ids_seen.add(doc.id)
-                    
-                    if include_tasks:
-                        tasks = []
-                        tasks_ref = doc.reference.collection("tasks").limit(100)
-                        for task_doc in tasks_ref.stream():
-                            task = task_doc.to_dict()
-                            task["id"] = task_doc.id
-                            tasks.append(task)
-                        tasks.sort(key=lambda t: t.get("sequence", 999))
-                        project["tasks"] = tasks
-                    else:
-                        tasks_count_query = doc.reference.collection("tasks").select([]).stream()
-                        task_count = sum(1 for _ in tasks_count_query)
-                        project["taskCount"] = task_count
-                        project["tasks"] = []
-                    
-                    projects.append(project)
+            def own_projects():
+                try:
+                    projects_ref = db.collection("projects").where(filter=firestore.FieldFilter("userId", "==", user_id)).order_by("createdAt", direction=firestore.Query.DESCENDING).limit(limit)
+                    return list(projects_ref.stream())
+                except Exception as index_error:
+                    # Fallback if composite index doesn't exist
+                    projects_ref = db.collection("projects").where(filter=firestore.FieldFilter("userId", "==", user_id)).limit(limit)
+                    return list(projects_ref.stream())
             
-            # Step 2: Get group projects only if requested
-            if request.args.get("includeGroupProjects", "true").lower() == "true":
-                # Get groups where user is a member (optimized)
-                user_group_ids = []
-                
+            def admin_group_ids():
+                if not include_groups:
+                    return []
                 # Query groups where user is admin
                 admin_groups = db.collection("groups").where(filter=firestore.FieldFilter("adminId", "==", user_id)).limit(10).stream()
-                for group_doc in admin_groups:
-                    user_group_ids.append(group_doc.id)
-                
-                # Get projects for those groups (limited)
-                if user_group_ids:
-                    for group_id in user_group_ids[:5]:  # Limit to 5 groups max
-                        group_projects_ref = db.collection("projects").where(filter=firestore.FieldFilter("groupId", "==", group_id)).limit(10)
-                        for doc in group_projects_ref.stream():
-                            if doc.id in project_ids_seen:
-                                continue
-                            
-                            project = doc.to_dict()
-                            project["id"] = doc.id
-                            project_ids_seen.add(doc.id)
-                            
-                            if include_tasks:
-                                tasks = []
-                                tasks_ref = doc.reference.collection("tasks").limit(100)
-                                for task_doc in tasks_ref.stream():
-                                    task = task_doc.to_dict()
-                                    task["id"] = task_doc.id
-                                    tasks.append(task)
-                                tasks.sort(key=lambda t: t.get("sequence", 999))
-                                project["tasks"] = tasks
-                            else:
-                                try:
-                                    tasks_count_query = doc.reference.collection("tasks").select([]).stream()
-                                    task_count = sum(1 for _ in tasks_count_query)
-                                    project["taskCount"] = task_count
-                                except Exception as count_err:
-                                    project["taskCount"] = 0
-                                project["tasks"] = []
-                            
-                            projects.append(project)
+                return [group_doc.id for group_doc in admin_groups]
+            
+            # Step 1: The user's own projects (with limit) and their groups, at the same time
+            with timing.stage("projects"):
+                own_docs, user_group_ids = firestore_fanout.call_all(own_projects, admin_group_ids)
+            
+            # Step 2: Projects of those groups (limited), one query per group in parallel
+            group_docs = []
+            if user_group_ids:
+                with timing.stage("groupProjects"):
+                    group_docs = firestore_fanout.map(
+                        lambda group_id: list(db.collection("projects").where(filter=firestore.FieldFilter("groupId", "==", group_id)).limit(10).stream()),
+                        user_group_ids[:5])  # Limit to 5 groups max
+            
+            project_docs = []
+            project_ids_seen = set()
+            for doc in own_docs + [doc for docs in group_docs for doc in docs]:
+                if doc.id not in project_ids_seen:
+                    project_ids_seen.add(doc.id)
+                    project_docs.append(doc)
+            
+            # Step 3: Tasks (or just task counts) of every project in parallel
+            with timing.stage("tasks" if include_tasks else "taskCounts"):
+                projects = firestore_fanout.map(lambda doc: project_summary(doc, include_tasks), project_docs)
             
             # Sort by createdAt
             projects.sort(key=lambda p: p.get("createdAt", 0), reverse=True)
             
-            return jsonify({"projects": projects}), 200
+            response = jsonify({"projects": projects})
+            response.headers["Server-Timing"] = timing.header()
+            return response, 200
         except Exception as e:
             return jsonify({"error": str(e)}), 500
     
@@ -609,14 +1185,8 @@ def projects():
                 "createdAt": firestore.SERVER_TIMESTAMP,
                 "updatedAt": firestore.SERVER_TIMESTAMP
             }
-            project_ref.set(project_data)
-            
-            # Save tasks as subcollection
-            tasks = data.get("tasks", [])
-            for task in tasks:
-                task_ref = project_ref.collection("tasks").document()
-                task["id"] = task_ref.id
-                task_ref.set(task)
+            # Save the project with its tasks as subcollection
+            save_project(project_ref, project_data, data.get("tasks", []))
             
             return jsonify({"success": True, "projectId": project_ref.id}), 201
         except Exception as e:
@@ -630,26 +1200,23 @@ def get_project(project_id):
     
     try:
         project_ref = db.collection("projects").document(project_id)
-        project_doc = project_ref.get()
+        timing = ServerTiming()
+        with timing.stage("project"):
+            project_doc = project_ref.get()
         
         if not project_doc.exists:
             return jsonify({"error": "Project not found"}), 404
         
+        # Tasks are only read once the project is known to exist (with limit, sorted by sequence number)
+        with timing.stage("tasks"):
+            tasks = load_tasks(project_ref)
+        
         project = project_doc.to_dict()
         project["id"] = project_doc.id
-        
-        # Get tasks with limit and sort
-        tasks = []
-        tasks_ref = project_ref.collection("tasks").limit(100)
-        for task_doc in tasks_ref.stream():
-            task = task_doc.to_dict()
-            task["id"] = task_doc.id
-            tasks.append(task)
-        
-        # Sort by sequence number
-        tasks.sort(key=lambda t: t.get("sequence", 999))
         project["tasks"] = tasks
-        return jsonify(project), 200
+        response = jsonify(project)
+        response.headers["Server-Timing"] = timing.header()
+        return response, 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -722,6 +1289,7 @@ def project_tasks(project_id):
             task_ref = project_ref.collection("tasks").document()
             task_data = {
                 "id": task_ref.id,
+                "projectId": project_id,
                 "title": data.get("title"),
                 "description": data.get("description", ""),
                 "priority": data.get("priority", "Medium"),
@@ -733,6 +1301,7 @@ def project_tasks(project_id):
                 "dependencies": data.get("dependencies", [])
             }
             task_ref.set(task_data)
+            task_locator.remember(task_ref.id, project_id)
             
             return jsonify({"success": True, "taskId": task_ref.id}), 201
         except Exception as e:
@@ -756,6 +1325,7 @@ def delete_task(project_id, task_id):
             return jsonify({"error": "Task not found"}), 404
         
         task_ref.delete()
+        task_locator.forget(task_id)
         return jsonify({"success": True, "message": "Task deleted"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -772,33 +1342,37 @@ def update_task_legacy(task_id):
     try:
         data = request.json
         
-        # Find the task across all projects (inefficient but needed for legacy support)
-        projects_ref = db.collection("projects").stream()
-        
-        for project_doc in projects_ref:
-            task_ref = project_doc.reference.collection("tasks").document(task_id)
-            task_doc = task_ref.get()
+        # Find the task's project: cached location, then the task-id index (see task_locator.py)
+        task_ref, task_doc = task_locator.find(db, task_id)
+        
+        if task_doc is not None:
+            # Update the task
+            update_data = {}
+            if "status" in data:
+                update_data["status"] = data["status"]
+                # Completion time drives incremental retraining (ml_model/incremental_train.py)
+                was_done = task_doc.to_dict().get("status") == "done"
+                if data["status"] == "done" and not was_done:
+                    update_data["completedAt"] = firestore.SERVER_TIMESTAMP
+                elif data["status"] != "done" and was_done:
+                    update_data["completedAt"] = firestore.DELETE_FIELD
+            if "actualDuration" in data:
+                update_data["actualDuration"] = data["actualDuration"]
+            if "assignedTo" in data:
+                update_data["assignedTo"] = data["assignedTo"]
+            if "title" in data:
+                update_data["title"] = data["title"]
+            if "description" in data:
+                update_data["description"] = data["description"]
+            if "priority" in data:
+                update_data["priority"] = data["priority"]
+            if "due" in data:
+                update_data["due"] = data["due"]
+            if "sequence" in data:
+                update_data["sequence"] = data["sequence"]
             
-            if task_doc.exists:
-                # Update the task
-                update_data = {}
-                if "status" in data:
-                    update_data["status"] = data["status"]
-                if "assignedTo" in data:
-                    update_data["assignedTo"] = data["assignedTo"]
-                if "title" in data:
-                    update_data["title"] = data["title"]
-                if "description" in data:
-                    update_data["description"] = data["description"]
-                if "priority" in data:
-                    update_data["priority"] = data["priority"]
-                if "due" in data:
-                    update_data["due"] = data["due"]
-                if "sequence" in data:
-                    update_data["sequence"] = data["sequence"]
-                
-                task_ref.update(update_data)
-                return jsonify({"success": True, "message": "Task updated"}), 200
+            task_ref.update(update_data)
+            return jsonify({"success": True, "message": "Task updated"}), 200
         
         return jsonify({"error": "Task not found"}), 404
     except Exception as e:
@@ -837,6 +1411,28 @@ def create_group():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def resolve_user_names(user_ids):
+    """{uid: username or email} for existing users: cached names, then one multi-document get for the rest"""
+    cached, missing = user_name_cache.get_many(user_ids)
+    user_names = {uid: name for uid, name in cached.items() if name is not None}
+    if not missing:
+        return user_names
+    
+    users_ref = db.collection("users")
+    try:
+        for user_doc in db.get_all([users_ref.document(uid) for uid in missing], field_paths=["username", "email"]):
+            name = None
+            if user_doc.exists:
+                user_data = user_doc.to_dict()
+                name = user_data.get("username") or user_data.get("email") or user_doc.id
+                user_names[user_doc.id] = name
+            user_name_cache.put(user_doc.id, name)
+    except Exception as e:
+        print(f"⚠️ Could not fetch user names: {e}")
+        for uid in missing:
+            user_names.setdefault(uid, uid)
+    return user_names
+
 # Get all groups for a user
 @app.route("/api/groups/user/<user_id>", methods=["GET"])
 def get_user_groups(user_id):
@@ -887,17 +1483,7 @@ def get_user_groups(user_id):
                     user_ids_to_fetch.add(member.get("userId"))
         
         # Fetch all user names in batch
-        user_names = {}
-        if user_ids_to_fetch:
-            users_ref = db.collection("users")
-            for uid in user_ids_to_fetch:
-                try:
-                    user_doc = users_ref.document(uid).get()
-                    if user_doc.exists:
-                        user_data = user_doc.to_dict()
-                        user_names[uid] = user_data.get("username") or user_data.get("email") or uid
-                except Exception as e:
-                    user_names[uid] = uid
+        user_names = resolve_user_names(user_ids_to_fetch)
         
         # Update member names in groups
         for group in groups:
@@ -0,0 +1,63 @@
+"""One-time backfill of the id and projectId fields on existing tasks.
+
+PATCH /api/tasks/<task_id> finds a task's project with a collection-group
+query on tasks.id (see task_locator.py). Tasks saved before every write path
+stored `id` and `projectId` are invisible to that query, and the endpoint
+falls back to scanning all projects for them. This script walks every
+project and fills in both fields, in batched writes of up to 500. Tasks that
+already have both are skipped, so the script is safe to run again.
+
+Once it has run, TASK_LOCATION_SCAN_FALLBACK=false turns the scan off.
+
+Usage:
+    python backfill_task_ids.py --credentials firebase_key.json [--dry-run]
+"""
+import argparse
+
+BATCH_SIZE = 500  # Firestore's cap on writes per batch
+
+
+def backfill(db, dry_run=False):
+    """Returns (projects visited, tasks checked, tasks updated)"""
+    projects = checked = updated = 0
+    batch, pending = db.batch(), 0
+    for project_doc in db.collection("projects").stream():
+        projects += 1
+        # Only the two fields we compare are read
+        for task_doc in project_doc.reference.collection("tasks").select(["id", "projectId"]).stream():
+            checked += 1
+            task = task_doc.to_dict() or {}
+            if task.get("id") == task_doc.id and task.get("projectId") == project_doc.id:
+                continue
+            updated += 1
+            if dry_run:
+                continue
+            batch.update(task_doc.reference, {"id": task_doc.id, "projectId": project_doc.id})
+            pending += 1
+            if pending == BATCH_SIZE:
+                batch.commit()
+                batch, pending = db.batch(), 0
+        if projects % 100 == 0:
+            print(f"   {projects} projects, {checked} tasks checked, {updated} to update so far")
+    if pending:
+        batch.commit()
+    return projects, checked, updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Store id and projectId on every existing task")
+    parser.add_argument('--credentials', default='firebase_key.json', help="Firebase service account key")
+    parser.add_argument('--dry-run', action='store_true', help="Only count the tasks that need updating")
+    args = parser.parse_args()
+
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+    firebase_admin.initialize_app(credentials.Certificate(args.credentials))
+
+    projects, checked, updated = backfill(firestore.client(), dry_run=args.dry_run)
+    verb = "would update" if args.dry_run else "updated"
+    print(f"✅ {projects} projects, {checked} tasks checked, {verb} {updated}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Throughput of batch duration estimation vs one estimate_task_duration call per task.
+
+Fails if the batch path is slower than the per-task loop at --check-size tasks
+(1000 by default); the batch endpoint exists to replace that loop.
+
+Usage: python backend/benchmarks/bench_batch_estimate.py [--sizes 1 10 100 1000]
+"""
+import argparse
+import time
+import warnings
+
+from common import load_app, synthetic_tasks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 500, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--check-size", type=int, default=1000, help="Size at which batch must not be slower")
+    args = parser.parse_args()
+
+    # sklearn warns about missing feature names on every ndarray predict
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    app = load_app()
+    if not app.duration_models.warm_up():
+        raise SystemExit("duration_artifacts.pkl could not be loaded")
+
+    slower = []
+    print(f"{'tasks':>6} {'single us/task':>15} {'batch us/task':>14} {'speedup':>8}")
+    for size in args.sizes:
+        tasks = synthetic_tasks(size)
+
+        single_best = float("inf")
+        batch_best = float("inf")
+        for _ in range(args.repeat):
+            # Measure model cost, not estimate-cache hits
+            app.estimate_cache.clear()
+            start = time.perf_counter()
+            single = [app.estimate_task_duration(t["title"], t["priority"], t["assignee"]) for t in tasks]
+            single_best = min(single_best, time.perf_counter() - start)
+
+            app.estimate_cache.clear()
+            start = time.perf_counter()
+            batch = app.estimate_task_durations(tasks)
+            batch_best = min(batch_best, time.perf_counter() - start)
+
+        assert single == batch, "batch estimates differ from single-row estimates"
+        single_us = single_best / size * 1e6
+        batch_us = batch_best / size * 1e6
+        print(f"{size:>6} {single_us:>15.1f} {batch_us:>14.1f} {single_us / batch_us:>7.1f}x")
+        if size >= args.check_size and batch_best > single_best:
+            slower.append(size)
+
+    if slower:
+        raise SystemExit(f"FAIL: batch estimation slower than the per-task loop at {slower} tasks")
+    print("PASS: batch estimation is no slower than the per-task loop")
+
+
+if __name__ == "__main__":
+    main()
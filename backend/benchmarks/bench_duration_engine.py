@@ -0,0 +1,77 @@
+"""Latency of the compiled duration engine vs sklearn's GradientBoostingRegressor.predict.
+
+Checks that both produce the same predictions before timing them. Exits
+non-zero if the engine or the served model is slower than sklearn at any
+single-row percentile or batch size.
+
+Usage: python backend/benchmarks/bench_duration_engine.py [--rows 1000] [--batch-sizes 10 100 1000]
+"""
+import argparse
+import sys
+import warnings
+
+import joblib
+import numpy as np
+
+from common import load_app, percentile, synthetic_tasks, time_per_call
+from duration_engine import CompiledGradientBoosting
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    app = load_app()
+    model = joblib.load("duration_artifacts.pkl")["model"]
+    engine = CompiledGradientBoosting.from_model(model)
+    served = app.duration_models.get()
+
+    tasks = synthetic_tasks(args.rows)
+    X = np.array([app.extract_duration_features(served, t["title"], t["priority"], t["assignee"]) for t in tasks], dtype=float)
+
+    expected = model.predict(X)
+    batch_diff = np.max(np.abs(engine.predict(X) - expected))
+    single_diff = max(abs(engine.predict_one(row) - want) for row, want in zip(X, expected))
+    walk_diff = np.max(np.abs(engine._walk(np.asarray(X, dtype=np.float32)) - expected))
+    table = f"{len(engine.table)}-cell threshold table" if engine.table is not None else "no threshold table"
+    print(f"{engine.n_trees} trees, max depth {engine.max_depth}, {len(engine.value)} nodes, {table}")
+    served_diff = np.max(np.abs(served.predict(X) - expected))
+    print(f"max |engine - sklearn|: batch {batch_diff:.2e}, single {single_diff:.2e}, "
+          f"tree walk {walk_diff:.2e}, served {served_diff:.2e}")
+    assert max(batch_diff, single_diff, walk_diff, served_diff) < 1e-9, "engine predictions drifted from sklearn"
+
+    slower = []
+
+    print(f"\n{'single row':<12} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9}")
+    rows = X[:200]
+    single = {}
+    for name, fn in [("sklearn", lambda r: model.predict(r[None, :])), ("engine", engine.predict_one),
+                     ("served", served.predict_one)]:
+        latencies = [lat for row in rows for lat in time_per_call(lambda: fn(row), 1)]
+        single[name] = [percentile(latencies, pct) * 1e6 for pct in (50, 95, 99)]
+        print(f"{name:<12} {single[name][0]:>9.1f} {single[name][1]:>9.1f} {single[name][2]:>9.1f}")
+    for name in ("engine", "served"):
+        if single[name][0] > single["sklearn"][0]:
+            slower.append(f"{name} single row")
+
+    print(f"\n{'batch':>6} {'sklearn us/row':>15} {'walk us/row':>12} {'engine us/row':>14} {'served us/row':>14}")
+    for size in args.batch_sizes:
+        batch = X[:size]
+        results = []
+        for fn in (model.predict, lambda b: engine._walk(np.asarray(b, dtype=np.float32)), engine.predict, served.predict):
+            best = min(time_per_call(lambda: fn(batch), 5))
+            results.append(best / len(batch) * 1e6)
+        print(f"{len(batch):>6} {results[0]:>15.2f} {results[1]:>12.2f} {results[2]:>14.2f} {results[3]:>14.2f}")
+        slower += [f"{name} at {len(batch)} rows" for name, result in zip(("engine", "served"), results[2:])
+                   if result > results[0]]
+
+    if slower:
+        sys.exit(f"\nFAIL: slower than sklearn: {', '.join(slower)}")
+    print("\nPASS: engine and served model are no slower than sklearn at every benchmarked size")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Per-request requests.post vs the pooled GeminiClient under concurrent load.
+
+Both run against the local Gemini stub. The stub speaks plain HTTP, so it
+adds --handshake-delay to every new connection to stand in for the TLS
+handshake the real HTTPS endpoint costs (typically tens of ms).
+
+Usage: python backend/benchmarks/bench_gemini_client.py [--threads 8] [--calls 50]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from common import percentile
+from gemini_client import GeminiClient
+from gemini_stub import start_stub
+
+BODY = {"contents": [{"parts": [{"text": "benchmark"}]}]}
+
+
+def run(post, url, threads, calls):
+    """Issue threads x calls POSTs; returns per-call latencies in seconds"""
+    def worker(_):
+        latencies = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            response = post(url)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+        return latencies
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return [latency for result in pool.map(worker, range(threads)) for latency in result]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=50, help="Calls per thread")
+    parser.add_argument("--delay", type=float, default=0.005, help="Stub response delay in seconds")
+    parser.add_argument("--handshake-delay", type=float, default=0.03, help="Simulated TLS handshake in seconds")
+    args = parser.parse_args()
+
+    server = start_stub(delay=args.delay, handshake_delay=args.handshake_delay)
+    url = f"{server.base_url}/v1/models/stub:generateContent"
+    client = GeminiClient(pool_size=args.threads)
+
+    results = {
+        "requests.post": run(lambda u: requests.post(u, json=BODY, timeout=(5, 30)), url, args.threads, args.calls),
+        "GeminiClient": run(lambda u: client.post(u, json=BODY)[0], url, args.threads, args.calls),
+    }
+    server.shutdown()
+
+    print(f"{'client':<14} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, latencies in results.items():
+        ms = [latency * 1e3 for latency in latencies]
+        print(f"{name:<14} {percentile(ms, 50):>8.2f} {percentile(ms, 95):>8.2f} {percentile(ms, 99):>8.2f}")
+
+    stats = client.stats()
+    print(f"\nGeminiClient: {stats['requests']} requests over {stats['newConnections']} connections "
+          f"({stats['reuseRate']:.0%} reused), avg handshake {stats['avgHandshakeMs']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
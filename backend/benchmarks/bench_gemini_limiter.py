@@ -0,0 +1,95 @@
+"""Shared Gemini limiter and circuit breaker under bursts, against the local stub.
+
+Scenarios, each with --workers processes of --threads threads calling call_gemini:
+  burst    the stub allows --quota requests/s and answers 429 + Retry-After above it
+  outage   the stub answers every request with 503
+
+For each one it prints how many requests reached the stub, how many were
+wasted on 429/503, how many calls succeeded or were refused locally, and
+the call latencies. Every worker process uses one fresh limiter state file.
+
+Usage: python backend/benchmarks/bench_gemini_limiter.py [--workers 3] [--threads 4] [--calls 3]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import BACKEND_DIR, percentile
+from gemini_stub import start_stub
+
+WORKER = r"""
+import json, sys, threading, time
+sys.path.insert(0, {backend!r})
+import os
+os.chdir({backend!r})
+import app
+
+results = []
+lock = threading.Lock()
+
+def run():
+    for _ in range({calls}):
+        start = time.perf_counter()
+        text, error = app.call_gemini("benchmark")
+        with lock:
+            results.append({{"ok": error is None, "error": error, "seconds": time.perf_counter() - start}})
+
+threads = [threading.Thread(target=run) for _ in range({threads})]
+for t in threads: t.start()
+for t in threads: t.join()
+print("RESULT " + json.dumps(results))
+"""
+
+
+def run_scenario(name, stub_kwargs, args, env_overrides):
+    server = start_stub(delay=0.02, **stub_kwargs)
+    state_dir = tempfile.mkdtemp(prefix="gemini-limiter-")
+    env = dict(os.environ, GEMINI_API_BASE=server.base_url,
+               GEMINI_LIMITER_STATE=os.path.join(state_dir, "state.json"),
+               GENERATE_CACHE_PATH="", GENERATE_JOBS_PATH=os.path.join(state_dir, "jobs.sqlite3"),
+               **env_overrides)
+    code = WORKER.format(backend=BACKEND_DIR, calls=args.calls, threads=args.threads)
+
+    start = time.perf_counter()
+    procs = [subprocess.Popen([sys.executable, "-c", code], env=env, stdout=subprocess.PIPE, text=True)
+             for _ in range(args.workers)]
+    results = []
+    for proc in procs:
+        out, _ = proc.communicate()
+        for line in out.splitlines():
+            if line.startswith("RESULT "):
+                results.extend(json.loads(line[len("RESULT "):]))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    ok = [r for r in results if r["ok"]]
+    refused = [r for r in results if not r["ok"] and "temporarily unavailable" in (r["error"] or "")]
+    seconds = [r["seconds"] for r in results]
+    wasted = sum(count for status, count in server.status_counts.items() if status != 200)
+    print(f"\n{name}: {len(results)} calls in {elapsed:.1f}s")
+    print(f"   upstream requests {server.requests} ({wasted} answered 429/503), "
+          f"succeeded {len(ok)}, refused or failed {len(results) - len(ok)} ({len(refused)} fast)")
+    print(f"   latency p50 {percentile(seconds, 50):.2f}s, p95 {percentile(seconds, 95):.2f}s, "
+          f"max {max(seconds):.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--calls", type=int, default=3, help="Calls per thread")
+    parser.add_argument("--quota", type=float, default=3, help="Stub requests per second in the burst scenario")
+    args = parser.parse_args()
+
+    limiter_env = {"GEMINI_RATE_PER_SECOND": "2", "GEMINI_BURST": "3", "GEMINI_LIMITER_MAX_WAIT_SECONDS": "15",
+                   "GEMINI_BREAKER_THRESHOLD": "5", "GEMINI_BREAKER_COOLDOWN_SECONDS": "30"}
+    run_scenario("burst", {"quota_per_second": args.quota, "retry_after": 1}, args, limiter_env)
+    run_scenario("outage", {"statuses": [503] * 10000}, args, limiter_env)
+
+
+if __name__ == "__main__":
+    main()
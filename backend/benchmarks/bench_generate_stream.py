@@ -0,0 +1,76 @@
+"""Time-to-first-task and total time of /generate vs /generate/stream.
+
+Both endpoints run through the Flask test client against the local Gemini stub,
+which "generates" the canned plan at --chunk-delay seconds per --chunk-chars
+characters. The generate cache is bypassed so every run calls the stub.
+
+Usage: python backend/benchmarks/bench_generate_stream.py [--runs 5] [--chunk-delay 0.05]
+"""
+import argparse
+import json
+import os
+import time
+
+from common import load_app
+from gemini_stub import start_stub
+
+PAYLOAD = {
+    "description": "Build a web app where students book study rooms and get reminders",
+    "teamMembers": [
+        {"name": "Ana", "role": "Frontend Developer"},
+        {"name": "Ben", "role": "Backend Developer"},
+        {"name": "Cy", "role": "QA Engineer"},
+    ],
+}
+HEADERS = {"X-Cache-Bypass": "1"}
+
+
+def time_blocking(client):
+    start = time.perf_counter()
+    response = client.post("/generate", json=PAYLOAD, headers=HEADERS)
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200, response.get_json()
+    # The first task is only available once the whole response is
+    return elapsed, elapsed, len(response.get_json()["tasks"])
+
+
+def time_streaming(client):
+    start = time.perf_counter()
+    response = client.post("/generate/stream", json=PAYLOAD, headers=HEADERS, buffered=False)
+    first_task = None
+    tasks = 0
+    for line in response.iter_encoded():
+        for record in filter(None, line.decode().splitlines()):
+            message = json.loads(record)
+            if message["type"] == "task":
+                tasks += 1
+                if first_task is None:
+                    first_task = time.perf_counter() - start
+            elif message["type"] == "error":
+                raise RuntimeError(message["error"])
+    return first_task, time.perf_counter() - start, tasks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--chunk-chars", type=int, default=200)
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = start_stub(delay=0.05, chunk_chars=args.chunk_chars, chunk_delay=args.chunk_delay)
+    os.environ["GEMINI_API_BASE"] = server.base_url
+    app = load_app()
+    client = app.app.test_client()
+
+    print(f"{'endpoint':<18} {'first task ms':>14} {'total ms':>10} {'tasks':>6}")
+    for name, run in (("/generate", time_blocking), ("/generate/stream", time_streaming)):
+        results = [run(client) for _ in range(args.runs)]
+        first = sorted(r[0] for r in results)[len(results) // 2]
+        total = sorted(r[1] for r in results)[len(results) // 2]
+        print(f"{name:<18} {first * 1e3:>14.0f} {total * 1e3:>10.0f} {results[0][2]:>6}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Old regex + json.loads task extraction vs json_stream.extract_json_array.
+
+Inputs are synthetic Gemini-style plans: clean, wrapped in a markdown fence
+with prose, truncated mid-object (what MAX_TOKENS leaves behind), with one
+malformed object, and with a stray token between objects whose tasks carry
+nested arrays of objects. Each task carries a small "dependencies" array, so
+a truncated response has plenty of '[' for the regex to backtrack from.
+
+Before timing, a few malformed inputs are checked for exactly which tasks
+come back; the script exits non-zero if any are wrong.
+
+Usage: python backend/benchmarks/bench_json_extract.py [--tasks 35 2000]
+"""
+import argparse
+import json
+import re
+import sys
+
+from common import time_per_call
+from json_stream import extract_json_array
+
+
+# (input, titles extract_json_array must return)
+CHECKS = [
+    # A stray token before a task with nested objects: the nested "deps" entry is not a task
+    ('[{"title":"a"}, oops, {"title":"b","deps":[{"id":1}]}]', ["a", "b"]),
+    ('[{"title":"a","deps":[{"id":1}]}, {"title":"b", bad}, {"title":"c","deps":[{"id":2},{"id":3}]}]', ["a", "c"]),
+    ('```json\n[{"title":"a"}, {"title":"b","deps":[{"id":1}]}, {"title":"c"', ["a", "b"]),
+]
+
+
+def regex_extract(text):
+    """What generate() used to do"""
+    try:
+        return json.loads(re.search(r'\[.*\]', text, re.DOTALL).group(0))
+    except (json.JSONDecodeError, AttributeError):
+        return []
+
+
+def plan_text(n_tasks):
+    tasks = [{
+        "title": f"Task {i}: build the {['login', 'search', 'billing'][i % 3]} flow",
+        "priority": ["high", "medium", "low"][i % 3],
+        "estimatedDuration": f"{i % 6 + 1} hours",
+        "type": ["development", "design", "testing"][i % 3],
+        "assigned_user": "Ana",
+        "dependencies": [f"Task {j}" for j in range(max(0, i - 2), i)],
+    } for i in range(n_tasks)]
+    return json.dumps(tasks, indent=2)
+
+
+def variants(n_tasks):
+    clean = plan_text(n_tasks)
+    broken = clean.replace('"priority": "low"', '"priority": low', 1)
+    return {
+        "clean": clean,
+        "fenced+prose": f"Here is the plan [draft]:\n```json\n{clean}\n```\nLet me know [if] you need changes.",
+        "truncated": clean[:int(len(clean) * 0.9)],
+        "malformed": broken,
+        "stray+nested": clean.replace("},\n  {", "}, oops,\n  {", 1).replace(
+            '"dependencies": [', '"blockers": [{"id": 0}], "dependencies": [', n_tasks),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, nargs="+", default=[35, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for text, want in CHECKS:
+        got = [element.get("title") for element in extract_json_array(text)[0]]
+        if got != want:
+            sys.exit(f"FAIL: {text!r} gave titles {got}, expected {want}")
+    print(f"PASS: {len(CHECKS)} malformed inputs give the expected tasks\n")
+
+    print(f"{'tasks':>6} {'input':<14} {'KiB':>6} {'regex ms':>9} {'found':>6} {'scanner ms':>11} {'found':>6}")
+    for n_tasks in args.tasks:
+        for name, text in variants(n_tasks).items():
+            regex_found = len(regex_extract(text))
+            scanner_found = len(extract_json_array(text)[0])
+            regex_ms = min(time_per_call(lambda: regex_extract(text), args.repeat)) * 1e3
+            scanner_ms = min(time_per_call(lambda: extract_json_array(text), args.repeat)) * 1e3
+            print(f"{n_tasks:>6} {name:<14} {len(text) / 1024:>6.0f} {regex_ms:>9.2f} {regex_found:>6} "
+                  f"{scanner_ms:>11.2f} {scanner_found:>6}")
+
+
+if __name__ == "__main__":
+    main()
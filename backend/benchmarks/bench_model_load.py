@@ -0,0 +1,62 @@
+"""Cold-start cost of loading the duration model in a fresh process.
+
+Compares the old import-time path (unpickle duration_artifacts.pkl with
+joblib, pulling in sklearn) with the memory-mapped compiled artifact that
+model_loader uses. Each measurement runs in its own interpreter so imports
+and page state aren't shared with the parent.
+
+Usage: python backend/benchmarks/bench_model_load.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from common import BACKEND_DIR
+
+PROBE = r"""
+import json, sys, time
+sys.path.insert(0, {backend!r})
+from model_loader import current_rss_bytes
+rss_before = current_rss_bytes()
+start = time.perf_counter()
+if {mode!r} == "pickle":
+    import joblib
+    artifacts = joblib.load("duration_artifacts.pkl")
+    artifacts["model"].predict([[20, 2, 1, 0]])
+else:
+    from model_loader import load_duration_model
+    load_duration_model("duration_artifacts.pkl").predict_one((20, 2, 1, 0))
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "rss_delta": current_rss_bytes() - rss_before}}))
+"""
+
+
+def measure(mode):
+    code = PROBE.format(backend=BACKEND_DIR, mode=mode)
+    out = subprocess.run([sys.executable, "-W", "ignore", "-c", code], cwd=BACKEND_DIR,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    # Make sure the compiled artifact exists so we time the steady-state path
+    os.chdir(BACKEND_DIR)
+    from model_loader import load_duration_model
+    load_duration_model("duration_artifacts.pkl")
+
+    print(f"{'path':<10} {'load ms (median)':>17} {'rss delta MiB (median)':>23}")
+    for mode in ("pickle", "mmap"):
+        results = [measure(mode) for _ in range(args.runs)]
+        seconds = sorted(r["seconds"] for r in results)[len(results) // 2]
+        rss = sorted(r["rss_delta"] for r in results)[len(results) // 2]
+        print(f"{mode:<10} {seconds * 1e3:>17.1f} {rss / 2**20:>23.1f}")
+
+
+if __name__ == "__main__":
+    main()
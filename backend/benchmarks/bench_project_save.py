@@ -0,0 +1,93 @@
+"""Write latency of saving a generated project: old per-task loop vs save_project.
+
+Needs the Firestore emulator (no credentials, nothing leaves the machine):
+
+    firebase emulators:start --only firestore      # or: gcloud emulators firestore start
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python backend/benchmarks/bench_project_save.py
+
+For each --sizes task count it saves --runs projects both ways into a
+scratch collection and prints the median write time and the number of write
+RPCs. The loop is project_ref.set, then one task_ref.set per task. save_project
+uses one atomic batch, or parallel 500-write batches with the project
+document last. Every project is deleted again afterwards.
+
+Usage: python backend/benchmarks/bench_project_save.py [--sizes 35 500 5000] [--runs 3]
+"""
+import argparse
+import math
+import os
+import statistics
+import sys
+import time
+
+from common import load_app
+
+
+def sample_tasks(n):
+    return [{"sequence": i + 1, "title": f"Task {i + 1}", "status": "to-do", "priority": "medium",
+             "assignedTo": "Ana", "task_type": "Development", "estimatedDuration": 3.0,
+             "actualDuration": 0, "comments": []} for i in range(n)]
+
+
+def loop_save(db, project_ref, project_data, tasks):
+    """What POST /api/projects used to do"""
+    project_ref.set(project_data)
+    for task in tasks:
+        task_ref = project_ref.collection("tasks").document()
+        task["id"] = task_ref.id
+        task_ref.set(task)
+
+
+def delete_project(db, project_ref):
+    tasks_ref = project_ref.collection("tasks")
+    while True:
+        docs = list(tasks_ref.limit(500).stream())
+        if not docs:
+            break
+        batch = db.batch()
+        for doc in docs:
+            batch.delete(doc.reference)
+        batch.commit()
+    project_ref.delete()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[35, 500, 5000])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--collection", default="bench_projects")
+    args = parser.parse_args()
+
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("Set FIRESTORE_EMULATOR_HOST to a running Firestore emulator (see the docstring)")
+
+    from google.auth.credentials import AnonymousCredentials
+    from google.cloud import firestore
+
+    app = load_app()
+    db = firestore.Client(project=os.getenv("GCLOUD_PROJECT", "demo-smart-scheduler"),
+                          credentials=AnonymousCredentials())
+    app.db = db
+
+    print(f"{'tasks':>6} {'loop ms':>9} {'RPCs':>6} {'batched ms':>11} {'RPCs':>6} {'atomic':>7}")
+    for size in args.sizes:
+        timings = {"loop": [], "batched": []}
+        for _ in range(args.runs):
+            for name, save in (("loop", lambda ref, data, tasks: loop_save(db, ref, data, tasks)),
+                               ("batched", app.save_project)):
+                project_ref = db.collection(args.collection).document()
+                project_data = {"id": project_ref.id, "userId": "bench", "title": f"{size} tasks",
+                                "createdAt": firestore.SERVER_TIMESTAMP}
+                tasks = sample_tasks(size)
+                start = time.perf_counter()
+                save(project_ref, project_data, tasks)
+                timings[name].append(time.perf_counter() - start)
+                delete_project(db, project_ref)
+        batches = 1 if size < app.FIRESTORE_BATCH_LIMIT else math.ceil(size / app.FIRESTORE_BATCH_LIMIT) + 1
+        print(f"{size:>6} {statistics.median(timings['loop']) * 1e3:>9.0f} {size + 1:>6} "
+              f"{statistics.median(timings['batched']) * 1e3:>11.0f} {batches:>6} "
+              f"{'yes' if size < app.FIRESTORE_BATCH_LIMIT else 'no':>7}")
+
+
+if __name__ == "__main__":
+    main()
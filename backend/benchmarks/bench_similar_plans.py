@@ -0,0 +1,110 @@
+"""Lookup latency, memory and match quality of the similar-plan index.
+
+The index is filled with --sizes synthetic project descriptions, built from
+a domain, a stack and a few features. It is then queried with four sets:
+- reworded: stored descriptions with another opener and the features swapped.
+  These should match.
+- paraphrased: the same project with different word forms and punctuation
+  ("fitness tracking site (React + Firebase) with payments"). These should
+  match too, but hashed TF-IDF only partly sees through them.
+- other stack: the same domain and features on a stack that was never
+  stored. These should not match.
+- unrelated: different projects. These should not match.
+For each index size the script prints the lookup p50/p95, the worker's index
+memory, and how many of each query set crossed --threshold. Comparing
+paraphrased against other stack hits at a few thresholds shows the trade-off
+behind the 0.8 default (see similar_plans.py).
+
+Usage: python backend/benchmarks/bench_similar_plans.py [--sizes 100 1000 5000] [--threshold 0.8]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from common import percentile
+from similar_plans import SimilarPlanIndex
+
+DOMAINS = ["todo list", "recipe sharing", "fitness tracker", "expense tracker", "study room booking",
+           "event ticketing", "pet adoption", "job board", "hotel reservation", "library catalog",
+           "car rental", "music streaming", "online quiz", "inventory management", "help desk ticketing",
+           "food delivery", "real estate listing", "language learning", "volunteer scheduling", "photo gallery"]
+STACKS = ["React and Firebase", "Vue and Supabase", "Django and PostgreSQL", "Flutter", "Angular and Spring Boot",
+          "Next.js and Prisma", "Flask and MongoDB", "Laravel and MySQL"]
+# Never stored, so an "other stack" query has no right answer in the index
+HELD_OUT_STACKS = ["SwiftUI", "Kotlin and Room", "Ruby on Rails and Redis"]
+FEATURES = ["user authentication", "push notifications", "an admin dashboard", "payment processing",
+            "search and filters", "a reporting module", "offline support", "role based access",
+            "email reminders", "a public REST API", "dark mode", "file uploads"]
+# Same meaning, different word forms
+FEATURE_PARAPHRASES = {
+    "user authentication": "user login", "push notifications": "push notification support",
+    "an admin dashboard": "admin dashboards", "payment processing": "payments",
+    "search and filters": "filtering and search", "a reporting module": "reports",
+    "offline support": "offline mode", "role based access": "role-based access control",
+    "email reminders": "reminder emails", "a public REST API": "a REST API", "dark mode": "a dark theme",
+    "file uploads": "uploading files",
+}
+PARAPHRASE_TEMPLATES = ["{} site ({}) with {}", "a {} tool in {} with {}", "{} web app, {} stack, with {}"]
+OPENERS = ["build a {} app with {}", "create a {} application using {}", "develop a {} platform on {}",
+           "we need a {} system built with {}", "make a simple {} website in {}"]
+
+
+def description(rng, domain, stack, features, opener=None):
+    text = (opener or rng.choice(OPENERS)).format(domain, stack)
+    return f"{text} that has {' and '.join(features)}"
+
+
+def paraphrase(rng, domain, stack, features):
+    domain = domain.replace("tracker", "tracking").replace("booking", "bookings").replace("listing", "listings")
+    features = " and ".join(FEATURE_PARAPHRASES[feature] for feature in reversed(features))
+    return rng.choice(PARAPHRASE_TEMPLATES).format(domain, stack.replace(" and ", " + "), features)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+
+    print(f"{'entries':>7} {'p50 ms':>7} {'p95 ms':>7} {'memory MiB':>11} "
+          f"{'reworded hit':>13} {'paraphrased hit':>16} {'other stack hit':>16} {'unrelated hit':>14}")
+    for size in args.sizes:
+        rng = random.Random(42)
+        index = SimilarPlanIndex(os.path.join(tempfile.mkdtemp(prefix="similar-plans-"), "plans.sqlite3"),
+                                 threshold=args.threshold, max_entries=size)
+        stored = []
+        for _ in range(size):
+            spec = (rng.choice(DOMAINS), rng.choice(STACKS), rng.sample(FEATURES, 2))
+            stored.append(spec)
+            index.add(description(rng, *spec), "[]")
+        index.lookup("warm up")  # loads every stored vector
+
+        queries = {"reworded": [], "paraphrased": [], "other stack": [], "unrelated": []}
+        for _ in range(args.queries):
+            domain, stack, features = rng.choice(stored)
+            queries["reworded"].append(description(rng, domain, stack, list(reversed(features))))
+            queries["paraphrased"].append(paraphrase(rng, domain, stack, features))
+            other = rng.choice(HELD_OUT_STACKS)
+            queries["other stack"].append(description(rng, domain, other, features))
+            queries["unrelated"].append(f"a {rng.choice(['chemistry', 'robotics', 'gardening'])} club "
+                                        f"{rng.choice(['newsletter', 'scoreboard', 'wiki'])} for {rng.randrange(100)} members")
+
+        latencies = []
+        hits = {}
+        for name, texts in queries.items():
+            hits[name] = 0
+            for text in texts:
+                start = time.perf_counter()
+                plan, _ = index.lookup(text)
+                latencies.append(time.perf_counter() - start)
+                hits[name] += plan is not None
+        print(f"{size:>7} {percentile(latencies, 50) * 1e3:>7.2f} {percentile(latencies, 95) * 1e3:>7.2f} "
+              f"{index.memory_bytes() / 2**20:>11.1f} {hits['reworded']:>9}/{args.queries} {hits['paraphrased']:>12}/{args.queries} "
+              f"{hits['other stack']:>12}/{args.queries} {hits['unrelated']:>10}/{args.queries}")
+
+
+if __name__ == "__main__":
+    main()
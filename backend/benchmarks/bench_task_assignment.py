@@ -0,0 +1,88 @@
+"""Old per-task assign_user scan vs the heap-based AssignmentEngine.
+
+For each team size and plan size it builds a synthetic roster (a role mix
+like the frontend's role picker) and a plan with task types and hour
+estimates in the proportions Gemini tends to produce. It then times three
+assigners: the old scan (task count balancing), the engine in plan order,
+and the engine with LPT. It also prints each one's makespan (the busiest
+member's hours) and total hours / team size, a lower bound that ignores roles.
+
+Usage: python backend/benchmarks/bench_task_assignment.py [--members 5 100 500] [--tasks 35 1000 5000]
+"""
+import argparse
+import random
+
+from common import time_per_call
+from task_assignment import AssignmentEngine, ROLE_KEYWORDS
+
+ROLES = ["Frontend Developer", "Backend Developer", "Software Engineer", "UI/UX Designer", "QA Engineer",
+         "DevOps Engineer", "Project Manager", "Business Analyst", "Technical Writer", "Data Analyst"]
+TASK_TYPES = ["development"] * 6 + ["frontend", "backend"] * 3 + ["design", "testing"] * 2 + [
+    "devops", "documentation", "research", "planning", "review", "deployment", "meeting"]
+HOURS = [0.5, 1, 2, 3, 4, 6, 8, 16, 24, 40]
+
+
+def legacy_assign(task, team_members, member_roles, assignments):
+    """What assign_user did: rebuild the role map and rescan every member for every task"""
+    role_map = {task_type: list(keywords) for task_type, keywords in ROLE_KEYWORDS.items()}
+    possible_roles = role_map.get(task.get("type", "other").lower(), [])
+    eligible_users = []
+    if possible_roles:
+        for user, role in member_roles.items():
+            if any(keyword in role.lower() for keyword in possible_roles):
+                eligible_users.append(user)
+    if not eligible_users:
+        for user, role in member_roles.items():
+            if "developer" in role.lower() or "engineer" in role.lower():
+                eligible_users.append(user)
+    if not eligible_users:
+        eligible_users = list(team_members)
+    if not eligible_users:
+        return "Unassigned"
+    eligible_assignments = {u: assignments.get(u, 0) for u in eligible_users}
+    return min(eligible_assignments, key=eligible_assignments.get)
+
+
+def legacy_plan(plan, names, roles):
+    assignments = {name: 0 for name in names}
+    hours = {name: 0.0 for name in names}
+    for task in plan:
+        user = legacy_assign(task, names, roles, assignments)
+        assignments[user] += 1
+        hours[user] += task["hours"]
+    return max(hours.values())
+
+
+def engine_plan(plan, names, roles, strategy):
+    engine = AssignmentEngine(names, roles)
+    engine.assign_all([(task["type"], task["hours"]) for task in plan], strategy)
+    return engine.makespan()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--members", type=int, nargs="+", default=[5, 100, 500])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[35, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'members':>7} {'tasks':>6} {'ideal h':>8} | {'legacy ms':>10} {'makespan':>9} | "
+          f"{'greedy ms':>10} {'makespan':>9} | {'lpt ms':>8} {'makespan':>9}")
+    for n_members in args.members:
+        names = [f"member{i}" for i in range(n_members)]
+        roles = {name: ROLES[i % len(ROLES)] for i, name in enumerate(names)}
+        for n_tasks in args.tasks:
+            plan = [{"type": rng.choice(TASK_TYPES), "hours": rng.choice(HOURS)} for _ in range(n_tasks)]
+            ideal = sum(task["hours"] for task in plan) / n_members
+            row = []
+            for fn in (lambda: legacy_plan(plan, names, roles),
+                       lambda: engine_plan(plan, names, roles, "greedy"),
+                       lambda: engine_plan(plan, names, roles, "lpt")):
+                ms = min(time_per_call(fn, args.repeat)) * 1e3
+                row.append(f"{ms:>10.2f} {fn():>9.1f}")
+            print(f"{n_members:>7} {n_tasks:>6} {ideal:>8.1f} | " + " | ".join(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Expected hours for duration strings, through both parse_duration_hours and parse_duration_series.
+
+Covers the plain forms Gemini and the historical CSV use ('2h', '1.5 hours',
+'2h 30m'), articles and halves ('an hour', 'half a day', '2 and a half
+hours'), rates ('2 hours per day for a week'), strings that must not parse
+('2 months') and missing values. Exits non-zero if any case is wrong.
+
+Usage: python backend/benchmarks/check_duration_parser.py
+"""
+import math
+import sys
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+from duration_parser import parse_duration_hours, parse_duration_series
+
+DEFAULT = 2.0
+CASES = [
+    # plain amounts and units
+    ("2h", 2.0), ("1.5 hours", 1.5), (".5h", 0.5), ("30 mins", 0.5), ("45 minutes", 0.75),
+    ("2 days", 16.0), ("1 week", 40.0), ("2h 30m", 2.5), ("1 day 4 hours", 12.0), ("3 HRS", 3.0),
+    ("about 3 hours", 3.0), ("1-2 days", 16.0),  # a range counts its last amount
+    # articles and halves
+    ("an hour", 1.0), ("a day", 8.0), ("a week", 40.0), ("half a day", 4.0), ("half an hour", 0.5),
+    ("half-day", 4.0), ("half day", 4.0), ("a half hour", 0.5), ("2 and a half hours", 2.5),
+    ("an hour and a half", 1.5), ("1 day and a half", 12.0),
+    # rates scale by the rest of the string instead of adding to it
+    ("2 hours per day for a week", 10.0), ("2 hours a day for 2 weeks", 20.0), ("2h/day for 3 days", 6.0),
+    ("30 mins daily for a week", 2.5), ("1 day a week for 4 weeks", 32.0), ("2 hours per day", 2.0),
+    ("an hour each day for half a week", 2.5),
+    # nothing recognizable: the default
+    ("2 months", DEFAULT), ("soon", DEFAULT), ("", DEFAULT), ("half", DEFAULT), ("on behalf of the team", DEFAULT),
+    # numbers pass through, missing values are NaN
+    (3, 3.0), (1.25, 1.25), (None, math.nan), (float("nan"), math.nan),
+]
+
+
+def same(got, want):
+    return (math.isnan(got) and math.isnan(want)) or abs(got - want) < 1e-9
+
+
+def main():
+    failures = []
+    series = parse_duration_series([value for value, _ in CASES], default=DEFAULT)
+    for (value, want), vectorized in zip(CASES, series):
+        got = parse_duration_hours(value, default=DEFAULT)
+        status = "ok" if same(got, want) and same(vectorized, want) else "FAIL"
+        print(f"{value!r:<42} {want:>7.3f} {got:>7.3f} {vectorized:>7.3f}  {status}")
+        if status != "ok":
+            failures.append(value)
+
+    if failures:
+        sys.exit(f"\nFAIL: {len(failures)} of {len(CASES)} cases: {failures}")
+    print(f"\nPASS: all {len(CASES)} duration cases")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Parity check: the old per-row keyword cascade vs the compiled task-type classifier.
+
+The old path is what training and the API did before task_classifier existed:
+Series.apply of the any(word in title) cascade (kept as
+task_classifier._classify_task_type_reference). The new paths are
+classify_task_type (the API) and classify_task_types (training, which
+factorizes titles and maps missing ones through classify_task_type(None)).
+
+Runs a fixed list of edge titles through all three paths: empty, None, NaN,
+the string "None", case variants, keywords hidden inside other words, and
+titles that mix keywords of several types, where precedence decides. It
+also checks every title in the historical tasks file (--csv, default
+ml_model/tasks.csv) when that file exists. Exits non-zero if any title is
+classified differently.
+
+Usage: python backend/benchmarks/check_task_classifier.py [--csv path/to/tasks.csv]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from common import ML_MODEL_DIR
+from task_classifier import _classify_task_type_reference, classify_task_type, classify_task_types
+
+EDGE_TITLES = [
+    "", " ", None, np.nan, float("nan"), "None", "none", "nan", "NaN",
+    "build ui", "Build UI", "UI", "ui", "UX review", "BUILD", "QA",
+    # keywords inside other words still count (substring match)
+    "Guide new hires", "Quarterly planning", "Fixture cleanup", "Codebase tour", "Meetup notes",
+    # several types at once: the earliest type in TASK_TYPE_KEYWORDS wins
+    "Fix UI bug", "Research and build prototype", "Review design mockups", "Test the deploy code",
+    "Discuss QA results", "Implement wireframe feedback after meeting",
+    # no keyword at all
+    "Write quarterly report", "Deploy to production", "12345", "Émail the ÜI team", "\tbuild\n",
+]
+
+
+def compare(titles):
+    """Returns a list of (title, old, scalar, vectorized) rows where the paths disagree"""
+    titles = pd.Series(titles, dtype=object)
+    old = titles.apply(_classify_task_type_reference)
+    vectorized = classify_task_types(titles)
+    mismatches = []
+    for title, want, fast in zip(titles, old, vectorized):
+        scalar = classify_task_type(title)
+        if not (want == scalar == fast):
+            mismatches.append((title, want, scalar, fast))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--csv", default=os.path.join(ML_MODEL_DIR, "tasks.csv"),
+                        help="Also check every title in this tasks CSV, if it exists")
+    args = parser.parse_args()
+
+    print(f"{'title':<44} {'old':<12} {'new':<12}")
+    for title in EDGE_TITLES:
+        print(f"{title!r:<44} {_classify_task_type_reference(title):<12} {classify_task_type(title):<12}")
+
+    mismatches = compare(EDGE_TITLES)
+    checked = len(EDGE_TITLES)
+    if os.path.exists(args.csv):
+        titles = pd.read_csv(args.csv, usecols=["title"])["title"]
+        mismatches += compare(titles)
+        checked += len(titles)
+
+    if mismatches:
+        for title, old, scalar, vectorized in mismatches[:20]:
+            print(f"❌ {title!r}: old={old}, scalar={scalar}, vectorized={vectorized}")
+        sys.exit(f"FAIL: {len(mismatches)} of {checked} titles classified differently")
+    print(f"\nPASS: old and new classifiers agree on all {checked} titles")
+
+
+if __name__ == "__main__":
+    main()
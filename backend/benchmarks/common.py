@@ -0,0 +1,63 @@
+"""Shared helpers for the backend benchmark scripts.
+
+Run benchmarks from the repository root or from backend/, e.g.
+    python backend/benchmarks/bench_batch_estimate.py
+"""
+import os
+import random
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ML_MODEL_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "ml_model")
+
+# Let benchmarks import backend modules directly
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def load_app():
+    """Import backend/app.py the way the server does (artifacts are loaded relative to backend/)"""
+    os.chdir(BACKEND_DIR)
+    import app
+    return app
+
+
+def synthetic_tasks(n, seed=42):
+    """Fixed synthetic estimate inputs built from the training templates"""
+    if ML_MODEL_DIR not in sys.path:
+        sys.path.insert(0, ML_MODEL_DIR)
+    import pandas as pd
+    from train_duration_model import generate_synthetic_data
+
+    templates = generate_synthetic_data(pd.DataFrame()).to_dict("records")
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(n):
+        template = templates[rng.randrange(len(templates))]
+        tasks.append({
+            # Vary the title length a little so rows aren't all identical
+            "title": template["title"] + (" phase %d" % rng.randrange(10) if i % 3 else ""),
+            "priority": template["priority"],
+            "assignee": template["assigned_user"],
+        })
+    return tasks
+
+
+def time_per_call(fn, repeat):
+    """Run fn `repeat` times and return the individual call latencies in seconds"""
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
@@ -0,0 +1,169 @@
+"""Local stand-in for the Gemini generateContent and streamGenerateContent APIs.
+
+Serves a canned task plan with a configurable delay so call_gemini, the
+connection pool and anything wrapped around them can be load-tested without
+quota. Generation speed is simulated as --chunk-delay seconds per
+--chunk-chars characters: the streaming endpoint sends each fragment as an SSE
+event when it is "generated", the plain endpoint answers once all are done. Point the backend at it with
+    GEMINI_API_BASE=http://127.0.0.1:8765 python app.py
+
+It can also misbehave on purpose: scripted status codes, a requests-per-second
+quota answered with 429, and a Retry-After header on errors.
+
+Usage: python backend/benchmarks/gemini_stub.py [--port 8765] [--delay 0.05] [--quota 2 --retry-after 1]
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TASK_TYPES = ["research", "design", "development", "testing", "deployment"]
+
+
+def canned_plan(n_tasks=30):
+    """JSON text shaped like a real Gemini plan"""
+    tasks = [{
+        "title": f"{TASK_TYPES[i % len(TASK_TYPES)].capitalize()} step {i + 1}",
+        "priority": ["high", "medium", "low"][i % 3],
+        "estimatedDuration": f"{i % 5 + 1} hours" if i % 4 else f"{i % 3 + 1} days",
+        "type": TASK_TYPES[i % len(TASK_TYPES)],
+        "assigned_user": "Unassigned",
+    } for i in range(n_tasks)]
+    return json.dumps(tasks, indent=2)
+
+
+class GeminiStubHandler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real API; without TCP_NODELAY the separate header and body
+    # writes on a reused connection stall on delayed ACKs
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        # Stand-in for the TLS handshake a new connection to the real API pays
+        time.sleep(self.server.handshake_delay)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        server = self.server
+        server.count_request()
+        time.sleep(server.delay)
+
+        status = server.next_status()
+        fragments = server.fragments()
+        if status == 200 and "streamGenerateContent" in self.path:
+            self.stream_fragments(fragments)
+            return
+        if status == 200:
+            time.sleep(server.chunk_delay * len(fragments))
+            body = {"candidates": [{"content": {"parts": [{"text": server.plan}]}, "finishReason": "STOP"}]}
+        else:
+            body = {"error": {"code": status, "message": "stub error"}}
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if status != 200 and server.retry_after is not None:
+            self.send_header("Retry-After", str(server.retry_after))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def stream_fragments(self, fragments):
+        """Send each fragment as an SSE event using chunked transfer encoding"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for index, fragment in enumerate(fragments):
+            time.sleep(self.server.chunk_delay)
+            candidate = {"content": {"parts": [{"text": fragment}], "role": "model"}}
+            if index == len(fragments) - 1:
+                candidate["finishReason"] = "STOP"
+            self.write_chunk(f"data: {json.dumps({'candidates': [candidate]})}\r\n\r\n".encode())
+        self.write_chunk(b"")
+
+    def write_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GeminiStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, delay=0.05, handshake_delay=0.0, n_tasks=30, statuses=None,
+                 chunk_chars=200, chunk_delay=0.0, quota_per_second=None, retry_after=None):
+        super().__init__(address, GeminiStubHandler)
+        self.delay = delay
+        self.handshake_delay = handshake_delay
+        self.plan = canned_plan(n_tasks)
+        self.chunk_chars = chunk_chars
+        self.chunk_delay = chunk_delay
+        # Optional scripted status codes (e.g. [503, 503, 200]); 200 once exhausted
+        self.statuses = list(statuses or [])
+        # Optional quota: requests beyond this many in the last second get a 429
+        self.quota_per_second = quota_per_second
+        self.retry_after = retry_after
+        self.requests = 0
+        self.status_counts = {}
+        self._recent = []
+        self._lock = threading.Lock()
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def next_status(self):
+        with self._lock:
+            if self.statuses:
+                status = self.statuses.pop(0)
+            else:
+                status = 200
+                if self.quota_per_second:
+                    now = time.monotonic()
+                    self._recent = [t for t in self._recent if now - t < 1.0]
+                    if len(self._recent) >= self.quota_per_second:
+                        status = 429
+                    else:
+                        self._recent.append(now)
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+            return status
+
+    def fragments(self):
+        return [self.plan[i:i + self.chunk_chars] for i in range(0, len(self.plan), self.chunk_chars)]
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_stub(port=0, **kwargs):
+    """Start a stub server on a background thread; returns the server (call .shutdown() to stop)"""
+    server = GeminiStubServer(("127.0.0.1", port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.05, help="Seconds before each response")
+    parser.add_argument("--handshake-delay", type=float, default=0.0, help="Extra seconds per new connection")
+    parser.add_argument("--tasks", type=int, default=30, help="Tasks in the canned plan")
+    parser.add_argument("--chunk-chars", type=int, default=200, help="Characters per generated fragment")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="Seconds to generate each fragment")
+    parser.add_argument("--quota", type=float, help="Requests per second before answering 429")
+    parser.add_argument("--retry-after", type=int, help="Retry-After seconds sent with error responses")
+    args = parser.parse_args()
+
+    server = GeminiStubServer(("127.0.0.1", args.port), delay=args.delay,
+                              handshake_delay=args.handshake_delay, n_tasks=args.tasks,
+                              chunk_chars=args.chunk_chars, chunk_delay=args.chunk_delay,
+                              quota_per_second=args.quota, retry_after=args.retry_after)
+    print(f"Gemini stub listening on {server.base_url}")
+    server.serve_forever()
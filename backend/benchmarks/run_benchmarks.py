@@ -0,0 +1,230 @@
+"""Benchmark suite for the duration-estimation hot path.
+
+Covers, on fixed synthetic inputs (see common.synthetic_tasks):
+  load      cold-start artifact load in a fresh process (pickle and mmap paths)
+  single    p50/p95/p99 latency of estimate_task_duration, uncached and cached
+  batch     estimate_task_durations throughput at several batch sizes
+  endpoint  p50/p95/p99 of POST /api/estimate-duration through the Flask test client
+
+Results are written as JSON to backend/benchmarks/results/ (one file per run,
+named after the time and git commit). Pass --baseline with an earlier result
+file to print the change per metric; --fail-on-regression makes the run exit
+non-zero when any metric is worse than --threshold percent.
+
+Usage:
+    python backend/benchmarks/run_benchmarks.py
+    python backend/benchmarks/run_benchmarks.py --baseline backend/benchmarks/results/<file>.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+
+from common import BACKEND_DIR, load_app, percentile, synthetic_tasks, time_per_call
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_BATCH_SIZES = [1, 10, 100, 1000]
+
+# Metrics where a bigger number is better; everything else is a time or size
+HIGHER_IS_BETTER = ("rows_per_second",)
+
+
+def latency_summary(latencies):
+    """p50/p95/p99/mean of a list of call latencies, in microseconds"""
+    micros = [seconds * 1e6 for seconds in latencies]
+    return {
+        "p50_us": percentile(micros, 50),
+        "p95_us": percentile(micros, 95),
+        "p99_us": percentile(micros, 99),
+        "mean_us": sum(micros) / len(micros),
+        "calls": len(micros),
+    }
+
+
+def bench_load(runs):
+    """Median cold-start load of each artifact path, each run in its own interpreter"""
+    from bench_model_load import measure
+    from model_loader import load_duration_model
+
+    # Build the compiled artifact first so the mmap path is timed in steady state
+    load_duration_model(os.path.join(BACKEND_DIR, "duration_artifacts.pkl"))
+    results = {}
+    for mode in ("pickle", "mmap"):
+        samples = [measure(mode) for _ in range(runs)]
+        results[mode] = {
+            "seconds": sorted(s["seconds"] for s in samples)[len(samples) // 2],
+            "rss_delta_bytes": sorted(s["rss_delta"] for s in samples)[len(samples) // 2],
+        }
+    return results
+
+
+def bench_single(app, tasks):
+    """Per-call latency of estimate_task_duration with a cold and a warm estimate cache"""
+    uncached = []
+    for task in tasks:
+        app.estimate_cache.clear()
+        start = time.perf_counter()
+        app.estimate_task_duration(task["title"], task["priority"], task["assignee"])
+        uncached.append(time.perf_counter() - start)
+
+    # Warm the cache, then time the same inputs again as pure hits
+    for task in tasks:
+        app.estimate_task_duration(task["title"], task["priority"], task["assignee"])
+    cached = []
+    for task in tasks:
+        start = time.perf_counter()
+        app.estimate_task_duration(task["title"], task["priority"], task["assignee"])
+        cached.append(time.perf_counter() - start)
+
+    return {"uncached": latency_summary(uncached), "cached": latency_summary(cached)}
+
+
+def bench_batch(app, sizes, repeat):
+    """Best-of-repeat throughput of estimate_task_durations, measured without cache hits"""
+    results = {}
+    for size in sizes:
+        tasks = synthetic_tasks(size, seed=size)
+
+        def run():
+            app.estimate_cache.clear()
+            app.estimate_task_durations(tasks)
+
+        best = min(time_per_call(run, repeat))
+        results[str(size)] = {"seconds": best, "rows_per_second": size / best}
+    return results
+
+
+def bench_endpoint(app, tasks):
+    """End-to-end latency of POST /api/estimate-duration, including JSON and routing"""
+    client = app.app.test_client()
+    app.estimate_cache.clear()
+    latencies = []
+    for task in tasks:
+        start = time.perf_counter()
+        response = client.post("/api/estimate-duration", json=task)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/estimate-duration returned {response.status_code}: {response.get_data(True)}")
+    return latency_summary(latencies)
+
+
+def environment(app):
+    import numpy as np
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    model = app.duration_models.get()
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "model_version": model.version if model else None,
+        "compiled": bool(model and model.engine),
+    }
+
+
+def flatten(results, prefix=""):
+    """{'single': {'uncached': {'p50_us': 1}}} -> {'single.uncached.p50_us': 1}"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and key != "calls":
+            flat[name] = value
+    return flat
+
+
+def compare(current, baseline, threshold):
+    """Print each metric's change against the baseline; returns the names that regressed"""
+    now = flatten(current["results"])
+    before = flatten(baseline["results"])
+    regressions = []
+    print(f"\nAgainst baseline {baseline['environment'].get('commit')} ({baseline['timestamp']}):")
+    print(f"{'metric':<40} {'baseline':>14} {'current':>14} {'change':>9}")
+    for name in sorted(now.keys() & before.keys()):
+        old, new = before[name], now[name]
+        if not old:
+            continue
+        change = (new - old) / old * 100
+        worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+        flag = "  REGRESSION" if worse > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<40} {old:>14.6g} {new:>14.6g} {change:>+8.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the duration-estimation hot path")
+    parser.add_argument("--calls", type=int, default=2000, help="Calls for the single and endpoint benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES, help="Batch sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repeats per batch size (best is kept)")
+    parser.add_argument("--load-runs", type=int, default=5, help="Fresh-process runs for the load benchmark")
+    parser.add_argument("--skip-load", action="store_true", help="Skip the (slow) cold-start benchmark")
+    parser.add_argument("--output", help="Result file (default: results/<timestamp>-<commit>.json)")
+    parser.add_argument("--baseline", help="Earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Percent change counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if any metric regressed")
+    args = parser.parse_args()
+    # load_app() changes into backend/, so resolve user paths first
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+
+    # sklearn warns about missing feature names when the model isn't compiled
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    app = load_app()
+    if not app.duration_models.warm_up():
+        raise SystemExit("duration_artifacts.pkl could not be loaded")
+
+    tasks = synthetic_tasks(args.calls)
+    results = {}
+    if not args.skip_load:
+        print("Timing cold-start model load...")
+        results["load"] = bench_load(args.load_runs)
+    print("Timing single estimates...")
+    results["single"] = bench_single(app, tasks)
+    print("Timing batch estimates...")
+    results["batch"] = bench_batch(app, args.sizes, args.repeat)
+    print("Timing /api/estimate-duration...")
+    results["endpoint"] = bench_endpoint(app, tasks)
+
+    env = environment(app)
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": env,
+        "config": {"calls": args.calls, "sizes": args.sizes, "repeat": args.repeat, "load_runs": args.load_runs},
+        "results": results,
+    }
+
+    print(f"\n{'metric':<40} {'value':>14}")
+    for name, value in flatten(results).items():
+        print(f"{name:<40} {value:>14.6g}")
+
+    output = output or os.path.join(
+        RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{env['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results written to {output}")
+
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n⚠️ {len(regressions)} metric(s) regressed by more than {args.threshold}%")
+            if args.fail_on_regression:
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Array-backed evaluator for the GradientBoostingRegressor duration model.
+
+sklearn's predict() re-validates its input and walks the 100+ fitted trees one
+estimator at a time, which costs far more than the arithmetic for the 1-row
+and small-batch predictions the API makes. CompiledGradientBoosting flattens
+every tree into a few packed NumPy arrays and walks all trees at once, one
+depth level per step.
+
+Walking trees still costs (rows x trees x depth) gathers, which loses to
+sklearn's C loop on large batches. But a tree ensemble only ever compares a
+feature against its own split thresholds, so the prediction depends only on
+which gap between thresholds each feature falls in. When the grid of gaps is
+small (the duration features are a few small integers), every cell is
+predicted once up front and a batch becomes one searchsorted per feature and
+one table lookup.
+"""
+import numpy as np
+
+
+class CompiledGradientBoosting:
+    """Packed-array copy of a fitted GradientBoostingRegressor.
+
+    Node arrays hold every tree back to back:
+        feature[n]    feature index compared at node n (0 for leaves)
+        threshold[n]  go left when x[feature] <= threshold
+        children[n]   (left, right) node ids; leaves point at themselves
+        value[n]      leaf output already scaled by the learning rate
+    roots[t] is the node id of tree t's root.
+    """
+
+    # Rows evaluated per vectorized pass; keeps the (rows x trees) working set in cache
+    CHUNK_ROWS = 256
+    # Largest threshold grid worth precomputing (8 bytes per cell)
+    MAX_TABLE_CELLS = 1 << 16
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth, init_value, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.init_value = float(init_value)
+        self.n_features = int(n_features)
+        self._build_table()
+
+    def _build_table(self):
+        """Precompute the prediction for every cell of the split-threshold grid, if it is small"""
+        self.split_points = self.table = self.table_strides = None
+        is_split = self.children[:, 0] != np.arange(len(self.value))
+        split_points, representatives = [], []
+        for f in range(self.n_features):
+            points = np.unique(self.threshold[is_split & (self.feature == f)])
+            # One float32 value per gap: the largest at or below each threshold, then one above the last
+            reps = points.astype(np.float32)
+            reps = np.where(reps > points, np.nextafter(reps, np.float32(-np.inf)), reps)
+            top = np.float32(points[-1]) if len(points) else np.float32(0)
+            if len(points) and top <= points[-1]:
+                top = np.nextafter(top, np.float32(np.inf))
+            reps = np.append(reps, top).astype(np.float32)
+            if not np.array_equal(np.searchsorted(points, reps.astype(np.float64)), np.arange(len(reps))):
+                return  # two thresholds closer than float32 can tell apart; keep walking trees
+            split_points.append(points)
+            representatives.append(reps)
+
+        shape = [len(reps) for reps in representatives]
+        if np.prod(shape, dtype=np.float64) > self.MAX_TABLE_CELLS:
+            return
+        grid = np.stack([axis.ravel() for axis in np.meshgrid(*representatives, indexing="ij")], axis=1)
+        self.table = self._walk(grid)
+        self.table_strides = np.array([int(np.prod(shape[f + 1:])) for f in range(self.n_features)], dtype=np.intp)
+        self.split_points = split_points
+
+    @classmethod
+    def from_model(cls, model):
+        """Flatten a fitted sklearn GradientBoostingRegressor"""
+        # Imported here so serving a precompiled model never loads sklearn
+        from sklearn.dummy import DummyRegressor
+
+        if model.estimators_.shape[1] != 1:
+            raise ValueError("Only single-output regressors can be compiled")
+
+        # Baseline prediction: the 'zero' init or a constant DummyRegressor
+        if isinstance(model.init_, str) and model.init_ == "zero":
+            init_value = 0.0
+        elif isinstance(model.init_, DummyRegressor):
+            init_value = float(np.ravel(model.init_.constant_)[0])
+        else:
+            raise ValueError(f"Unsupported init estimator: {model.init_!r}")
+
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_[:, 0]:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            children.append(np.column_stack([left, right]))
+            values.append(tree.value[:, 0, 0] * model.learning_rate)
+            roots.append(offset)
+
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            children=np.ascontiguousarray(np.concatenate(children), dtype=np.intp),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            init_value=init_value,
+            n_features=model.n_features_in_,
+        )
+
+    ARRAY_FIELDS = ("feature", "threshold", "children", "value", "roots")
+
+    def to_arrays(self):
+        """Plain dict of arrays and scalars, suitable for joblib.dump"""
+        data = {name: getattr(self, name) for name in self.ARRAY_FIELDS}
+        data.update(max_depth=self.max_depth, init_value=self.init_value, n_features=self.n_features)
+        return data
+
+    @classmethod
+    def from_arrays(cls, data):
+        """Rebuild from to_arrays() output; arrays are used as-is (they may be read-only memmaps)"""
+        # np.asarray drops the np.memmap subclass (and its per-op overhead) but keeps the mapping
+        return cls(**{name: np.asarray(data[name]) for name in cls.ARRAY_FIELDS},
+                   max_depth=data["max_depth"], init_value=data["init_value"], n_features=data["n_features"])
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.ARRAY_FIELDS)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def predict(self, X):
+        """Predict a 2-D batch of feature rows"""
+        # sklearn trees compare float32 features against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected rows with {self.n_features} features, got shape {X.shape}")
+        if self.table is not None:
+            return self._predict_table(X)
+        return self._walk(X)
+
+    def _predict_table(self, X):
+        cells = np.zeros(X.shape[0], dtype=np.intp)
+        for f, points in enumerate(self.split_points):
+            column = X[:, f].astype(np.float64)
+            # Gap index = number of thresholds strictly below x, i.e. how many splits send x right.
+            # NaN never compares greater, so it goes left everywhere: gap 0
+            gaps = np.searchsorted(points, column)
+            gaps[np.isnan(column)] = 0
+            cells += gaps * self.table_strides[f]
+        return self.table[cells]
+
+    def _walk(self, X):
+        if X.shape[0] <= self.CHUNK_ROWS:
+            return self._predict_chunk(X)
+        return np.concatenate([
+            self._predict_chunk(X[start:start + self.CHUNK_ROWS])
+            for start in range(0, X.shape[0], self.CHUNK_ROWS)
+        ])
+
+    def _predict_chunk(self, X):
+        # Walk every (row, tree) pair at once using flat 1-D gathers, which are
+        # much cheaper than 2-D fancy indexing
+        n_rows = X.shape[0]
+        flat_x = X.ravel()
+        row_offsets = np.repeat(np.arange(n_rows) * self.n_features, self.n_trees)
+        children = self.children.ravel()
+        nodes = np.tile(self.roots, n_rows)
+        for _ in range(self.max_depth):
+            go_right = flat_x[row_offsets + self.feature[nodes]] > self.threshold[nodes]
+            nodes = children[2 * nodes + go_right]
+        return self.init_value + self.value[nodes].reshape(n_rows, self.n_trees).sum(axis=1)
+
+    def predict_one(self, row):
+        """Predict a single feature row and return a float"""
+        x = np.asarray(row, dtype=np.float32)
+        if x.shape != (self.n_features,):
+            raise ValueError(f"Expected {self.n_features} features, got shape {x.shape}")
+        if self.table is not None:
+            cell = 0
+            for f, points in enumerate(self.split_points):
+                value = float(x[f])
+                if value == value:  # NaN stays in gap 0
+                    cell += int(np.searchsorted(points, value)) * int(self.table_strides[f])
+            return float(self.table[cell])
+
+        nodes = self.roots
+        for _ in range(self.max_depth):
+            go_right = x[self.feature[nodes]] > self.threshold[nodes]
+            nodes = self.children[nodes, go_right.view(np.int8)]
+        return self.init_value + float(self.value[nodes].sum())
@@ -0,0 +1,65 @@
+"""Duration-string parser shared by /generate and model training.
+
+Finds every amount-unit pair ('2h', '1.5 hours', '30 mins', 'half a day',
+'an hour and a half') and sums them as weeks x 40, days x 8, hours x 1,
+minutes / 60. A pair followed by 'per day', '/day', 'daily' and so on is a
+rate and is scaled by the rest of the string: '2 hours per day for a week'
+is 10 hours. Strings with no recognizable duration return the default.
+"""
+import math
+import re
+
+HOURS_PER_UNIT = {"w": 40.0, "d": 8.0, "h": 1.0, "m": 1 / 60}
+
+_UNIT = r"w(?:ee)?ks?|d(?:ays?)?|h(?:ours?|rs?)?|m(?:in(?:ute)?s?)?"
+_DURATION_PATTERN = re.compile(
+    r"(?:(?P<number>\d+(?:\.\d+)?|\.\d+)(?P<and_half>\s+and\s+a\s+half)?"
+    r"|\b(?P<half>half)(?:[\s-]+an?)?[\s-]|\b(?P<article>an?)\s)\s*"
+    rf"(?P<unit>{_UNIT})(?![a-z])(?P<half_more>\s+and\s+a\s+half\b)?"
+    # Rate suffix: '2 hours per day', '2h/day', '2 hours a day', '2 hours daily'
+    r"(?:\s*(?:/|(?:per|an?|each|every)\s)\s*(?P<per>w(?:ee)?k|d(?:ay)?|h(?:ou)?r?)(?![a-z])"
+    r"|\s+(?P<per_word>weekly|daily|hourly)\b)?"
+)
+_PER_WORD_UNIT = {"weekly": "w", "daily": "d", "hourly": "h"}
+
+
+def parse_duration_hours(value, default=2.0):
+    """Hours for a duration string or number; default if nothing parses, NaN for missing values"""
+    if value is None:
+        return math.nan
+    if isinstance(value, bool):
+        return default
+    if isinstance(value, (int, float)):
+        return float(value) if not math.isnan(value) else math.nan
+
+    hours = 0.0
+    rates = []  # (hours, hours per period) for each '<duration> per <period>'
+    for match in _DURATION_PATTERN.finditer(str(value).lower()):
+        if match.group("number"):
+            amount = float(match.group("number")) + (0.5 if match.group("and_half") else 0.0)
+        else:
+            amount = 0.5 if match.group("half") else 1.0
+        if match.group("half_more"):
+            amount += 0.5
+        amount_hours = amount * HOURS_PER_UNIT[match.group("unit")[0]]
+        period = match.group("per") or _PER_WORD_UNIT.get(match.group("per_word"))
+        if period:
+            rates.append((amount_hours, HOURS_PER_UNIT[period[0]]))
+        else:
+            hours += amount_hours
+    if rates:
+        # '2 hours per day for a week': the other durations say how many periods the rate runs for
+        hours = sum(rate * (hours / period if hours else 1.0) for rate, period in rates)
+    return hours if hours > 0 else default
+
+
+def parse_duration_series(values, default=2.0):
+    """Vectorized parse_duration_hours for a pandas Series; missing values stay NaN"""
+    import numpy as np
+    import pandas as pd
+
+    values = pd.Series(values)
+    # Duration strings repeat heavily, so parse each distinct value once
+    codes, uniques = pd.factorize(values)
+    parsed = np.array([parse_duration_hours(value, default) for value in uniques] + [math.nan], dtype="float64")
+    return pd.Series(parsed[codes], index=values.index, dtype="float64")  # code -1 picks the trailing NaN
@@ -0,0 +1,114 @@
+"""Bounded concurrent fan-out of independent Firestore reads, plus Server-Timing.
+
+Listing projects needs one query per group and then one tasks (or count)
+read per project. None of these reads depend on each other, so running them
+one by one makes a dashboard cost the sum of every round trip. A FanOut runs
+them on a thread pool shared by all requests. A single map() call has at most
+`per_request` reads in flight, so one big dashboard can't starve the others.
+Results come back in input order, so callers merge them exactly as the
+serial loops did.
+
+The google-cloud-firestore client is thread-safe, so every thread shares the
+one client. Don't call map() from a function that is itself running on the
+pool: nested waits on a bounded pool can deadlock.
+
+ServerTiming records how long each stage of a request took and formats the
+Server-Timing response header, which shows up in the browser's network panel.
+"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+
+class FanOut:
+    """Shared thread pool for independent reads with a per-call concurrency cap"""
+
+    def __init__(self, max_workers=16, per_request=8):
+        self.max_workers = max(1, int(max_workers))
+        self.per_request = max(1, int(per_request))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="firestore-fanout")
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.reads = 0
+        self.peak_in_flight = 0
+        self._in_flight = 0
+
+    def _run(self, fn, item):
+        with self._lock:
+            self._in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+        try:
+            return fn(item)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def map(self, fn, items, limit=None):
+        """[fn(item) for item in items], run concurrently; the first exception is re-raised"""
+        items = list(items)
+        with self._lock:
+            self.calls += 1
+            self.reads += len(items)
+        if len(items) <= 1:
+            return [fn(item) for item in items]  # nothing to overlap, skip the thread hop
+
+        limit = max(1, min(limit or self.per_request, len(items)))
+        results = [None] * len(items)
+        pending = {}
+        queue = iter(enumerate(items))
+
+        def submit_next():
+            entry = next(queue, None)
+            if entry is not None:
+                pending[self._pool.submit(self._run, fn, entry[1])] = entry[0]
+
+        for _ in range(limit):
+            submit_next()
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+                    submit_next()
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+        return results
+
+    def call_all(self, *fns):
+        """Run zero-argument callables concurrently; returns their results in order"""
+        return self.map(lambda fn: fn(), fns)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "maxWorkers": self.max_workers,
+                "perRequest": self.per_request,
+                "calls": self.calls,
+                "reads": self.reads,
+                "inFlight": self._in_flight,
+                "peakInFlight": self.peak_in_flight,
+            }
+
+
+class ServerTiming:
+    """Per-stage wall-clock durations of one request, formatted as a Server-Timing header"""
+
+    def __init__(self):
+        self.stages = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def header(self):
+        entries = [f"{name};dur={seconds * 1e3:.1f}" for name, seconds in self.stages]
+        entries.append(f"total;dur={(time.perf_counter() - self._start) * 1e3:.1f}")
+        return ", ".join(entries)
@@ -0,0 +1,161 @@
+"""Pooled keep-alive HTTP client for the Gemini API.
+
+call_gemini used to call requests.post directly, so every generation and every
+retry opened a new TCP + TLS connection to generativelanguage.googleapis.com.
+GeminiClient keeps one requests.Session per process with a bounded urllib3
+connection pool, so calls (including retries) reuse warm connections.
+
+The pool blocks: when all pool_size connections are busy, an extra caller
+waits for one to come back instead of opening a throwaway connection. The
+wait is bounded by pool_timeout. A caller that times out gets PoolTimeout,
+a requests Timeout, so it takes the same retry-or-give-up path as a slow
+Gemini response.
+
+The pool's connection classes time their own connect(), which for HTTPS
+includes the TLS handshake. Each request records how many new connections it
+opened and how long those handshakes took, so stats() shows how much latency
+the reuse saves under concurrent load.
+"""
+import threading
+import time
+
+import functools
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import EmptyPoolError
+
+# Connect timings for the request running on this thread; connect() runs on the caller's thread
+_request_stats = threading.local()
+
+
+def _record_connect(seconds):
+    if getattr(_request_stats, "active", False):
+        _request_stats.new_connections += 1
+        _request_stats.handshake_seconds += seconds
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _record_connect(time.perf_counter() - start)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()  # TCP connect plus TLS handshake
+        _record_connect(time.perf_counter() - start)
+
+
+class PoolTimeout(requests.exceptions.Timeout):
+    """No pooled connection became free within pool_timeout"""
+
+
+class BoundedWaitMixin:
+    """Applies a default pool_timeout to urlopen (requests never passes one, so a blocking pool waits forever)"""
+
+    def __init__(self, *args, pool_timeout=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool_timeout = pool_timeout
+
+    def urlopen(self, method, url, *args, **kwargs):
+        if kwargs.get("pool_timeout") is None:
+            kwargs["pool_timeout"] = self.pool_timeout
+        return super().urlopen(method, url, *args, **kwargs)
+
+
+class TimedHTTPConnectionPool(BoundedWaitMixin, HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(BoundedWaitMixin, HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools hand out connections that time their handshakes"""
+
+    def __init__(self, *args, pool_timeout=None, **kwargs):
+        self.pool_timeout = pool_timeout  # read by init_poolmanager, which HTTPAdapter.__init__ calls
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": functools.partial(TimedHTTPConnectionPool, pool_timeout=self.pool_timeout),
+            "https": functools.partial(TimedHTTPSConnectionPool, pool_timeout=self.pool_timeout),
+        }
+
+
+class GeminiClient:
+    """Thread-safe pooled client; one instance is shared by every request in a worker"""
+
+    def __init__(self, pool_size=10, connect_timeout=5.0, read_timeout=180.0, pool_timeout=10.0):
+        self.pool_size = int(pool_size)
+        self.timeout = (float(connect_timeout), float(read_timeout))
+        self.pool_timeout = float(pool_timeout)
+        self.session = requests.Session()
+        # pool_block makes extra concurrent callers wait (up to pool_timeout) for a free connection
+        # instead of opening (and then discarding) connections beyond pool_size
+        adapter = TimedHTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True,
+                                   pool_timeout=self.pool_timeout)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.handshake_seconds = 0.0
+        self.request_seconds = 0.0
+        self.pool_timeouts = 0
+
+    def post(self, url, **kwargs):
+        """POST through the pool; returns (response, per-request connection stats)"""
+        kwargs.setdefault("timeout", self.timeout)
+        _request_stats.active = True
+        _request_stats.new_connections = 0
+        _request_stats.handshake_seconds = 0.0
+        start = time.perf_counter()
+        try:
+            response = self.session.post(url, **kwargs)
+        except EmptyPoolError as e:
+            with self._lock:
+                self.pool_timeouts += 1
+            raise PoolTimeout(f"No free Gemini connection within {self.pool_timeout}s ({self.pool_size} in use)") from e
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.active = False
+            request_stats = {
+                "newConnections": _request_stats.new_connections,
+                "handshakeSeconds": _request_stats.handshake_seconds,
+                "seconds": elapsed,
+            }
+            with self._lock:
+                self.requests += 1
+                self.new_connections += request_stats["newConnections"]
+                self.handshake_seconds += request_stats["handshakeSeconds"]
+                self.request_seconds += elapsed
+        return response, request_stats
+
+    def stats(self):
+        with self._lock:
+            reused = self.requests - min(self.requests, self.new_connections)
+            return {
+                "poolSize": self.pool_size,
+                "connectTimeout": self.timeout[0],
+                "readTimeout": self.timeout[1],
+                "poolTimeout": self.pool_timeout,
+                "poolTimeouts": self.pool_timeouts,
+                "requests": self.requests,
+                "newConnections": self.new_connections,
+                "reusedConnections": reused,
+                "reuseRate": round(reused / self.requests, 4) if self.requests else 0.0,
+                "handshakeSeconds": round(self.handshake_seconds, 6),
+                "avgHandshakeMs": round(self.handshake_seconds / self.new_connections * 1e3, 3)
+                if self.new_connections else 0.0,
+                "avgRequestMs": round(self.request_seconds / self.requests * 1e3, 3) if self.requests else 0.0,
+            }
@@ -0,0 +1,219 @@
+"""Outbound rate limiter and circuit breaker for the Gemini API, shared by all workers.
+
+Every Gemini call takes a lease with acquire() and hands it back with
+release(lease, status_code, retry_after). All state lives in one small JSON
+file updated under flock, so every gunicorn worker sees the same budget:
+
+- Token bucket: calls start at `rate` per second with bursts of up to `burst`.
+- Concurrency limit: at most `limit` calls in flight across all workers.
+- AIMD: each success raises the rate and the limit a little. Each 429/503
+  halves both and blocks new calls for Retry-After, or for an exponential
+  backoff when the header is missing. Workers no longer retry on their own
+  schedules.
+- Circuit breaker: after `failure_threshold` consecutive failures the circuit
+  opens. acquire() then fails fast with ThrottledError until the cooldown
+  passes. After that one probe call is let through: success closes the
+  circuit, failure reopens it with twice the cooldown.
+
+acquire() waits up to max_wait seconds for a token or a slot and raises
+ThrottledError rather than wait longer, so callers never sleep through a long
+quota reset.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from email.utils import parsedate_to_datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: state is only shared between threads of one process
+    fcntl = None
+
+THROTTLE_STATUSES = (429, 503)
+FAILURE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class ThrottledError(Exception):
+    """A Gemini call was refused locally; retry_after is a hint in seconds"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"{reason} (retry after {retry_after:.0f}s)")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value):
+    """Retry-After header (delta seconds or HTTP date) -> seconds, or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class GeminiLimiter:
+    """Token bucket + AIMD concurrency limit + circuit breaker stored in a locked state file"""
+
+    def __init__(self, state_path, rate=2.0, min_rate=0.1, max_rate=10.0, burst=5, max_concurrency=8,
+                 failure_threshold=5, cooldown=30.0, max_cooldown=300.0, max_wait=10.0, lease_seconds=240.0):
+        self.state_path = state_path
+        self.initial_rate = float(rate)
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate)
+        self.burst = float(burst)
+        self.max_concurrency = float(max_concurrency)
+        self.failure_threshold = int(failure_threshold)
+        self.cooldown = float(cooldown)
+        self.max_cooldown = float(max_cooldown)
+        self.max_wait = float(max_wait)
+        # A lease not released by then (e.g. its worker died) stops counting as in flight
+        self.lease_seconds = float(lease_seconds)
+        self._thread_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(state_path)), exist_ok=True)
+
+    def _initial_state(self, now):
+        return {
+            "tokens": self.burst, "refilledAt": now, "rate": self.initial_rate,
+            "limit": self.max_concurrency, "leases": {}, "blockedUntil": 0.0,
+            "failures": 0, "circuit": "closed", "openUntil": 0.0, "cooldown": self.cooldown, "probe": None,
+            "granted": 0, "throttled": 0, "rejected": 0, "successes": 0, "errors": 0,
+        }
+
+    def _update(self, fn):
+        """Run fn(state, now) with the state file locked and save what it leaves in state"""
+        with self._thread_lock, open(self.state_path, "a+") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                now = time.time()
+                f.seek(0)
+                raw = f.read()
+                try:
+                    state = json.loads(raw) if raw else self._initial_state(now)
+                except ValueError:
+                    state = self._initial_state(now)
+                self._refill(state, now)
+                result = fn(state, now)
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f)
+                f.flush()
+                return result
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _refill(self, state, now):
+        elapsed = max(0.0, now - state["refilledAt"])
+        state["tokens"] = min(self.burst, state["tokens"] + elapsed * state["rate"])
+        state["refilledAt"] = now
+        state["leases"] = {lease: expiry for lease, expiry in state["leases"].items() if expiry > now}
+        if state["probe"] and state["probe"] not in state["leases"]:
+            state["probe"] = None
+
+    def acquire(self, max_wait=None):
+        """Take a lease for one Gemini call; raises ThrottledError instead of waiting past max_wait"""
+        deadline = time.monotonic() + (self.max_wait if max_wait is None else max_wait)
+        while True:
+            lease, wait, reason = self._update(self._try_acquire)
+            if lease:
+                return lease
+            remaining = deadline - time.monotonic()
+            if reason == "circuit open" or wait > remaining:
+                self._update(lambda state, now: state.__setitem__("rejected", state["rejected"] + 1))
+                raise ThrottledError(reason, wait)
+            time.sleep(min(wait, 0.25))
+
+    def _try_acquire(self, state, now):
+        """Returns (lease or None, seconds until worth retrying, reason)"""
+        if state["circuit"] == "open":
+            if now < state["openUntil"]:
+                return None, state["openUntil"] - now, "circuit open"
+            state["circuit"] = "half_open"
+        if state["circuit"] == "half_open" and state["probe"]:
+            # One probe at a time while half-open
+            return None, 1.0, "circuit half-open"
+        if now < state["blockedUntil"]:
+            return None, state["blockedUntil"] - now, "rate limited by Gemini"
+        if len(state["leases"]) >= max(1, int(state["limit"])):
+            return None, 0.1, "too many Gemini calls in flight"
+        if state["tokens"] < 1:
+            return None, (1 - state["tokens"]) / state["rate"], "outbound rate limit"
+
+        lease = uuid.uuid4().hex
+        state["tokens"] -= 1
+        state["leases"][lease] = now + self.lease_seconds
+        state["granted"] += 1
+        if state["circuit"] == "half_open":
+            state["probe"] = lease
+        return lease, 0.0, None
+
+    def release(self, lease, status_code=None, retry_after=None):
+        """Record a call's outcome; status_code None means it failed without a response"""
+        if lease:
+            self._update(lambda state, now: self._record(state, now, lease, status_code, parse_retry_after(retry_after)))
+
+    def _record(self, state, now, lease, status_code, retry_after):
+        state["leases"].pop(lease, None)
+        was_probe = state["probe"] == lease
+        if was_probe:
+            state["probe"] = None
+
+        failed = status_code is None or status_code in FAILURE_STATUSES
+        if not failed:
+            # Additive increase
+            state["successes"] += 1
+            state["failures"] = 0
+            state["rate"] = min(self.max_rate, state["rate"] + 0.1 * self.initial_rate)
+            state["limit"] = min(self.max_concurrency, state["limit"] + 1.0 / max(1.0, state["limit"]))
+            if state["circuit"] != "closed" and was_probe:
+                state["circuit"] = "closed"
+                state["cooldown"] = self.cooldown
+            return
+
+        state["errors"] += 1
+        state["failures"] += 1
+        if status_code in THROTTLE_STATUSES or status_code is None:
+            # Multiplicative decrease, and hold everyone off for the server's hint or a shared backoff
+            state["throttled"] += status_code in THROTTLE_STATUSES
+            state["rate"] = max(self.min_rate, state["rate"] / 2)
+            state["limit"] = max(1.0, state["limit"] / 2)
+            backoff = retry_after if retry_after is not None else min(60.0, 3.0 * 2 ** (state["failures"] - 1))
+            if status_code is not None:
+                state["blockedUntil"] = max(state["blockedUntil"], now + backoff)
+
+        if was_probe:
+            state["cooldown"] = min(self.max_cooldown, state["cooldown"] * 2)
+            self._open(state, now, retry_after)
+        elif state["circuit"] == "closed" and state["failures"] >= self.failure_threshold:
+            self._open(state, now, retry_after)
+
+    def _open(self, state, now, retry_after):
+        state["circuit"] = "open"
+        state["openUntil"] = now + max(state["cooldown"], retry_after or 0.0)
+
+    def stats(self):
+        def snapshot(state, now):
+            return {
+                "circuit": state["circuit"],
+                "openForSeconds": round(max(0.0, state["openUntil"] - now), 3) if state["circuit"] == "open" else 0.0,
+                "blockedForSeconds": round(max(0.0, state["blockedUntil"] - now), 3),
+                "ratePerSecond": round(state["rate"], 3),
+                "tokens": round(state["tokens"], 3),
+                "concurrencyLimit": int(state["limit"]),
+                "inFlight": len(state["leases"]),
+                "consecutiveFailures": state["failures"],
+                "granted": state["granted"],
+                "rejected": state["rejected"],
+                "throttled": state["throttled"],
+                "successes": state["successes"],
+                "errors": state["errors"],
+            }
+        return self._update(snapshot)
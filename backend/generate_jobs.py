@@ -0,0 +1,226 @@
+"""Background job mode for /generate.
+
+A generation can hold a web worker for tens of seconds (plus up to ~45 s of
+503 backoff), so under load a few of them starve cheap endpoints. In job mode
+the POST only validates the request and enqueues it: a bounded thread pool runs
+the generation and the client polls, or subscribes over SSE, for the result.
+
+Job state lives in a SQLite file shared by every gunicorn worker, so a poll can
+land on any worker, not only the one running the job. While a job is queued
+or running, its JobRunner refreshes the job's heartbeat every
+stale_seconds / 4, however long the Gemini retries take. A job whose
+heartbeat is older than stale_seconds belongs to a worker that died. It is
+marked failed the first time it is read after that. The verdict is final: the worker's own status writes are
+compare-and-set on the state it claimed, so a worker that was only slow
+finds its job no longer running and drops its result. A successful plan is
+still in the generate cache, so the client's retry is cheap.
+"""
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlite_store import ThreadLocalConnection
+
+TERMINAL_STATES = ("done", "failed")
+
+
+class QueueFullError(Exception):
+    """Raised when this worker already has max_pending jobs queued or running"""
+
+
+class JobStore:
+    """SQLite table of generation jobs: status, timings and the final response"""
+
+    def __init__(self, path, stale_seconds=120, retention_seconds=24 * 3600):
+        self.path = path
+        self.stale_seconds = float(stale_seconds)
+        self.retention_seconds = float(retention_seconds)
+        self._connect = ThreadLocalConnection(path)
+        with self._connect() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, status TEXT NOT NULL, http_status INTEGER, result TEXT,
+                cache_status TEXT, created_at REAL NOT NULL, started_at REAL, finished_at REAL,
+                heartbeat_at REAL)""")
+            if "heartbeat_at" not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")  # table from before heartbeats
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at)")
+
+    def create(self):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("INSERT INTO jobs (id, status, created_at, heartbeat_at) VALUES (?, 'queued', ?, ?)",
+                         (job_id, now, now))
+            # Finished jobs are only kept long enough for clients to collect them
+            conn.execute("DELETE FROM jobs WHERE finished_at < ?", (now - self.retention_seconds,))
+        return job_id
+
+    def mark_running(self, job_id):
+        """Claim a queued job; returns its started_at (the claim) or None if it is no longer queued"""
+        started_at = time.time()
+        with self._connect() as conn:
+            claimed = conn.execute("""UPDATE jobs SET status = 'running', started_at = ?, heartbeat_at = ?
+                                      WHERE id = ? AND status = 'queued'""",
+                                   (started_at, started_at, job_id)).rowcount
+        return started_at if claimed else None
+
+    def finish(self, job_id, body, http_status, cache_status=None, started_at=None):
+        """Record the outcome if the job is still running under the claim started_at; returns whether it was recorded"""
+        status = "done" if http_status < 400 else "failed"
+        with self._connect() as conn:
+            return conn.execute("""UPDATE jobs SET status = ?, http_status = ?, result = ?, cache_status = ?,
+                                   finished_at = ? WHERE id = ? AND status = 'running' AND started_at = ?""",
+                                (status, http_status, json.dumps(body), cache_status, time.time(), job_id,
+                                 started_at)).rowcount > 0
+
+    def heartbeat(self, job_ids):
+        """Mark queued or running jobs as still owned by a live worker"""
+        if not job_ids:
+            return
+        with self._connect() as conn:
+            conn.executemany("UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status IN ('queued', 'running')",
+                             [(time.time(), job_id) for job_id in job_ids])
+
+    def _expire(self, conn, job_id):
+        """Mark a queued or running job failed if its heartbeat is older than stale_seconds"""
+        now = time.time()
+        conn.execute("""UPDATE jobs SET status = 'failed', http_status = 500, result = ?, finished_at = ?
+                        WHERE id = ? AND status IN ('queued', 'running')
+                        AND COALESCE(heartbeat_at, started_at, created_at) < ?""",
+                     (json.dumps({"error": "Generation job was lost. Please try again."}), now, job_id,
+                      now - self.stale_seconds))
+
+    @staticmethod
+    def _select(conn, job_id):
+        return conn.execute("""SELECT status, http_status, result, cache_status, created_at, started_at,
+                               finished_at, heartbeat_at FROM jobs WHERE id = ?""", (job_id,)).fetchone()
+
+    def get(self, job_id):
+        """Job as a dict (with 'result' once finished), or None if unknown"""
+        with self._connect() as conn:
+            row = self._select(conn, job_id)
+            if row is not None and row[0] not in TERMINAL_STATES and \
+                    time.time() - (row[7] or row[5] or row[4]) > self.stale_seconds:
+                # The worker that owned the job was restarted or killed. The verdict is stored, so
+                # it can't flip to done later; re-read in case the worker finished first
+                self._expire(conn, job_id)
+                row = self._select(conn, job_id)
+        if row is None:
+            return None
+        status, http_status, result, cache_status, created_at, started_at, finished_at, _ = row
+        job = {
+            "jobId": job_id,
+            "status": status,
+            "createdAt": created_at,
+            "startedAt": started_at,
+            "finishedAt": finished_at,
+        }
+        if status in TERMINAL_STATES:
+            job.update(httpStatus=http_status, result=json.loads(result), cache=cache_status)
+        return job
+
+    def metrics(self, window=200):
+        """Queue depth across all workers plus wait/run time percentiles of recent jobs"""
+        with self._connect() as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+            recent = conn.execute("""SELECT started_at - created_at, finished_at - started_at FROM jobs
+                                     WHERE finished_at IS NOT NULL AND started_at IS NOT NULL
+                                     ORDER BY finished_at DESC LIMIT ?""", (window,)).fetchall()
+        waits = sorted(wait for wait, _ in recent)
+        runs = sorted(run for _, run in recent)
+        return {
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "waitSeconds": _percentiles(waits),
+            "runSeconds": _percentiles(runs),
+            "sampleSize": len(recent),
+        }
+
+
+def _percentiles(ordered):
+    if not ordered:
+        return {"p50": None, "p95": None, "max": None}
+
+    def at(pct):
+        return round(ordered[min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))], 3)
+
+    return {"p50": at(50), "p95": at(95), "max": round(ordered[-1], 3)}
+
+
+class JobRunner:
+    """Bounded thread pool that runs jobs and records their outcome in a JobStore"""
+
+    def __init__(self, store, workers=4, max_pending=32):
+        self.store = store
+        self.workers = int(workers)
+        self.max_pending = int(max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="generate-job")
+        self._lock = threading.Lock()
+        self._pending = 0  # queued + running in this worker
+        self._job_ids = set()  # ids of those jobs, kept alive by the heartbeat thread
+        self._heartbeat_thread = None
+
+    def _ensure_heartbeat(self):
+        # Started on first use rather than in __init__, so it runs in the forked gunicorn worker
+        with self._lock:
+            if self._heartbeat_thread is None or not self._heartbeat_thread.is_alive():
+                self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True,
+                                                          name="generate-job-heartbeat")
+                self._heartbeat_thread.start()
+
+    def _heartbeat_loop(self):
+        while True:
+            time.sleep(self.store.stale_seconds / 4)
+            with self._lock:
+                job_ids = list(self._job_ids)
+            try:
+                self.store.heartbeat(job_ids)
+            except Exception as e:
+                print(f"⚠️ Generation job heartbeat failed: {e}")
+
+    def submit(self, fn, *args):
+        """Queue fn(*args), which must return (body, http_status, cache_status); returns the job id"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError(f"{self._pending} generation jobs already pending")
+            self._pending += 1
+        self._ensure_heartbeat()
+        try:
+            job_id = self.store.create()
+            with self._lock:
+                self._job_ids.add(job_id)
+            self._executor.submit(self._run, job_id, fn, args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        return job_id
+
+    def _run(self, job_id, fn, args):
+        try:
+            started_at = self.store.mark_running(job_id)
+            if started_at is None:
+                print(f"⚠️ Generation job {job_id} was given up on before it started; skipping it")
+                return
+            try:
+                body, http_status, cache_status = fn(*args)
+            except Exception as e:
+                body, http_status, cache_status = {"error": str(e)}, 500, None
+            if not self.store.finish(job_id, body, http_status, cache_status, started_at):
+                print(f"⚠️ Generation job {job_id} finished after it was marked lost; result dropped")
+        except Exception as e:
+            print(f"❌ Generation job {job_id} could not be recorded: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._job_ids.discard(job_id)
+
+    def stats(self):
+        with self._lock:
+            pending = self._pending
+        return {"workers": self.workers, "maxPending": self.max_pending, "pendingInThisWorker": pending}
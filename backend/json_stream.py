@@ -0,0 +1,170 @@
+"""Linear-time extraction of a JSON array of objects from model output.
+
+Gemini streams the task plan as text fragments that split anywhere, including
+inside strings. JsonArrayParser is fed those fragments and hands back each
+top-level array element as soon as its closing brace arrives, so a task can be
+post-processed and sent to the client while the rest is still being generated.
+
+The scan is a single pass that only tracks string/escape state and nesting
+depth, jumping between structural characters with precompiled regexes; each
+element's text is json.loads'ed once when it closes. Anything before the
+opening '[' of an array of objects (a ```json fence, prose) is skipped, and
+whatever follows the closing ']' is ignored.
+
+extract_json_array() handles a complete response: it decodes the elements
+with the C JSON decoder and hands the rest to the incremental parser at the
+first one that doesn't decode, salvaging every complete object from
+truncated (MAX_TOKENS) or partly malformed output.
+"""
+import json
+import re
+
+# Outermost array of objects: a '[' followed by '{' or ']' (skips prose like "[optional]")
+_ARRAY_START = re.compile(r"\[\s*(?=[{\]])")
+_DECODER = json.JSONDecoder()
+_STRING_SPECIAL = re.compile(r'["\\]')
+_STRUCTURAL = re.compile(r'[\[\]{}"]')
+_SEPARATORS = re.compile(r'[\s,]*')
+
+
+class JsonArrayParser:
+    """Feed text with feed(); each call returns the array elements completed by that text"""
+
+    def __init__(self, started=False):
+        self.started = started  # seen the opening '[' (True to start inside the array)
+        self.finished = False  # seen the matching ']'
+        self.elements = 0      # elements returned so far
+        self.invalid = 0       # elements that closed but weren't valid JSON
+        self._depth = 0        # nesting inside the current element
+        self._in_string = False
+        self._escape = False
+        self._current = []     # text pieces of the element being read
+        self._prefix = ""      # unmatched text before the array starts
+
+    @property
+    def pending(self):
+        """True while an element has been opened but not closed (e.g. truncated output)"""
+        return self._depth > 0
+
+    def feed(self, text):
+        completed = []
+        if self.finished or not text:
+            return completed
+
+        pos = 0
+        if not self.started:
+            # The '[' and its first '{' may arrive in different chunks
+            text = self._prefix + text
+            match = _ARRAY_START.search(text)
+            if not match:
+                last_bracket = text.rfind("[")
+                self._prefix = text[last_bracket:] if last_bracket >= 0 else ""
+                return completed
+            self._prefix = ""
+            self.started = True
+            pos = match.start() + 1
+
+        # Start of the current element's text within this chunk (None when between elements)
+        element_start = pos if self._depth > 0 else None
+        length = len(text)
+        while pos < length:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    pos += 1
+                    continue
+                # Jump straight to the next quote or backslash
+                match = _STRING_SPECIAL.search(text, pos)
+                if not match:
+                    break
+                pos = match.start()
+                if text[pos] == "\\":
+                    self._escape = True
+                else:
+                    self._in_string = False
+                pos += 1
+                continue
+
+            # Outside strings only brackets, braces and quotes matter
+            match = _STRUCTURAL.search(text, pos)
+            if not match:
+                break
+            pos = match.start()
+            char = text[pos]
+            if char == '"':
+                if self._depth > 0:
+                    self._in_string = True
+            elif char in "{[":
+                if self._depth == 0:
+                    element_start = pos
+                self._depth += 1
+            elif self._depth == 0:
+                if char == "]":
+                    self.finished = True
+                    break
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._current.append(text[element_start:pos + 1])
+                    element_start = None
+                    element = self._close_element()
+                    if element is not None:
+                        completed.append(element)
+            pos += 1
+
+        if element_start is not None and self._depth > 0:
+            self._current.append(text[element_start:])
+        return completed
+
+    def _close_element(self):
+        raw = "".join(self._current)
+        self._current = []
+        try:
+            element = json.loads(raw)
+        except json.JSONDecodeError:
+            self.invalid += 1
+            return None
+        self.elements += 1
+        return element
+
+
+def iter_array_elements(chunks):
+    """Yield array elements from an iterable of text chunks as they complete"""
+    parser = JsonArrayParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.finished:
+            return
+
+
+def extract_json_array(text):
+    """Returns (elements, complete) for the first array of objects in text.
+
+    complete is False when the array was cut off or some elements were
+    invalid and skipped; elements is empty if no array was found.
+    """
+    match = _ARRAY_START.search(text or "")
+    if not match:
+        return [], False
+
+    # Decode element by element with the C decoder; only from the first element it
+    # rejects (cut off or malformed) onward does the incremental parser take over
+    elements = []
+    pos = match.end()
+    length = len(text)
+    while True:
+        pos = _SEPARATORS.match(text, pos).end()
+        if pos >= length:
+            return elements, False
+        if text[pos] == "]":
+            return elements, True
+        try:
+            element, pos = _DECODER.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            break
+        elements.append(element)
+
+    # Resume inside the top-level array; searching for a '[' again would lock onto a nested one
+    parser = JsonArrayParser(started=True)
+    elements.extend(parser.feed(text[pos:]))
+    return elements, False
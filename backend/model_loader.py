@@ -0,0 +1,154 @@
+"""Lazy, memory-mapped loading of the duration model.
+
+duration_artifacts.pkl holds the sklearn model and label encoders. The first
+time it is loaded, the model is compiled (see duration_engine) and written next
+to it as <name>.compiled.joblib: plain NumPy arrays plus the encoder classes,
+stored uncompressed so joblib can memory-map them read-only. Every later load,
+in any worker process, maps the same file, so workers share those pages through
+the OS page cache instead of each unpickling a private copy of the model, and
+sklearn is never imported on the serving path.
+
+model_registry.ModelRegistry decides when to load and which version is live.
+"""
+import hashlib
+import os
+
+import joblib
+import numpy as np
+
+from duration_engine import CompiledGradientBoosting
+
+COMPILED_FORMAT_VERSION = 2
+
+
+def compiled_path_for(artifact_path):
+    root, _ = os.path.splitext(artifact_path)
+    return root + ".compiled.joblib"
+
+
+def current_rss_bytes():
+    """Resident set size of this process, or None where it can't be read"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def source_signature(path):
+    """Cheap change detector for an artifact file"""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def artifact_version(artifacts, artifact_path):
+    """Version recorded by training, else a short content hash of the file"""
+    if artifacts.get('version'):
+        return str(artifacts['version'])
+    digest = hashlib.sha1()
+    with open(artifact_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+class DurationModel:
+    """The parts of a duration artifact needed to serve estimates"""
+
+    def __init__(self, engine, task_types, assignees, version, sklearn_model=None, memory_mapped=False):
+        self.engine = engine
+        self.version = version
+        # Only kept when the model couldn't be compiled
+        self.sklearn_model = sklearn_model
+        self.task_type_codes = {label: code for code, label in enumerate(task_types)}
+        self.assignee_codes = {label: code for code, label in enumerate(assignees)}
+        self.memory_mapped = memory_mapped
+
+    def predict(self, rows):
+        if self.engine:
+            return self.engine.predict(rows)
+        return self.sklearn_model.predict(np.array(rows))
+
+    def predict_one(self, row):
+        if self.engine:
+            return self.engine.predict_one(row)
+        return float(self.sklearn_model.predict(np.array([row]))[0])
+
+
+def compile_artifact(artifact_path, compiled_path=None):
+    """Compile duration_artifacts.pkl into the memory-mappable format.
+
+    Returns the in-memory DurationModel; the compiled file is written atomically
+    so concurrently starting workers never see a partial file.
+    """
+    compiled_path = compiled_path or compiled_path_for(artifact_path)
+    signature = source_signature(artifact_path)
+    artifacts = joblib.load(artifact_path)
+    version = artifact_version(artifacts, artifact_path)
+    task_types = [str(label) for label in artifacts['le_task_type'].classes_]
+    assignees = [str(label) for label in artifacts['le_assignee'].classes_]
+
+    try:
+        engine = CompiledGradientBoosting.from_model(artifacts['model'])
+    except Exception as e:
+        print(f"⚠️ Could not compile duration model, using sklearn predict: {e}")
+        return DurationModel(None, task_types, assignees, version, sklearn_model=artifacts['model'])
+
+    payload = {
+        "format": COMPILED_FORMAT_VERSION,
+        "source": signature,
+        "version": version,
+        "engine": engine.to_arrays(),
+        "task_types": task_types,
+        "assignees": assignees,
+    }
+    tmp_path = f"{compiled_path}.{os.getpid()}.tmp"
+    try:
+        joblib.dump(payload, tmp_path)
+        os.replace(tmp_path, compiled_path)
+    except OSError as e:
+        # Read-only deploys still work, just without the shared mapping
+        print(f"⚠️ Could not write compiled duration model: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return DurationModel(engine, task_types, assignees, version)
+
+
+def is_current(payload, signature):
+    """True if a compiled payload is in the current format and was built from the artifact with this signature"""
+    return bool(payload) and payload.get("format") == COMPILED_FORMAT_VERSION and list(payload.get("source", [])) == signature
+
+
+def load_duration_model(artifact_path, mmap_mode="r"):
+    """Load the duration model, preferring an up-to-date compiled file mapped read-only"""
+    compiled_path = compiled_path_for(artifact_path)
+    signature = source_signature(artifact_path)
+
+    if not os.path.exists(compiled_path):
+        compile_artifact(artifact_path, compiled_path)
+    try:
+        payload = joblib.load(compiled_path, mmap_mode=mmap_mode)
+    except Exception as e:
+        print(f"⚠️ Could not read compiled duration model, rebuilding: {e}")
+        payload = None
+
+    if not is_current(payload, signature):
+        # Missing, unreadable or built from an older artifact
+        model = compile_artifact(artifact_path, compiled_path)
+        if not model.engine or not os.path.exists(compiled_path):
+            return model
+        try:
+            payload = joblib.load(compiled_path, mmap_mode=mmap_mode)
+        except Exception:
+            payload = None
+        # The write may have failed (read-only deploy, full disk), leaving the old file in place
+        if not is_current(payload, signature):
+            return model
+
+    return DurationModel(
+        CompiledGradientBoosting.from_arrays(payload["engine"]),
+        payload["task_types"],
+        payload["assignees"],
+        payload["version"],
+        memory_mapped=mmap_mode is not None,
+    )
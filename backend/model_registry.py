@@ -0,0 +1,205 @@
+"""Versioned, hot-reloadable registry for the duration model.
+
+The registry holds the active model version and a short history of previous
+ones. A reload loads the new artifact (see model_loader), checks it on a canary
+row and only then swaps it in. The swap is a single reference assignment:
+estimates that already fetched the old model finish on it, nothing waits on the
+load, and a failed load or canary leaves the active version untouched.
+rollback() swaps back to the previous version without touching disk.
+
+Each gunicorn worker has its own registry. Set DURATION_MODEL_WATCH_SECONDS and
+every worker polls the artifact file and reloads when training publishes a new
+one, so no worker restart is needed.
+"""
+import math
+import threading
+import time
+from collections import deque
+
+from model_loader import current_rss_bytes, load_duration_model, source_signature
+
+# Plausible feature row: 20-char title, medium priority, first task type and assignee
+CANARY_ROW = (20, 2, 0, 0)
+
+
+class ModelVersion:
+    """A loaded model plus where it came from and what loading it cost"""
+
+    def __init__(self, model, artifact_path, signature, load_seconds, rss_delta_bytes):
+        self.model = model
+        self.artifact_path = artifact_path
+        self.signature = signature
+        self.load_seconds = load_seconds
+        self.rss_delta_bytes = rss_delta_bytes
+        self.loaded_at = time.time()
+
+    @property
+    def version(self):
+        return self.model.version
+
+    def describe(self):
+        return {
+            "version": self.version,
+            "artifact": self.artifact_path,
+            "loadSeconds": round(self.load_seconds, 6),
+            "rssDeltaBytes": self.rss_delta_bytes,
+            "loadedAt": self.loaded_at,
+            "memoryMapped": self.model.memory_mapped,
+            "compiled": bool(self.model.engine),
+            "modelBytes": self.model.engine.nbytes if self.model.engine else None,
+        }
+
+
+def validate_canary(model):
+    """Raise ValueError unless the model gives a sane, consistent canary prediction"""
+    single = model.predict_one(CANARY_ROW)
+    batch = float(model.predict([CANARY_ROW])[0])
+    if not math.isfinite(single) or not 0 < single < 1000:
+        raise ValueError(f"Canary prediction out of range: {single}")
+    if abs(single - batch) > 1e-6:
+        raise ValueError(f"Single and batch canary predictions differ: {single} vs {batch}")
+
+
+class ModelRegistry:
+    """Active duration model with lazy first load, background reload and rollback"""
+
+    def __init__(self, artifact_path, on_swap=None, history=3):
+        self.artifact_path = artifact_path
+        self.on_swap = on_swap
+        self._active = None
+        self._previous = deque(maxlen=history)
+        self._initialized = False
+        # Serializes loads and swaps; get() never takes it once initialized
+        self._lock = threading.Lock()
+        self.reload_state = "idle"
+        self.last_error = None
+        self._watcher = None
+
+    def get(self):
+        """Active DurationModel, or None if no artifact could be loaded"""
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    try:
+                        self._swap(self._load_version(self.artifact_path))
+                    except Exception as e:
+                        print(f"⚠️ Duration model could not be loaded: {e}")
+                        self.last_error = str(e)
+                    # Set only after the attempt so concurrent callers wait on the lock instead of seeing None
+                    self._initialized = True
+        active = self._active
+        return active.model if active else None
+
+    def warm_up(self):
+        """Load now instead of on the first estimate"""
+        return self.get() is not None
+
+    def active_version(self):
+        self.get()
+        return self._active
+
+    def reload(self, artifact_path=None):
+        """Load, validate and activate an artifact; returns the new ModelVersion.
+
+        Raises if loading or validation fails, in which case the active
+        version is unchanged.
+        """
+        path = artifact_path or self.artifact_path
+        with self._lock:
+            self.reload_state = "loading"
+            try:
+                candidate = self._load_version(path)
+                validate_canary(candidate.model)
+            except Exception as e:
+                self.reload_state = "failed"
+                self.last_error = str(e)
+                raise
+            self._swap(candidate)
+            self._initialized = True
+            self.reload_state = "idle"
+            self.last_error = None
+            return candidate
+
+    def reload_async(self, artifact_path=None):
+        """Start reload() on a background thread and return immediately"""
+        def run():
+            try:
+                version = self.reload(artifact_path)
+                print(f"✅ Duration model {version.version} activated ({version.load_seconds:.3f}s)")
+            except Exception as e:
+                print(f"⚠️ Duration model reload failed, keeping current version: {e}")
+
+        self.reload_state = "loading"
+        thread = threading.Thread(target=run, name="duration-model-reload", daemon=True)
+        thread.start()
+        return thread
+
+    def rollback(self):
+        """Re-activate the previous version; returns it, or None if there is none"""
+        with self._lock:
+            if not self._previous:
+                return None
+            previous = self._previous.pop()
+            current = self._active
+            self._active = previous
+            if self.on_swap:
+                self.on_swap(previous.model)
+            # The rolled-back-from version isn't kept, so repeated rollbacks walk back in history
+            print(f"↩️ Duration model rolled back from {current.version if current else None} to {previous.version}")
+            return previous
+
+    def start_watching(self, interval_seconds):
+        """Poll the artifact file and reload whenever its signature changes"""
+        if self._watcher:
+            return self._watcher
+
+        def watch():
+            # React to file changes only, so a rollback (or a broken file) isn't undone every poll
+            active = self.active_version()
+            last_seen = active.signature if active else None
+            while True:
+                time.sleep(interval_seconds)
+                try:
+                    signature = source_signature(self.artifact_path)
+                except OSError:
+                    continue
+                if signature == last_seen:
+                    continue
+                last_seen = signature
+                try:
+                    version = self.reload()
+                    print(f"✅ Duration model {version.version} picked up from {self.artifact_path}")
+                except Exception as e:
+                    print(f"⚠️ Duration model reload failed, keeping current version: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="duration-model-watch", daemon=True)
+        self._watcher.start()
+        return self._watcher
+
+    def stats(self):
+        active = self._active
+        return {
+            "loaded": active is not None,
+            "active": active.describe() if active else None,
+            "previous": [v.describe() for v in reversed(self._previous)],
+            "reloadState": self.reload_state,
+            "lastError": self.last_error,
+            "rssBytes": current_rss_bytes(),
+        }
+
+    def _load_version(self, artifact_path):
+        signature = source_signature(artifact_path)
+        rss_before = current_rss_bytes()
+        start = time.perf_counter()
+        model = load_duration_model(artifact_path)
+        load_seconds = time.perf_counter() - start
+        rss_after = current_rss_bytes()
+        rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+        return ModelVersion(model, artifact_path, signature, load_seconds, rss_delta)
+
+    def _swap(self, version):
+        if self._active:
+            self._previous.append(self._active)
+        self._active = version
+        if self.on_swap:
+            self.on_swap(version.model)
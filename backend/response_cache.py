@@ -0,0 +1,107 @@
+"""Disk-backed cache of Gemini responses for /generate.
+
+A /generate call takes tens of seconds and spends API quota, and users often
+resubmit the same description and roster. The raw Gemini text is stored in a
+SQLite file keyed on the normalized project description plus the sorted
+(name, role) pairs of the team, so a repeat request skips straight to task
+post-processing. Because the file is shared, every gunicorn worker sees the
+same entries and the same hit/miss counters.
+
+Entries expire after ttl_seconds. When the cache grows past max_entries or
+max_bytes, the least recently used entries are evicted.
+"""
+import hashlib
+import json
+import time
+
+from sqlite_store import ThreadLocalConnection
+
+# Bump when the prompt or the cached value format changes so old entries stop matching
+KEY_VERSION = 1
+
+
+def make_cache_key(base_description, member_roles):
+    """Cache key for a project description and a {name: role} team mapping"""
+    description = " ".join(base_description.lower().split())
+    team = sorted((name.strip(), (role or "").strip().lower()) for name, role in member_roles.items())
+    payload = json.dumps({"v": KEY_VERSION, "description": description, "team": team}, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed LRU/TTL cache of key -> response text with shared hit/miss counters"""
+
+    def __init__(self, path, ttl_seconds=7 * 24 * 3600, max_entries=1000, max_bytes=50 * 2**20):
+        self.path = path
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self._connect = ThreadLocalConnection(path)
+        with self._connect() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,
+                created_at REAL NOT NULL, last_access REAL NOT NULL)""")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.executemany("INSERT OR IGNORE INTO counters VALUES (?, 0)",
+                             [("hits",), ("misses",), ("evictions",), ("expirations",)])
+
+    def _bump(self, conn, name, amount=1):
+        if amount:
+            conn.execute("UPDATE counters SET value = value + ? WHERE name = ?", (amount, name))
+
+    def get(self, key):
+        """Return the cached text for key, or None on a miss or an expired entry"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._bump(conn, "expirations")
+                row = None
+            if row is None:
+                self._bump(conn, "misses")
+                return None
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self._bump(conn, "hits")
+            return row[0]
+
+    def put(self, key, value):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                         (key, value, len(value.encode("utf-8")), now, now))
+            expired = conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+            self._bump(conn, "expirations", expired)
+            # Keep the most recently used entries that fit both caps, drop the rest
+            evicted = conn.execute("""DELETE FROM entries WHERE key IN (
+                SELECT key FROM (
+                    SELECT key,
+                           ROW_NUMBER() OVER (ORDER BY last_access DESC) AS position,
+                           SUM(size) OVER (ORDER BY last_access DESC ROWS UNBOUNDED PRECEDING) AS running_bytes
+                    FROM entries)
+                WHERE position > ? OR running_bytes > ?)""", (self.max_entries, self.max_bytes)).rowcount
+            self._bump(conn, "evictions", evicted)
+
+    def clear(self):
+        """Drop all entries; counters are kept"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+
+    def stats(self):
+        with self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters"))
+            size, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "size": size,
+            "bytes": total_bytes,
+            "maxEntries": self.max_entries,
+            "maxBytes": self.max_bytes,
+            "ttlSeconds": self.ttl_seconds,
+            "hits": counters["hits"],
+            "misses": counters["misses"],
+            "evictions": counters["evictions"],
+            "expirations": counters["expirations"],
+            "hitRate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
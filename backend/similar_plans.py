@@ -0,0 +1,188 @@
+"""Offline near-duplicate lookup of earlier /generate plans.
+
+Descriptions become hashed TF-IDF vectors of their words and character
+3/4-grams, so rewordings like "todo app" / "todo application" still match.
+The best cosine at or above `threshold` wins. The default of 0.8 is strict
+on purpose: a false hit returns another project's plan, while a miss only
+costs one Gemini call. Descriptions that normalize to the same words share
+one entry. Rows live in SQLite so every gunicorn worker sees them.
+"""
+import math
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from sqlite_store import ThreadLocalConnection
+
+_WORD = re.compile(r"[a-z0-9]+")
+# Words that say "make a project" rather than what the project is
+STOPWORDS = frozenset("""
+a an and the of for to with in on using use that this which is are be as by or from into
+build building create creating make making develop developing implement implementing design
+want need would like please simple basic new project app application system platform tool
+""".split())
+
+
+def normalize_description(description):
+    """The words description_features sees; equal normal forms give identical vectors"""
+    return " ".join(_WORD.findall(description.lower()))
+
+
+def description_features(description, dim):
+    """{bucket: sublinear tf} for a project description"""
+    counts = {}
+    for word in _WORD.findall(description.lower()):
+        if word in STOPWORDS:
+            continue
+        grams = [f"w:{word}"]
+        padded = f" {word} "
+        for n in (3, 4):
+            grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        for gram in grams:
+            bucket = zlib.crc32(gram.encode("utf-8")) % dim
+            counts[bucket] = counts.get(bucket, 0) + 1
+    return {bucket: 1.0 + math.log(count) for bucket, count in counts.items()}
+
+
+class SimilarPlanIndex:
+    """SQLite-backed store of (description, plan text) with hashed TF-IDF cosine lookup"""
+
+    def __init__(self, path, threshold=0.8, max_entries=2000, dim=2**18):
+        self.path = path
+        self.threshold = float(threshold)
+        self.max_entries = max(1, int(max_entries))
+        self.dim = int(dim)
+        self._lock = threading.Lock()
+        self._connect = ThreadLocalConnection(path)
+        self._entries = {}        # row id -> (bucket array, weight array)
+        self._last_id = 0
+        self._dirty = True
+        self._buckets = self._weights = self._owners = self._ids = self._norms = None
+        self._df = np.zeros(self.dim, dtype=np.int32)
+        self._query = np.zeros(self.dim, dtype=np.float32)
+        self.lookups = 0
+        self.hits = 0
+        self._lookup_seconds = 0.0
+        self._max_lookup_seconds = 0.0
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")  # one worker creates or migrates the table at a time
+            conn.execute("""CREATE TABLE IF NOT EXISTS plans (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, description TEXT NOT NULL,
+                plan TEXT NOT NULL, created_at REAL NOT NULL, normalized TEXT)""")
+            if "normalized" not in {row[1] for row in conn.execute("PRAGMA table_info(plans)")}:
+                self._add_normalized_column(conn)
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS plans_normalized ON plans (normalized)")
+
+    @staticmethod
+    def _add_normalized_column(conn):
+        """Upgrade an index written before descriptions were deduplicated, keeping the newest duplicate"""
+        conn.execute("ALTER TABLE plans ADD COLUMN normalized TEXT")
+        rows = conn.execute("SELECT id, description FROM plans").fetchall()
+        conn.executemany("UPDATE plans SET normalized = ? WHERE id = ?",
+                         [(normalize_description(description), row_id) for row_id, description in rows])
+        conn.execute("DELETE FROM plans WHERE id NOT IN (SELECT MAX(id) FROM plans GROUP BY normalized)")
+
+    def _vector(self, description):
+        features = description_features(description, self.dim)
+        buckets = np.fromiter(features.keys(), dtype=np.int32, count=len(features))
+        weights = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+        return buckets, weights
+
+    def _sync(self, conn):
+        """Pick up rows other workers added and forget rows they evicted (caller holds _lock)"""
+        rows = conn.execute("SELECT id, description FROM plans WHERE id > ? ORDER BY id", (self._last_id,)).fetchall()
+        for row_id, description in rows:
+            self._entries[row_id] = self._vector(description)
+            np.add.at(self._df, self._entries[row_id][0], 1)
+            self._last_id = row_id
+        oldest = conn.execute("SELECT MIN(id) FROM plans").fetchone()[0]
+        stale = [row_id for row_id in self._entries if oldest is None or row_id < oldest]
+        for row_id in stale:
+            np.subtract.at(self._df, self._entries.pop(row_id)[0], 1)
+        if rows or stale:
+            self._dirty = True
+
+    def _arrays(self):
+        if self._dirty:
+            ids = list(self._entries)
+            vectors = [self._entries[row_id] for row_id in ids]
+            self._ids = np.array(ids, dtype=np.int64)
+            self._buckets = np.concatenate([v[0] for v in vectors]) if vectors else np.zeros(0, dtype=np.int32)
+            self._weights = np.concatenate([v[1] for v in vectors]) if vectors else np.zeros(0, dtype=np.float32)
+            self._owners = np.repeat(np.arange(len(ids)), [len(v[0]) for v in vectors]).astype(np.int32)
+            # IDF only changes when plans come or go, so weight and norm the stored vectors once per change
+            self._weights = weights = self._weights * self._idf(self._buckets, len(ids))
+            self._norms = np.sqrt(np.bincount(self._owners, weights=weights * weights, minlength=len(ids)))
+            self._dirty = False
+        return self._ids, self._buckets, self._weights, self._owners, self._norms
+
+    def _idf(self, buckets, n_docs):
+        return np.log((n_docs + 1) / (self._df[buckets] + 1.0)).astype(np.float32) + 1.0
+
+    def lookup(self, description):
+        """Returns (plan text, similarity) of the closest earlier description at or above threshold, or (None, best score)"""
+        start = time.perf_counter()
+        with self._lock:
+            conn = self._connect()
+            self._sync(conn)
+            ids, buckets, doc_weights, owners, norms = self._arrays()
+            best_id, best_score = None, 0.0
+            query_buckets, query_weights = self._vector(description)
+            if len(ids) and len(query_buckets):
+                n_docs = len(ids)
+                # Scatter the query into the reusable dense buffer, score, then clear it again
+                query_weights = query_weights * self._idf(query_buckets, n_docs)
+                self._query[query_buckets] = query_weights
+                dots = np.bincount(owners, weights=doc_weights * self._query[buckets], minlength=n_docs)
+                self._query[query_buckets] = 0.0
+                scores = dots / (np.maximum(norms, 1e-12) * max(float(np.linalg.norm(query_weights)), 1e-12))
+                best = int(np.argmax(scores))
+                best_id, best_score = int(ids[best]), float(scores[best])
+            plan = None
+            if best_id is not None and best_score >= self.threshold:
+                row = conn.execute("SELECT plan FROM plans WHERE id = ?", (best_id,)).fetchone()
+                plan = row[0] if row else None
+
+            elapsed = time.perf_counter() - start
+            self.lookups += 1
+            self.hits += plan is not None
+            self._lookup_seconds += elapsed
+            self._max_lookup_seconds = max(self._max_lookup_seconds, elapsed)
+        return plan, best_score
+
+    def add(self, description, plan):
+        """Store a complete plan, replacing the plan of an equal description; the oldest plans are evicted past max_entries"""
+        # A replaced row keeps its id and its (identical) vector, so no worker has to re-sync it
+        with self._lock, self._connect() as conn:
+            conn.execute("""INSERT INTO plans (description, plan, created_at, normalized) VALUES (?, ?, ?, ?)
+                ON CONFLICT (normalized) DO UPDATE SET
+                    description = excluded.description, plan = excluded.plan, created_at = excluded.created_at""",
+                         (description, plan, time.time(), normalize_description(description)))
+            conn.execute("DELETE FROM plans WHERE id NOT IN (SELECT id FROM plans ORDER BY id DESC LIMIT ?)",
+                         (self.max_entries,))
+
+    def memory_bytes(self):
+        """Approximate memory held by this worker's vectors"""
+        with self._lock:
+            vector_bytes = sum(b.nbytes + w.nbytes for b, w in self._entries.values())
+            packed = [a for a in (self._buckets, self._weights, self._owners, self._ids, self._norms) if a is not None]
+            return self._df.nbytes + self._query.nbytes + vector_bytes + sum(a.nbytes for a in packed)
+
+    def stats(self):
+        with self._connect() as conn:
+            size, plan_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(plan)), 0) FROM plans").fetchone()
+        return {
+            "size": size,
+            "planBytes": plan_bytes,
+            "maxEntries": self.max_entries,
+            "threshold": self.threshold,
+            "indexMemoryBytes": self.memory_bytes(),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hitRate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "avgLookupMs": round(self._lookup_seconds / self.lookups * 1e3, 3) if self.lookups else 0.0,
+            "maxLookupMs": round(self._max_lookup_seconds * 1e3, 3),
+        }
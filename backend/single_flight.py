@@ -0,0 +1,105 @@
+"""Single-flight coalescing of identical concurrent calls.
+
+When several requests need the same expensive result at the same time (a
+double-submitted /generate, or a whole team generating the same group
+project), only the first one does the work; the others wait for it and share
+its result.
+
+Within a worker this is a map of in-flight keys to events. Across gunicorn
+workers it is optional: with a lock_dir, the leader also holds an flock on
+<lock_dir>/<key>.lock while it works, and a leader in another worker that finds
+the lock taken waits for it and then calls recheck() (e.g. a shared cache
+lookup) before doing the work itself.
+"""
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: cross-worker coalescing is unavailable
+    fcntl = None
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run fn once per key at a time and share the result with concurrent callers"""
+
+    def __init__(self, lock_dir=None):
+        self.lock_dir = lock_dir if fcntl else None
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.coalesced_across_workers = 0
+
+    def do(self, key, fn, recheck=None):
+        """Returns (result, shared); shared is True when another caller's result was reused.
+
+        recheck() is only used across workers: it should return the other worker's
+        result (or None to do the work anyway) once that worker has finished.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        shared = False
+        try:
+            call.result, shared = self._lead(key, fn, recheck)
+            return call.result, shared
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _lead(self, key, fn, recheck):
+        if not self.lock_dir or recheck is None:
+            return fn(), False
+
+        # Lock files are left in place: unlinking them would race with other workers' flock
+        with open(os.path.join(self.lock_dir, f"{key}.lock"), "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another worker is already on it: wait for it, then try its result
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                result = recheck()
+                if result is not None:
+                    with self._lock:
+                        self.coalesced_across_workers += 1
+                    return result, True
+            try:
+                return fn(), False
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "inFlight": len(self._calls),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "coalescedAcrossWorkers": self.coalesced_across_workers,
+                "crossWorker": bool(self.lock_dir),
+            }
@@ -0,0 +1,30 @@
+"""Per-thread SQLite connections shared by the file-backed stores.
+
+ResponseCache, JobStore and SimilarPlanIndex each keep their state in a
+SQLite file that every gunicorn worker opens. sqlite3 connections can't be
+shared across threads, so each thread opens its own, always with the same
+settings: WAL lets readers in other workers proceed while one worker
+writes, and the 10 s busy timeout makes writers queue instead of failing.
+"""
+import os
+import sqlite3
+import threading
+
+
+class ThreadLocalConnection:
+    """Callable returning this thread's connection to path, opened on first use"""
+
+    def __init__(self, path, timeout=10):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def __call__(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
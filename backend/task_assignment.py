@@ -0,0 +1,111 @@
+"""Role-aware task assignment that balances estimated hours across the team.
+
+An AssignmentEngine is built once per generated plan. It lowercases every
+member's role once and keeps one min-heap of (hours assigned, roster
+position, member) per pool of eligible members. There is one pool per task
+type, built the first time that type shows up. Each task goes to the
+least-loaded eligible member and its hours are added to that member's load,
+so one 40-hour task weighs as much as forty 1-hour ones. Ties go to whoever
+comes first in the roster.
+
+Heaps are updated lazily. Assigning a task only re-pushes the member into the
+pool it was taken from, so a member's entry in another pool can be stale.
+Loads only grow, so a stale entry is never larger than the real load. When a
+stale entry reaches the top of a heap, it is pushed back with the current load.
+Every assignment is O(log n), whatever the team size.
+
+assign_all() with strategy "lpt" assigns the longest tasks first (Longest
+Processing Time). That usually gives a shorter makespan than plan order.
+It needs the whole plan up front, so streaming always uses plan order.
+"""
+import heapq
+
+# Role keywords per task type; a member is eligible if their role contains one of them
+ROLE_KEYWORDS = {
+    "frontend": ["frontend developer", "software engineer", "developer"],
+    "backend": ["backend developer", "software engineer", "developer"],
+    "development": ["backend developer", "software engineer", "developer", "frontend developer"],
+    "design": ["designer", "ui/ux designer"],
+    "testing": ["qa engineer", "tester", "software engineer"],
+    "devops": ["devops engineer", "systems administrator"],
+    "documentation": ["technical writer", "developer", "business analyst"],
+    "research": ["researcher", "analyst", "business analyst"],
+    "analysis": ["researcher", "analyst", "business analyst"],
+    "planning": ["project manager", "business analyst"],
+    "data_preparation": ["business analyst", "data analyst", "software engineer"],
+    "review": ["project manager", "qa engineer", "software engineer"],
+    "deployment": ["devops engineer", "software engineer"],
+    "monitoring": ["devops engineer", "software engineer"],
+    "feedback": ["project manager", "business analyst"],
+    "meeting": [],  # Can be assigned to anyone
+    "other": [],    # Can be assigned to anyone
+}
+# Who takes a task when nobody has one of its roles
+FALLBACK_KEYWORDS = ["developer", "engineer"]
+STRATEGIES = ("greedy", "lpt")
+UNASSIGNED = "Unassigned"
+
+
+class AssignmentEngine:
+    """Per-plan assignment state: eligible pools by task type and per-member hours"""
+
+    def __init__(self, member_names, member_roles=None):
+        member_roles = member_roles or {}
+        self.members = list(dict.fromkeys(member_names))
+        self._roles = [member_roles.get(name, "").lower() for name in self.members]
+        self.hours = {name: 0.0 for name in self.members}
+        self.task_counts = {name: 0 for name in self.members}
+        self._pools = {}        # task type -> heap of [hours, roster position, member]
+        self._pool_by_key = {}  # eligible-member tuple -> heap, so types with the same members share one
+
+    def _matching(self, keywords):
+        return tuple(i for i, role in enumerate(self._roles) if any(keyword in role for keyword in keywords))
+
+    def _pool(self, task_type):
+        pool = self._pools.get(task_type)
+        if pool is not None:
+            return pool
+        keywords = ROLE_KEYWORDS.get(task_type, [])
+        eligible = self._matching(keywords) if keywords else ()
+        if not eligible:
+            # If no one has a specific role, any developer can take it; failing that, anyone
+            eligible = self._matching(FALLBACK_KEYWORDS) or tuple(range(len(self.members)))
+        pool = self._pool_by_key.get(eligible)
+        if pool is None:
+            pool = [[self.hours[self.members[i]], i, self.members[i]] for i in eligible]
+            heapq.heapify(pool)
+            self._pool_by_key[eligible] = pool
+        self._pools[task_type] = pool
+        return pool
+
+    def assign(self, task_type, hours):
+        """Least-loaded eligible member for a task of task_type; adds hours to their load"""
+        if not self.members:
+            return UNASSIGNED
+        pool = self._pool(str(task_type or "other").lower())
+        # Refresh entries that went stale while the member took tasks from other pools
+        while pool[0][0] != self.hours[pool[0][2]]:
+            entry = pool[0]
+            heapq.heapreplace(pool, [self.hours[entry[2]], entry[1], entry[2]])
+        entry = pool[0]
+        member = entry[2]
+        self.hours[member] += max(0.0, float(hours))
+        self.task_counts[member] += 1
+        heapq.heapreplace(pool, [self.hours[member], entry[1], member])
+        return member
+
+    def assign_all(self, tasks, strategy="greedy"):
+        """Assignees for a list of (task_type, hours), in the same order as tasks"""
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown assignment strategy: {strategy}")
+        order = range(len(tasks))
+        if strategy == "lpt":
+            order = sorted(order, key=lambda i: -tasks[i][1])  # stable: equal lengths keep plan order
+        assignees = [None] * len(tasks)
+        for i in order:
+            assignees[i] = self.assign(*tasks[i])
+        return assignees
+
+    def makespan(self):
+        """Hours assigned to the busiest member"""
+        return max(self.hours.values(), default=0.0)
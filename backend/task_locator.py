@@ -0,0 +1,102 @@
+"""Find which project a task lives in without scanning every project.
+
+PATCH /api/tasks/<task_id> only gets a task id, but tasks are stored under
+projects/<projectId>/tasks/<taskId>. A TaskLocator resolves the id in up to
+three steps:
+
+1. An in-process LRU (a TTLCache without expiry) of task id -> project id. A hit costs the one get() the
+   update needs anyway. Tasks are remembered as they are created or found.
+2. A collection-group query on the `id` field that every task stores. This
+   is one indexed query, however many projects exist.
+3. The old scan over every project. It is only needed for tasks written
+   before they stored their id; run backfill_task_ids.py once to fix those.
+
+A cached location is checked by the get() itself: if the task is no longer
+there (deleted or moved), the entry is dropped and the query runs instead.
+
+Firestore needs a single-field index exemption on tasks.id with
+collection-group scope for step 2:
+
+    gcloud firestore indexes fields update id --collection-group=tasks \
+        --index=order=ascending,query-scope=collection-group
+"""
+import threading
+
+from ttl_cache import TTLCache
+
+
+class TaskLocator:
+    """Thread-safe LRU of task id -> project id with a collection-group query behind it"""
+
+    def __init__(self, max_size=10000, scan_fallback=True):
+        self.scan_fallback = scan_fallback
+        # A task never moves between projects, so locations don't expire; a stale one is caught by find()
+        self._locations = TTLCache(ttl_seconds=None, max_size=max_size)
+        self._lock = threading.Lock()  # guards the counters
+        self.hits = 0
+        self.index_lookups = 0
+        self.scans = 0
+        self.not_found = 0
+        self.stale = 0
+
+    def remember(self, task_id, project_id):
+        self._locations.put(task_id, project_id)
+
+    def forget(self, task_id):
+        self._locations.invalidate(task_id)
+
+    def find(self, db, task_id):
+        """Returns (task reference, task snapshot) for task_id, or (None, None) if it doesn't exist"""
+        from firebase_admin import firestore
+
+        project_id = self._locations.get(task_id)
+        if project_id is not None:
+            task_ref = db.collection("projects").document(project_id).collection("tasks").document(task_id)
+            task_doc = task_ref.get()
+            if task_doc.exists:
+                with self._lock:
+                    self.hits += 1
+                return task_ref, task_doc
+            with self._lock:
+                self.stale += 1
+            self.forget(task_id)
+
+        try:
+            query = db.collection_group("tasks").where(filter=firestore.FieldFilter("id", "==", task_id)).limit(5)
+            with self._lock:
+                self.index_lookups += 1
+            for task_doc in query.stream():
+                # Only trust a document whose own id matches (guards against copied task data)
+                if task_doc.id == task_id and task_doc.reference.parent.parent is not None:
+                    self.remember(task_id, task_doc.reference.parent.parent.id)
+                    return task_doc.reference, task_doc
+        except Exception as e:
+            # e.g. the collection-group index exemption hasn't been created yet
+            print(f"⚠️ Task index lookup failed, scanning projects instead: {e}")
+
+        if self.scan_fallback:
+            with self._lock:
+                self.scans += 1
+            for project_doc in db.collection("projects").stream():
+                task_ref = project_doc.reference.collection("tasks").document(task_id)
+                task_doc = task_ref.get()
+                if task_doc.exists:
+                    self.remember(task_id, project_doc.id)
+                    return task_ref, task_doc
+
+        with self._lock:
+            self.not_found += 1
+        return None, None
+
+    def stats(self):
+        cache = self._locations.stats()
+        with self._lock:
+            return {
+                "size": cache["size"],
+                "maxSize": cache["maxSize"],
+                "hits": self.hits,
+                "staleEntries": self.stale,
+                "indexLookups": self.index_lookups,
+                "scans": self.scans,
+                "notFound": self.not_found,
+            }
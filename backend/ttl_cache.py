@@ -0,0 +1,81 @@
+"""Bounded in-process cache whose entries expire after a fixed time.
+
+Used for uid -> display name in the groups view: names change rarely, so a
+few minutes of reuse removes most user reads. A worker sees its own edits
+at once, because update_user_profile invalidates the entry. Other workers
+catch up within ttl_seconds.
+
+With ttl_seconds=None entries never expire and it is a plain bounded LRU
+(task id -> project id in task_locator.py).
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU mapping with per-entry expiry; None is a valid cached value"""
+
+    def __init__(self, ttl_seconds=300, max_size=10000):
+        self.ttl_seconds = float(ttl_seconds) if ttl_seconds is not None else None
+        self.max_size = max(1, int(max_size))
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get_many(self, keys):
+        """Returns ({key: value} for fresh entries, [keys that missed])"""
+        found, missing = {}, []
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key, _MISSING)
+                if entry is not _MISSING and entry[0] <= now:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = _MISSING
+                if entry is _MISSING:
+                    self.misses += 1
+                    missing.append(key)
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                found[key] = entry[1]
+        return found, missing
+
+    def get(self, key, default=None):
+        found, _ = self.get_many([key])
+        return found.get(key, default)
+
+    def put(self, key, value):
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else math.inf
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._entries.pop(key, _MISSING) is not _MISSING:
+                self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxSize": self.max_size,
+                "ttlSeconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
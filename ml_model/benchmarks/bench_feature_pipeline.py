@@ -0,0 +1,95 @@
+"""Rows/second of the chunked feature pipeline vs the original row-by-row path.
+
+Writes a synthetic tasks CSV, then times:
+  legacy  read_csv + .apply(parse_time_to_hours) + per-title keyword cascade
+  build   streaming pipeline writing the feature cache
+  cached  loading the feature cache on a later run
+and checks that the pipeline's features match the legacy ones.
+
+Usage: python ml_model/benchmarks/bench_feature_pipeline.py [--rows 500000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ML_MODEL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_MODEL_DIR)
+
+import feature_pipeline
+from task_classifier import _classify_task_type_reference
+from train_duration_model import generate_synthetic_data, parse_time_to_hours
+
+TIME_FORMATS = ["{}h", "{} hours", "{}m", "{} days", "{}d {}h", "", "about {}h"]
+
+
+def write_csv(path, rows, seed=42):
+    templates = generate_synthetic_data(pd.DataFrame()).to_dict("records")
+    names = ["Alice", "Bob", "Charlie", "Diana", "Eve", None]
+    rng = random.Random(seed)
+    records = []
+    for i in range(rows):
+        template = templates[rng.randrange(len(templates))]
+        fmt = TIME_FORMATS[rng.randrange(len(TIME_FORMATS))]
+        records.append({
+            "title": f"{template['title']} #{rng.randrange(1000)}",
+            "priority": rng.choice(["low", "medium", "high", "High"]),
+            "estimated_time": fmt.format(rng.choice([1, 2, 1.5, 30, 3]), rng.randrange(8)) or None,
+            "assigned_user": rng.choice(names),
+        })
+    pd.DataFrame(records).to_csv(path, index=False)
+
+
+def legacy_features(csv_path):
+    """The training path before the streaming pipeline"""
+    df = pd.read_csv(csv_path)
+    hours = df["estimated_time"].apply(parse_time_to_hours)
+    return pd.DataFrame({
+        "description_length": df["title"].str.len(),
+        "priority_encoded": df["priority"].str.lower().map(feature_pipeline.PRIORITY_MAP).fillna(2),
+        "task_type": df["title"].apply(_classify_task_type_reference),
+        "assignee": df["assigned_user"].fillna("Unassigned"),
+        "estimated_hours": hours,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--chunksize", type=int, default=feature_pipeline.DEFAULT_CHUNKSIZE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "tasks.csv")
+        write_csv(csv_path, args.rows)
+
+        start = time.perf_counter()
+        legacy = legacy_features(csv_path)
+        legacy_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        feature_pipeline.load_features(csv_path, chunksize=args.chunksize, rebuild=True)
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cached = feature_pipeline.load_features(csv_path, chunksize=args.chunksize)
+        cached_seconds = time.perf_counter() - start
+
+        for column in ["description_length", "priority_encoded"]:
+            assert np.array_equal(legacy[column].to_numpy(), cached[column].to_numpy()), column
+        for column in ["task_type", "assignee"]:
+            assert (legacy[column].astype(str) == cached[column].astype(str)).all(), column
+        assert np.allclose(legacy["estimated_hours"], cached["estimated_hours"], equal_nan=True, rtol=1e-6)
+
+        print(f"\n{'path':<8} {'seconds':>8} {'rows/s':>12}")
+        for name, seconds in [("legacy", legacy_seconds), ("build", build_seconds), ("cached", cached_seconds)]:
+            print(f"{name:<8} {seconds:>8.2f} {args.rows / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Streaming feature pipeline for duration-model training data.
+
+tasks.csv is read in chunks; each chunk is featurized with vectorized pandas
+string operations and reduced to compact numeric columns, so memory use is
+bounded by the chunk size plus ~14 bytes per row for the finished features.
+The result is written to a columnar cache (<csv>.features.npz) that later
+training runs load directly as long as the CSV hasn't changed.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from task_classifier import TASK_TYPES, classify_task_types, check_parity
+from duration_parser import parse_duration_series
+
+# Bump when featurization changes so stale caches are rebuilt
+PIPELINE_VERSION = 2
+DEFAULT_CHUNKSIZE = 200_000
+PRIORITY_MAP = {'low': 1, 'medium': 2, 'high': 3}
+CSV_COLUMNS = ['title', 'priority', 'estimated_time', 'assigned_user']
+
+
+def parse_hours_series(times):
+    """Vectorized parse_time_to_hours: '2h', '30m', '1.5 days' -> hours, NaN stays NaN"""
+    return parse_duration_series(times, default=2.0)
+
+
+def featurize_chunk(chunk, assignee_vocab, hours=None):
+    """Turn a raw CSV chunk into compact numeric feature columns.
+
+    assignee_vocab maps assignee name -> code and is extended in place, so codes
+    stay consistent across chunks. Pass hours to use known durations instead of
+    parsing the estimated_time column.
+    """
+    titles = chunk['title']
+    task_type_codes = pd.Categorical(classify_task_types(titles), categories=TASK_TYPES).codes
+
+    if 'assigned_user' in chunk.columns:
+        assignees = chunk['assigned_user'].fillna('Unassigned')
+    else:
+        assignees = pd.Series('Unassigned', index=chunk.index)
+    local_codes, local_names = pd.factorize(assignees)
+    for name in local_names:
+        assignee_vocab.setdefault(name, len(assignee_vocab))
+    remap = np.array([assignee_vocab[name] for name in local_names], dtype=np.int32)
+
+    return {
+        'description_length': titles.str.len().fillna(0).to_numpy(dtype=np.int32),
+        'priority_encoded': chunk['priority'].str.lower().map(PRIORITY_MAP).fillna(2).to_numpy(dtype=np.int8),
+        'task_type_code': task_type_codes.astype(np.int8),
+        'assignee_code': remap[local_codes],
+        'estimated_hours': (parse_hours_series(chunk['estimated_time']) if hours is None else
+                            pd.Series(hours, index=chunk.index)).to_numpy(dtype=np.float32),
+    }
+
+
+def default_cache_path(csv_path):
+    return os.path.splitext(csv_path)[0] + '.features.npz'
+
+
+def _csv_signature(csv_path):
+    stat = os.stat(csv_path)
+    return np.array([PIPELINE_VERSION, stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def build_feature_cache(csv_path, cache_path=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Stream csv_path through the feature pipeline and write the columnar cache"""
+    cache_path = cache_path or default_cache_path(csv_path)
+    signature = _csv_signature(csv_path)
+    assignee_vocab = {}
+    columns = {}
+    rows = 0
+
+    reader = pd.read_csv(csv_path, chunksize=chunksize, dtype=str, usecols=lambda c: c in CSV_COLUMNS)
+    for chunk_index, chunk in enumerate(reader):
+        if chunk_index == 0:
+            # Training and serving must classify titles identically
+            check_parity(chunk['title'].head(1000))
+        for name, values in featurize_chunk(chunk, assignee_vocab).items():
+            columns.setdefault(name, []).append(values)
+        rows += len(chunk)
+        print(f"   featurized {rows:,} rows...")
+
+    arrays = {name: np.concatenate(parts) for name, parts in columns.items()}
+    if not arrays:
+        arrays = {name: np.empty(0, dtype=dtype) for name, dtype in [
+            ('description_length', np.int32), ('priority_encoded', np.int8), ('task_type_code', np.int8),
+            ('assignee_code', np.int32), ('estimated_hours', np.float32)]}
+
+    tmp_path = cache_path + '.tmp.npz'
+    np.savez(
+        tmp_path,
+        signature=signature,
+        task_types=np.array(TASK_TYPES),
+        assignees=np.array(sorted(assignee_vocab, key=assignee_vocab.get) or [''], dtype=str),
+        **arrays,
+    )
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+def load_features(csv_path, cache_path=None, chunksize=DEFAULT_CHUNKSIZE, rebuild=False):
+    """Training features for csv_path, from the cache when it is up to date.
+
+    Returns a DataFrame with description_length, priority_encoded, task_type,
+    assignee (both categorical) and estimated_hours (NaN where the CSV had no time).
+    """
+    cache_path = cache_path or default_cache_path(csv_path)
+    fresh = False
+    if not rebuild and os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            fresh = np.array_equal(cached['signature'], _csv_signature(csv_path))
+    if fresh:
+        print(f"Using cached features from {cache_path}")
+    else:
+        print(f"Building feature cache {cache_path}...")
+        build_feature_cache(csv_path, cache_path, chunksize)
+
+    with np.load(cache_path) as cached:
+        return pd.DataFrame({
+            'description_length': cached['description_length'],
+            'priority_encoded': cached['priority_encoded'],
+            'task_type': pd.Categorical.from_codes(cached['task_type_code'], categories=list(cached['task_types'])),
+            'assignee': pd.Categorical.from_codes(cached['assignee_code'], categories=list(cached['assignees'])),
+            'estimated_hours': cached['estimated_hours'].astype(np.float64),
+        })
+
+
+def features_from_frame(df, hours=None):
+    """Featurize an in-memory DataFrame (e.g. synthetic data) the same way as the CSV"""
+    assignee_vocab = {}
+    arrays = featurize_chunk(df, assignee_vocab, hours)
+    names = sorted(assignee_vocab, key=assignee_vocab.get)
+    return pd.DataFrame({
+        'description_length': arrays['description_length'],
+        'priority_encoded': arrays['priority_encoded'],
+        'task_type': pd.Categorical.from_codes(arrays['task_type_code'], categories=TASK_TYPES),
+        'assignee': pd.Categorical.from_codes(arrays['assignee_code'], categories=names),
+        'estimated_hours': arrays['estimated_hours'].astype(np.float64),
+    })
+
+
+def encode_categories(values, encoder):
+    """Fit a LabelEncoder on the categories actually present and return the row codes.
+
+    Only the (few) distinct categories are sorted, not every row.
+    """
+    values = pd.Categorical(values)
+    present = np.unique(values.codes[values.codes >= 0])
+    categories = np.asarray(values.categories)[present]
+    encoder.fit(categories)
+    remap = np.zeros(len(values.categories), dtype=np.int64)
+    remap[present] = encoder.transform(categories)
+    return remap[values.codes]
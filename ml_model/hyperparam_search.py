@@ -0,0 +1,249 @@
+"""Parallel k-fold cross-validated hyperparameter search for the duration model.
+
+Every (candidate, fold) pair is an independent job on a process pool that uses
+all cores. Each finished fold is written to --cache-dir, keyed on a
+fingerprint of the training data plus the candidate's settings, so an
+interrupted search resumes where it stopped and re-running with a wider grid
+only fits the new candidates.
+
+For each candidate the report records mean/std MAE, R², the compiled model's
+size, and per-row predict latency on the serving path (backend's
+CompiledGradientBoosting.predict_one). Latency is measured in this process
+after the pool has shut down, one candidate at a time, on the compiled fold-0
+model (kept in the cache next to the fold results), as the median of
+LATENCY_REPEATS passes over the same rows. Timing inside busy workers would
+mostly measure the other jobs. The winner is the lowest-MAE candidate
+whose p50 latency is within --latency-budget-us; with --publish it is refit on
+all data and saved as the versioned artifact.
+
+Usage:
+    python hyperparam_search.py --csv tasks.csv --folds 5 --latency-budget-us 60 --publish
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import joblib
+import numpy as np
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import KFold
+
+from feature_pipeline import DEFAULT_CHUNKSIZE
+from train_duration_model import encode_features, load_training_features, save_artifacts
+# backend/ is put on sys.path by the imports above
+from duration_engine import CompiledGradientBoosting
+
+DEFAULT_GRID = {
+    'n_estimators': [100, 200, 400],
+    'max_depth': [3, 4, 5],
+    'learning_rate': [0.05, 0.1],
+    'subsample': [1.0, 0.8],
+}
+LATENCY_ROWS = 200
+LATENCY_REPEATS = 7
+
+# Set in each worker process by _init_worker so the data is shipped once, not per job
+_X = None
+_y = None
+
+
+def expand_grid(grid):
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def data_fingerprint(X, y, folds):
+    digest = hashlib.sha1()
+    digest.update(np.ascontiguousarray(X).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    digest.update(str(folds).encode())
+    return digest.hexdigest()[:16]
+
+
+def candidate_key(params):
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def _init_worker(X, y):
+    global _X, _y
+    _X, _y = X, y
+
+
+def run_fold(params, fold, train_idx, val_idx):
+    """Fit one candidate on one fold; returns (metrics, compiled model arrays)"""
+    model = GradientBoostingRegressor(**params, random_state=42)
+    start = time.perf_counter()
+    model.fit(_X[train_idx], _y[train_idx])
+    fit_seconds = time.perf_counter() - start
+
+    y_pred = model.predict(_X[val_idx])
+    engine = CompiledGradientBoosting.from_model(model)
+
+    return {
+        'fold': fold,
+        'mae': float(mean_absolute_error(_y[val_idx], y_pred)),
+        'r2': float(r2_score(_y[val_idx], y_pred)),
+        'fit_seconds': fit_seconds,
+        'model_bytes': len(pickle.dumps(model)),
+        'compiled_bytes': int(engine.nbytes),
+    }, engine.to_arrays()
+
+
+def measure_latency(engine, rows, repeats=LATENCY_REPEATS):
+    """Median per-row predict_one latency in microseconds: the median over repeats of each pass's median"""
+    for row in rows[:10]:
+        engine.predict_one(row)  # warm up
+    passes = []
+    for _ in range(repeats):
+        latencies = []
+        for row in rows:
+            start = time.perf_counter()
+            engine.predict_one(row)
+            latencies.append(time.perf_counter() - start)
+        passes.append(np.median(latencies))
+    return float(np.median(passes) * 1e6)
+
+
+def summarize(params, folds, latency_us):
+    maes = [f['mae'] for f in folds]
+    return {
+        'params': params,
+        'mae_mean': float(np.mean(maes)),
+        'mae_std': float(np.std(maes)),
+        'r2_mean': float(np.mean([f['r2'] for f in folds])),
+        'fit_seconds_mean': float(np.mean([f['fit_seconds'] for f in folds])),
+        'latency_us_p50': latency_us,
+        'model_bytes': int(np.median([f['model_bytes'] for f in folds])),
+        'compiled_bytes': int(np.median([f['compiled_bytes'] for f in folds])),
+    }
+
+
+def search(X, y, grid, folds=5, cache_dir='search_cache', workers=None):
+    """Cross-validate every candidate in grid; returns one summary per candidate"""
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    candidates = expand_grid(grid)
+    splits = list(KFold(n_splits=folds, shuffle=True, random_state=42).split(X))
+
+    run_dir = os.path.join(cache_dir, data_fingerprint(X, y, folds))
+    os.makedirs(run_dir, exist_ok=True)
+
+    results = {candidate_key(params): {} for params in candidates}
+    pending = []
+    for params in candidates:
+        key = candidate_key(params)
+        for fold, (train_idx, val_idx) in enumerate(splits):
+            path = os.path.join(run_dir, f"{key}-fold{fold}.json")
+            # Fold 0 also needs its compiled model for the latency pass
+            if os.path.exists(path) and (fold or os.path.exists(engine_path(run_dir, key))):
+                with open(path) as f:
+                    results[key][fold] = json.load(f)
+            else:
+                pending.append((params, fold, train_idx, val_idx, path))
+
+    cached = len(candidates) * folds - len(pending)
+    print(f"{len(candidates)} candidates x {folds} folds: {cached} cached, {len(pending)} to run")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 initializer=_init_worker, initargs=(X, y)) as pool:
+            futures = {pool.submit(run_fold, params, fold, train_idx, val_idx): (params, path)
+                       for params, fold, train_idx, val_idx, path in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                params, path = futures[future]
+                fold_result, engine_arrays = future.result()
+                if fold_result['fold'] == 0:
+                    _atomic_dump(engine_arrays, engine_path(run_dir, candidate_key(params)))
+                # Written per fold as it finishes, so an interrupted search loses at most the running jobs
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(fold_result, f)
+                os.replace(tmp_path, path)
+                results[candidate_key(params)][fold_result['fold']] = fold_result
+                print(f"   [{done}/{len(pending)}] {params} fold {fold_result['fold']}: MAE {fold_result['mae']:.3f}")
+
+    # The pool is gone, so candidates are timed one after another on an otherwise idle process
+    rows = X[:LATENCY_ROWS]
+    summaries = []
+    for params in candidates:
+        key = candidate_key(params)
+        engine = CompiledGradientBoosting.from_arrays(joblib.load(engine_path(run_dir, key)))
+        summaries.append(summarize(params, [results[key][fold] for fold in range(folds)],
+                                   measure_latency(engine, rows)))
+    return summaries
+
+
+def engine_path(run_dir, key):
+    return os.path.join(run_dir, f"{key}-fold0.engine.joblib")
+
+
+def _atomic_dump(value, path):
+    tmp_path = f"{path}.tmp"
+    joblib.dump(value, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def select_best(summaries, latency_budget_us):
+    """Lowest MAE within the latency budget (or the fastest candidate if none fit)"""
+    for summary in summaries:
+        summary['within_budget'] = summary['latency_us_p50'] <= latency_budget_us
+    eligible = [s for s in summaries if s['within_budget']]
+    if not eligible:
+        print(f"⚠️ No candidate within {latency_budget_us}us per row; picking the fastest")
+        best = min(summaries, key=lambda s: s['latency_us_p50'])
+    else:
+        best = min(eligible, key=lambda s: s['mae_mean'])
+    for summary in summaries:
+        summary['selected'] = summary is best
+    return best
+
+
+def write_report(path, summaries, latency_budget_us):
+    ranked = sorted(summaries, key=lambda s: s['mae_mean'])
+    with open(path, 'w') as f:
+        json.dump({'latency_budget_us': latency_budget_us, 'candidates': ranked}, f, indent=2)
+
+    print(f"\n{'':2}{'params':<62} {'MAE':>7} {'±':>6} {'R²':>6} {'us/row':>7} {'KiB':>7}")
+    for s in ranked:
+        marker = '* ' if s['selected'] else ('  ' if s['within_budget'] else 'x ')
+        params = ', '.join(f"{k}={v}" for k, v in sorted(s['params'].items()))
+        print(f"{marker}{params:<62} {s['mae_mean']:>7.3f} {s['mae_std']:>6.3f} {s['r2_mean']:>6.2f} "
+              f"{s['latency_us_p50']:>7.1f} {s['compiled_bytes'] / 1024:>7.0f}")
+    print(f"\n* selected, x over the latency budget. Report written to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-validated hyperparameter search for the duration model")
+    parser.add_argument('--csv', default='tasks.csv', help="Historical tasks CSV")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Rows read per CSV chunk")
+    parser.add_argument('--folds', type=int, default=5, help="Cross-validation folds")
+    parser.add_argument('--grid', help="JSON object of parameter -> list of values (default: built-in grid)")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: all cores)")
+    parser.add_argument('--latency-budget-us', type=float, default=60.0, help="Max p50 per-row predict latency")
+    parser.add_argument('--cache-dir', default='search_cache', help="Where finished folds are cached")
+    parser.add_argument('--report', default='search_report.json', help="Report output path")
+    parser.add_argument('--publish', action='store_true', help="Refit the winner and save duration_artifacts.pkl")
+    args = parser.parse_args()
+
+    features = load_training_features(args.csv, args.chunksize)
+    X, y, le_task_type, le_assignee = encode_features(features)
+    grid = json.loads(args.grid) if args.grid else DEFAULT_GRID
+
+    summaries = search(X.to_numpy(), y.to_numpy(), grid, folds=args.folds, cache_dir=args.cache_dir,
+                       workers=args.workers)
+    best = select_best(summaries, args.latency_budget_us)
+    write_report(args.report, summaries, args.latency_budget_us)
+
+    if args.publish:
+        # Cross-validation already measured the winner, so the published model trains on every row
+        model = GradientBoostingRegressor(**best['params'], random_state=42)
+        model.fit(X, y)
+        metrics = {'mae': best['mae_mean'], 'r2': best['r2_mean'], 'cv_folds': args.folds, 'params': best['params']}
+        version = save_artifacts(model, le_task_type, le_assignee, metrics=metrics)
+        print(f"✅ Model {version} saved with {best['params']}")
@@ -0,0 +1,197 @@
+"""Incremental retraining from completed tasks recorded in Firestore.
+
+Each run:
+  1. reads the checkpoint (the completedAt of the last task already ingested),
+  2. fetches only tasks completed since then that have an actualDuration,
+  3. appends them to a rolling window of the most recent --window rows
+     (seeded from tasks.csv, or synthetic data, on the first run),
+  4. refits the model on that window and publishes a new versioned artifact,
+  5. moves the checkpoint forward.
+
+GradientBoostingRegressor can't be updated in place, so "incremental" means a
+refit on a bounded window: the cost of a run depends on --window, not on how
+much task history has accumulated. The backend picks the new artifact up
+through its model registry (DURATION_MODEL_WATCH_SECONDS or POST /api/model/reload).
+
+Firestore needs a single-field index exemption on tasks.completedAt with
+collection-group scope for the query below.
+
+Usage:
+    python incremental_train.py --credentials ../backend/firebase_key.json \
+        --artifact ../backend/duration_artifacts.pkl
+"""
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from feature_pipeline import CSV_COLUMNS, features_from_frame, load_features
+from train_duration_model import fit_duration_model, generate_synthetic_data, save_artifacts
+
+DEFAULT_WINDOW = 50_000
+PAGE_SIZE = 500
+WINDOW_COLUMNS = ['description_length', 'priority_encoded', 'task_type', 'assignee', 'estimated_hours',
+                  'completed_at', 'doc_path']
+
+
+def load_checkpoint(path):
+    """Last ingested completedAt (epoch seconds) and the task paths seen at exactly that time"""
+    if not os.path.exists(path):
+        return {'completed_at': 0.0, 'boundary_paths': []}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, checkpoint):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def fetch_completed_tasks(db, checkpoint):
+    """Tasks completed at or after the checkpoint, oldest first, minus ones already ingested"""
+    from firebase_admin import firestore
+
+    since = datetime.fromtimestamp(checkpoint['completed_at'], tz=timezone.utc)
+    already_seen = set(checkpoint['boundary_paths'])
+    query = (db.collection_group('tasks')
+             .where(filter=firestore.FieldFilter('completedAt', '>=', since))
+             .order_by('completedAt')
+             .limit(PAGE_SIZE))
+
+    rows = []
+    last_doc = None
+    while True:
+        page = list((query.start_after(last_doc) if last_doc else query).stream())
+        for doc in page:
+            path = doc.reference.path
+            if path in already_seen:
+                continue
+            task = doc.to_dict()
+            completed_at = task.get('completedAt')
+            if completed_at is None:
+                continue
+            rows.append({
+                'title': task.get('title') or '',
+                'priority': task.get('priority') or 'medium',
+                'assigned_user': task.get('assignedTo') or 'Unassigned',
+                'actual_hours': task.get('actualDuration') or 0,
+                'completed_at': completed_at.timestamp(),
+                'doc_path': path,
+            })
+        if len(page) < PAGE_SIZE:
+            return rows
+        last_doc = page[-1]
+
+
+def feedback_features(rows):
+    """Featurize completed tasks, labelled with their actual duration"""
+    df = pd.DataFrame(rows)
+    df['actual_hours'] = pd.to_numeric(df['actual_hours'], errors='coerce')
+    # Tasks completed without a recorded duration carry no signal
+    df = df[df['actual_hours'] > 0].reset_index(drop=True)
+    if df.empty:
+        return None
+    features = features_from_frame(df, hours=df['actual_hours'].to_numpy())
+    features['completed_at'] = df['completed_at'].to_numpy()
+    features['doc_path'] = df['doc_path'].to_numpy()
+    return features
+
+
+def seed_window(csv_path, window):
+    """Initial window: the most recent historical rows, or synthetic data if there are none"""
+    if csv_path and os.path.exists(csv_path):
+        features = load_features(csv_path).tail(window).reset_index(drop=True)
+        features['estimated_hours'] = features['estimated_hours'].fillna(features['estimated_hours'].median())
+    else:
+        features = features_from_frame(generate_synthetic_data(pd.DataFrame(columns=CSV_COLUMNS)))
+    features['completed_at'] = 0.0
+    features['doc_path'] = ''
+    return features
+
+
+def load_window(path):
+    with np.load(path) as window:
+        return pd.DataFrame({name: window[name] for name in WINDOW_COLUMNS})
+
+
+def save_window(path, window):
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(
+        tmp_path,
+        description_length=window['description_length'].to_numpy(dtype=np.int32),
+        priority_encoded=window['priority_encoded'].to_numpy(dtype=np.int8),
+        task_type=window['task_type'].astype(str).to_numpy(dtype=str),
+        assignee=window['assignee'].astype(str).to_numpy(dtype=str),
+        estimated_hours=window['estimated_hours'].to_numpy(dtype=np.float32),
+        completed_at=window['completed_at'].to_numpy(dtype=np.float64),
+        doc_path=window['doc_path'].astype(str).to_numpy(dtype=str),
+    )
+    os.replace(tmp_path, path)
+
+
+def incremental_train(db, artifact_path, window_path, checkpoint_path, csv_path=None,
+                      window=DEFAULT_WINDOW, min_new_rows=1):
+    """Run one incremental training step; returns the new model version or None"""
+    checkpoint = load_checkpoint(checkpoint_path)
+    rows = fetch_completed_tasks(db, checkpoint)
+    print(f"Fetched {len(rows)} newly completed tasks")
+    if not rows:
+        return None
+
+    # Advance past everything fetched, even tasks without an actualDuration
+    last_completed_at = max(row['completed_at'] for row in rows)
+    boundary_paths = [row['doc_path'] for row in rows if row['completed_at'] == last_completed_at]
+    if last_completed_at == checkpoint['completed_at']:
+        boundary_paths += checkpoint['boundary_paths']
+    next_checkpoint = {'completed_at': last_completed_at, 'boundary_paths': boundary_paths}
+
+    new_features = feedback_features(rows)
+    if new_features is None:
+        print("No newly completed tasks have an actualDuration")
+        save_checkpoint(checkpoint_path, next_checkpoint)
+        return None
+    if len(new_features) < min_new_rows:
+        # Leave the checkpoint alone so these rows are picked up with the next batch
+        print(f"Only {len(new_features)} new labelled tasks, waiting for {min_new_rows}")
+        return None
+
+    current = load_window(window_path) if os.path.exists(window_path) else seed_window(csv_path, window)
+    # A task re-completed later replaces its earlier row
+    current = current[~current['doc_path'].isin(set(new_features['doc_path']))]
+    combined = pd.concat([current, new_features[WINDOW_COLUMNS]], ignore_index=True).tail(window)
+    combined = combined.reset_index(drop=True)
+
+    print(f"Refitting on a window of {len(combined)} rows ({len(new_features)} new)...")
+    model, le_task_type, le_assignee, metrics, _ = fit_duration_model(combined)
+    print(f"   Mean Absolute Error: {metrics['mae']:.2f} hours, R² Score: {metrics['r2']:.2f}")
+
+    version = save_artifacts(model, le_task_type, le_assignee, path=artifact_path, metrics=metrics)
+    # Only move the checkpoint once the artifact is published
+    save_window(window_path, combined)
+    save_checkpoint(checkpoint_path, next_checkpoint)
+    print(f"✅ Published model {version} to {artifact_path}")
+    return version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Retrain the duration model from recently completed tasks")
+    parser.add_argument('--credentials', default='firebase_key.json', help="Firebase service account key")
+    parser.add_argument('--artifact', default='duration_artifacts.pkl', help="Artifact to publish")
+    parser.add_argument('--window-file', default='feedback_window.npz', help="Rolling training window")
+    parser.add_argument('--checkpoint', default='incremental_checkpoint.json', help="Last ingested completion")
+    parser.add_argument('--csv', default='tasks.csv', help="Historical data used to seed the first window")
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, help="Maximum rows trained on")
+    parser.add_argument('--min-new-rows', type=int, default=1, help="Skip retraining below this many new rows")
+    args = parser.parse_args()
+
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+    firebase_admin.initialize_app(credentials.Certificate(args.credentials))
+
+    incremental_train(firestore.client(), args.artifact, args.window_file, args.checkpoint,
+                      csv_path=args.csv, window=args.window, min_new_rows=args.min_new_rows)
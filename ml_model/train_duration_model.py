@@ -4,8 +4,18 @@ from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import mean_absolute_error, r2_score
-import pickle
-import re
+import joblib
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+
+# Feature helpers shared with the serving code live in backend/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from task_classifier import classify_task_types
+from duration_parser import parse_duration_hours
+from feature_pipeline import (CSV_COLUMNS, DEFAULT_CHUNKSIZE, encode_categories, features_from_frame,
+                              load_features)
 # Task Duration Estimator - Predicts how long tasks will take
 # Features: task_type, complexity, assignee_skill, description_length, priority
 # Target: estimated_hours
@@ -13,24 +23,9 @@ def parse_time_to_hours(time_str):
     """Convert time strings like '2h', '30m', '1.5h' to hours"""
     if pd.isna(time_str):
         return np.nan
-    
-    time_str = str(time_str).lower().strip()
-    
-    # Match patterns like "2h", "30m", "1.5h", "2.5 hours"
-    hours_match = re.search(r'(\d+\.?\d*)\s*h', time_str)
-    minutes_match = re.search(r'(\d+\.?\d*)\s*m', time_str)
-    days_match = re.search(r'(\d+\.?\d*)\s*d', time_str)
-    
-    hours = 0
-    if days_match:
-        hours += float(days_match.group(1)) * 8  # 1 day = 8 work hours
-    if hours_match:
-        hours += float(hours_match.group(1))
-    if minutes_match:
-        hours += float(minutes_match.group(1)) / 60
-    
-    # Default to 2 hours if no pattern matched
-    return hours if hours > 0 else 2.0
+    # Same parser the API applies to Gemini's estimates; default to 2 hours if nothing matched
+    return parse_duration_hours(time_str, default=2.0)
+
 def extract_features(df):
     """Extract features from task data"""
     features = pd.DataFrame()
@@ -42,23 +37,8 @@ def extract_features(df):
     priority_map = {'low': 1, 'medium': 2, 'high': 3}
     features['priority_encoded'] = df['priority'].str.lower().map(priority_map).fillna(2)
     
-    # Task type (extract from title keywords)
-    def categorize_task(title):
-        title_lower = str(title).lower()
-        if any(word in title_lower for word in ['research', 'investigate', 'analyze']):
-            return 'research'
-        elif any(word in title_lower for word in ['design', 'wireframe', 'mockup', 'ui', 'ux']):
-            return 'design'
-        elif any(word in title_lower for word in ['develop', 'code', 'implement', 'build', 'prototype']):
-            return 'development'
-        elif any(word in title_lower for word in ['test', 'qa', 'bug', 'fix']):
-            return 'testing'
-        elif any(word in title_lower for word in ['meet', 'review', 'discuss']):
-            return 'meeting'
-        else:
-            return 'other'
-    
-    features['task_type'] = df['title'].apply(categorize_task)
+    # Task type (extract from title keywords) - shared with the backend API
+    features['task_type'] = classify_task_types(df['title'])
     
     # Assignee (if available)
     if 'assigned_user' in df.columns:
@@ -67,75 +47,96 @@ def extract_features(df):
         features['assignee'] = 'Unassigned'
     
     return features
-def train_duration_model():
-    """Train the task duration estimation model"""
-    print("Loading task data...")
-    
-    # Load data
-    df = pd.read_csv('tasks.csv')
-    
-    # Parse estimated time to hours
-    df['estimated_hours'] = df['estimated_time'].apply(parse_time_to_hours)
-    
-    # Fill any remaining NaN values with median
-    df['estimated_hours'] = df['estimated_hours'].fillna(df['estimated_hours'].median())
-    
-    # If still have NaN (all were NaN), default to 2 hours
-    if df['estimated_hours'].isna().all():
-        df['estimated_hours'] = 2.0
-    
-    if len(df) < 10:
-        print(f"⚠️ Warning: Only {len(df)} valid samples. Generating synthetic data for better training...")
-        df = generate_synthetic_data(df)
-    
-    print(f"Training on {len(df)} samples...")
-    
-    # Extract features
-    features = extract_features(df)
-    
-    # Encode categorical variables
+def save_artifacts(model, le_task_type, le_assignee, path='duration_artifacts.pkl', metrics=None):
+    """Write the model and encoders as a versioned artifact and return the version.
+    
+    The file is replaced atomically, so a server watching it never loads a partial write.
+    """
+    trained_at = datetime.now(timezone.utc)
+    # Suffix keeps versions unique even when two runs finish within the same second
+    version = f"{trained_at.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    artifacts = {
+        'model': model,
+        'le_task_type': le_task_type,
+        'le_assignee': le_assignee,
+        'version': version,
+        'trained_at': trained_at.isoformat(),
+        'metrics': metrics or {},
+    }
+    tmp_path = f"{path}.tmp"
+    joblib.dump(artifacts, tmp_path)
+    os.replace(tmp_path, path)
+    return version
+MODEL_PARAMS = {'n_estimators': 100, 'learning_rate': 0.1, 'max_depth': 4}
+def encode_features(features):
+    """Encode categorical columns; returns (X, y, le_task_type, le_assignee)"""
     le_task_type = LabelEncoder()
     le_assignee = LabelEncoder()
     
-    features['task_type_encoded'] = le_task_type.fit_transform(features['task_type'])
-    features['assignee_encoded'] = le_assignee.fit_transform(features['assignee'])
+    features = features.copy()
+    features['task_type_encoded'] = encode_categories(features['task_type'], le_task_type)
+    features['assignee_encoded'] = encode_categories(features['assignee'], le_assignee)
     
     # Select features for training
     X = features[['description_length', 'priority_encoded', 'task_type_encoded', 'assignee_encoded']]
-    y = df['estimated_hours']
+    y = features['estimated_hours']
+    return X, y, le_task_type, le_assignee
+def fit_duration_model(features, params=None):
+    """Encode features, fit the model on an 80/20 split and evaluate it.
+    
+    Returns (model, le_task_type, le_assignee, metrics, (X_test, y_test, y_pred)).
+    """
+    X, y, le_task_type, le_assignee = encode_features(features)
     
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     
     # Train model - using Gradient Boosting for better accuracy
     print("Training Gradient Boosting model...")
-    model = GradientBoostingRegressor(
-        n_estimators=100,
-        learning_rate=0.1,
-        max_depth=4,
-        random_state=42
-    )
+    model = GradientBoostingRegressor(**(params or MODEL_PARAMS), random_state=42)
     model.fit(X_train, y_train)
     
     # Evaluate
     y_pred = model.predict(X_test)
-    mae = mean_absolute_error(y_test, y_pred)
-    r2 = r2_score(y_test, y_pred)
+    metrics = {'mae': mean_absolute_error(y_test, y_pred), 'r2': r2_score(y_test, y_pred)}
+    return model, le_task_type, le_assignee, metrics, (X_test, y_test, y_pred)
+def load_training_features(csv_path='tasks.csv', chunksize=DEFAULT_CHUNKSIZE, rebuild_cache=False):
+    """Training features with missing durations filled and synthetic rows added for tiny datasets"""
+    # Stream the CSV through the feature pipeline (or reuse its cached output)
+    features = load_features(csv_path, chunksize=chunksize, rebuild=rebuild_cache)
+    
+    # Fill any missing estimated times with the median
+    features['estimated_hours'] = features['estimated_hours'].fillna(features['estimated_hours'].median())
+    
+    # If still have NaN (all were NaN), default to 2 hours
+    if features['estimated_hours'].isna().all():
+        features['estimated_hours'] = 2.0
+    
+    if len(features) < 10:
+        print(f"⚠️ Warning: Only {len(features)} valid samples. Generating synthetic data for better training...")
+        synthetic = features_from_frame(generate_synthetic_data(pd.DataFrame(columns=CSV_COLUMNS)))
+        features = pd.concat([features, synthetic], ignore_index=True)
+    return features
+def train_duration_model(csv_path='tasks.csv', chunksize=DEFAULT_CHUNKSIZE, rebuild_cache=False):
+    """Train the task duration estimation model"""
+    print("Loading task data...")
+    
+    features = load_training_features(csv_path, chunksize, rebuild_cache)
+    
+    print(f"Training on {len(features)} samples...")
+    
+    model, le_task_type, le_assignee, metrics, (X_test, y_test, y_pred) = fit_duration_model(features)
+    mae, r2 = metrics['mae'], metrics['r2']
     
     print(f"\n✅ Model Performance:")
     print(f"   Mean Absolute Error: {mae:.2f} hours")
     print(f"   R² Score: {r2:.2f}")
     
-    # Save model and encoders
+    # Save model and encoders as one versioned artifact (the format backend/app.py loads)
     print("\nSaving model...")
-    with open('duration_model.pkl', 'wb') as f:
-        pickle.dump(model, f)
-    with open('le_task_type.pkl', 'wb') as f:
-        pickle.dump(le_task_type, f)
-    with open('le_assignee.pkl', 'wb') as f:
-        pickle.dump(le_assignee, f)
+    version = save_artifacts(model, le_task_type, le_assignee, metrics=metrics)
     
-    print("✅ Model saved successfully!")
+    print(f"✅ Model {version} saved successfully!")
     
     # Test predictions
     print("\n📊 Sample Predictions:")
@@ -199,4 +200,10 @@ def generate_synthetic_data(existing_df):
     
     return combined_df
 if __name__ == "__main__":
-    train_duration_model()
+    import argparse
+    parser = argparse.ArgumentParser(description="Train the task duration estimation model")
+    parser.add_argument('--csv', default='tasks.csv', help="Historical tasks CSV")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Rows read per CSV chunk")
+    parser.add_argument('--rebuild-cache', action='store_true', help="Ignore the cached features and re-read the CSV")
+    args = parser.parse_args()
+    train_duration_model(args.csv, args.chunksize, args.rebuild_cache)